@@ -1,16 +1,24 @@
 import streamlit as st
 from langchain_core.messages import AIMessage, HumanMessage
-from app_launcher_agent.agent import AppLauncherAgent
-from app_launcher_agent.writer_agent import WritingAgent
-from app_launcher_agent.file_agent import FileHandlingAgent
-from app_launcher_agent.code_agent import CodeGenerationAgent
-from app_launcher_agent.calculation_agent import CalculationAgent
-from app_launcher_agent.utils import format_chat_history
-from app_launcher_agent.system_agent import SystemControlAgent
+from app_launcher_agent.registry import AgentRegistry
+from app_launcher_agent.router import IntentRouter
+from app_launcher_agent.planner import CommandPlanner, PlanExecutor, run_plan
+from app_launcher_agent.streaming import TokenStream, streaming_to
+from app_launcher_agent.history import HistoryWindow
+from app_launcher_agent.utils import RenderedChat
+from app_launcher_agent.storage import get_conversation_store, recording_tool_results
+from app_launcher_agent.llm_cache import bypassing_cache
+from app_launcher_agent.tracing import format_waterfall, get_tracer, span
 from dotenv import load_dotenv
+import contextvars
 import os
+import threading
 os.environ["LANGCHAIN_HANDLER"] = "false"
 
+# Messages loaded per page when resuming a session, and kept in memory at most
+HISTORY_PAGE_SIZE = 50
+MAX_IN_MEMORY_MESSAGES = 200
+
 # Initialize your LLM (same as before)
 from langchain_openai import ChatOpenAI
 
@@ -24,6 +32,27 @@ def initialize_llm():
         api_key=os.getenv("API_KEY")
     )
 
+def run_agent_streaming(run, stream):
+    """Call ``run()`` on a worker thread; generated text is published to ``stream``.
+
+    The worker runs in a copy of the caller's context so spans it records
+    land in the caller's trace.
+    """
+    outcome = {}
+
+    def worker():
+        try:
+            with streaming_to(stream):
+                outcome["result"] = run()
+        except Exception as e:
+            outcome["result"] = f"Error: {str(e)}"
+        finally:
+            stream.close()
+
+    thread = threading.Thread(target=contextvars.copy_context().run, args=(worker,), daemon=True)
+    thread.start()
+    return thread, outcome
+
 def main():
     st.set_page_config(
         page_title="AI Assistant",
@@ -34,30 +63,38 @@ def main():
     with open("assets/style.css") as f:
         st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
 
+    # Turns are persisted; a "?session=<id>" link resumes the latest page of a session
+    store = get_conversation_store()
     if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
+        session_id = st.query_params.get("session")
+        if session_id and store.has_session(session_id):
+            messages, cursor = store.load_messages(session_id, limit=HISTORY_PAGE_SIZE)
+        else:
+            session_id, messages, cursor = None, [], None
+        st.session_state.session_id = session_id
+        st.session_state.chat_history = messages
+        st.session_state.history_cursor = cursor
+    if "rendered_chat" not in st.session_state:
+        st.session_state.rendered_chat = RenderedChat()
     
     # Initialize LLM first
     if "llm" not in st.session_state:
         st.session_state.llm = initialize_llm()
     
-    # Then initialize agents that depend on LLM
-    if "calc_agent" not in st.session_state:
-        st.session_state.calc_agent = CalculationAgent(st.session_state.llm)
-
-    if "app_agent" not in st.session_state:
-        st.session_state.app_agent = AppLauncherAgent(st.session_state.llm)
-    
-    if "writer_agent" not in st.session_state:
-        st.session_state.writer_agent = WritingAgent(st.session_state.llm)
-    
-    if "file_agent" not in st.session_state:
-        st.session_state.file_agent = FileHandlingAgent(st.session_state.llm)
-
-    if "code_agent" not in st.session_state:
-        st.session_state.code_agent = CodeGenerationAgent(st.session_state.llm)
-    if "system_agent" not in st.session_state:
-        st.session_state.system_agent = SystemControlAgent(st.session_state.llm)    
+    # Agents are built lazily by the registry the first time the router picks them
+    if "agents" not in st.session_state:
+        st.session_state.agents = AgentRegistry(st.session_state.llm)
+    agents = st.session_state.agents
+
+    # Agents only see a token-bounded window of the chat plus a rolling summary
+    if "history_window" not in st.session_state:
+        st.session_state.history_window = HistoryWindow(st.session_state.llm)
+    history_window = st.session_state.history_window
+
+    if "router" not in st.session_state:
+        st.session_state.router = IntentRouter()
+        st.session_state.planner = CommandPlanner(st.session_state.router)
+        st.session_state.plan_executor = PlanExecutor(max_workers=4)
         
     st.title("🚀 CLICKLESS ")
     st.markdown("""
@@ -65,61 +102,107 @@ def main():
                
     """)
     
-    for message in format_chat_history(st.session_state.chat_history):
+    if st.session_state.history_cursor is not None and st.button("Load earlier messages"):
+        older, cursor = store.load_messages(st.session_state.session_id, limit=HISTORY_PAGE_SIZE,
+                                            before=st.session_state.history_cursor)
+        st.session_state.chat_history = history_window.prepend(older, st.session_state.chat_history)
+        st.session_state.history_cursor = cursor
+
+    # Only messages added since the last run are formatted; the rest are reused
+    for message in st.session_state.rendered_chat.sync(st.session_state.chat_history):
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
     
     # Only ONE chat_input with a unique key
     user_input = st.chat_input("What would you like me to do?", key="main_chat_input")
 
+    # The page is painted by now; build the remaining agents off the main thread
+    agents.warm()
+
+    recent_sessions = store.sessions(limit=10)
+    if recent_sessions:
+        with st.sidebar.expander("Recent sessions"):
+            for session in recent_sessions:
+                st.markdown(f"[{session.title or 'Untitled'}](?session={session.id}) · {session.messages} messages")
+
+    if agents.build_times:
+        with st.sidebar.expander("Agent startup"):
+            for name, seconds in agents.build_times.items():
+                st.write(f"{name}: {seconds * 1000:.0f} ms")
+
     if user_input is not None and user_input.strip() != "":
         clean_input = user_input.strip()
 
+        if st.session_state.session_id is None:
+            st.session_state.session_id = store.create_session(title=clean_input[:60])
+            st.query_params["session"] = st.session_state.session_id
+        session_id = st.session_state.session_id
+
         st.session_state.chat_history.append(HumanMessage(content=clean_input))
+        store.append(session_id, st.session_state.chat_history[-1])
 
         with st.chat_message("user"):
             st.markdown(clean_input)
         
-        # Determine agent
-        
-        if any(kw in clean_input.lower() for kw in ["write", "essay", "article"]):
+        chat_history = st.session_state.chat_history
+
+        # Everything done for this input (routing, agents, LLM calls, tools)
+        # is recorded as one trace; tool outputs are also kept for the store
+        with get_tracer().request("chat", session=session_id), recording_tool_results() as tool_results, \
+                bypassing_cache(st.session_state.get("skip_cache", False)):
+            # Determine agent(s); the history window (and any summary update) is
+            # computed on the worker thread so the page is not held up by it
             if "[CODEREQUEST]" in clean_input:  # Check for code flag
-                agent = st.session_state.code_agent
+                agent = agents.get("code")
                 clean_input = clean_input.replace("[CODEREQUEST]", "").strip()
+                run = lambda: agent.run(clean_input, history_window.window(chat_history))
             else:
-                agent = st.session_state.writer_agent
-
-        elif any(kw in clean_input.lower() for kw in ["list", "create"]):
-            agent = st.session_state.file_agent
-
-        elif any(kw in clean_input.lower() for kw in ["calculate", "+", "-", "*", "/", "="]):
-            agent = st.session_state.calc_agent
-
-        elif any(kw in clean_input.lower() for kw in ["open", "launch", "start"]):
-            agent = st.session_state.app_agent
-            
-        elif any(kw in clean_input.lower() for kw in ["code", "program", "algorithm", "function"]):
-            agent = st.session_state.code_agent
-
-        elif any(kw in clean_input.lower() for kw in ["brightness", "volume", "bluetooth", "system"]):
-            agent = st.session_state.system_agent
-        else:
-            agent = st.session_state.app_agent
-        
-        # Get response
-        try:
-            with st.spinner("Processing..."):
-                result = agent.run(clean_input, st.session_state.chat_history)
-        except Exception as e:
-            result = f"Error: {str(e)}"
-
-        with st.chat_message("assistant"):
-            st.markdown(result)    
-        
+                # Compound input ("open Chrome and Excel") becomes several routed steps;
+                # low-confidence inputs come back as the router's fallback agent
+                with span("plan", "router"):
+                    steps = st.session_state.planner.plan(clean_input)
+                if len(steps) > 1:
+                    executor = st.session_state.plan_executor
+                    run = lambda: run_plan(steps, agents, history_window.window(chat_history), executor)
+                else:
+                    agent = agents.get(steps[0].agent)
+                    run = lambda: agent.run(clean_input, history_window.window(chat_history))
+
+            # Get response, rendering generated text as the tools stream it
+            stream = TokenStream()
+            thread, outcome = run_agent_streaming(run, stream)
+
+            with st.chat_message("assistant"):
+                with st.spinner("Processing..."):
+                    st.write_stream(stream)
+                    thread.join()
+                result = outcome["result"]
+                st.markdown(result)    
+
+        # Both messages are already on the page; the next run picks them up
+        # from the store, so no extra rerun is needed
+        store.append_tool_results(session_id, tool_results)
         st.session_state.chat_history.append(AIMessage(content=result))
-        
-        # Display response
-        st.rerun()
+        store.append(session_id, st.session_state.chat_history[-1])
+        store.flush()
+
+        # Cap memory: older messages stay in the store behind "Load earlier messages"
+        if len(st.session_state.chat_history) > MAX_IN_MEMORY_MESSAGES:
+            keep = MAX_IN_MEMORY_MESSAGES - HISTORY_PAGE_SIZE
+            st.session_state.chat_history = history_window.trim(st.session_state.chat_history, keep)
+            st.session_state.history_cursor = store.page_start(session_id, keep)
+
+    # Rendered on every run, so the checkboxes (and the last trace) survive reruns
+    st.sidebar.checkbox("Generate fresh text (skip cache)", key="skip_cache")
+    if st.sidebar.checkbox("Show request trace", key="show_trace"):
+        trace = get_tracer().last_trace()
+        if trace is None:
+            st.sidebar.caption("No request traced yet")
+        else:
+            prompt_tokens, completion_tokens = trace.tokens()
+            with st.sidebar.expander(f"Trace · {trace.duration * 1000:.0f} ms · "
+                                     f"{prompt_tokens + completion_tokens} tokens", expanded=True):
+                st.code(format_waterfall(trace, width=24), language=None)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -13,6 +13,7 @@ from .calculation_agent import CalculationAgent
 from .system_agent import SystemControlAgent  # New import
 from .tools import AppLauncherTool, TextEditorTool, CodeGenerationTool, SystemOperationsTool  # Updated import
 from .utils import format_chat_history
+from .registry import AgentRegistry
 
 __all__ = [
     "AppLauncherAgent",
@@ -25,6 +26,7 @@ __all__ = [
     "TextEditorTool", 
     "CodeGenerationTool",
     "SystemOperationsTool",  # Added
-    "format_chat_history"
+    "format_chat_history",
+    "AgentRegistry"
 ]
 __version__ = "0.4.0"  # Version bump
\ No newline at end of file
@@ -1,13 +1,17 @@
+import asyncio
 from langchain.agents import AgentExecutor, Tool, create_react_agent
-from langchain import hub
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import AIMessage, HumanMessage
 from typing import List, Union
 from .tools import AppLauncherTool
+from .launch_resolver import LaunchResolver
+from .prompts import load_react_prompt
 
 class AppLauncherAgent:
     def __init__(self, llm):
         self.llm = llm
+        self.launcher = AppLauncherTool()
+        self.resolver = LaunchResolver(catalog=self.launcher.catalog, system=self.launcher.system)
         self.tools = self._setup_tools()
         self.agent = self._setup_agent()
         self.agent_executor = AgentExecutor(
@@ -19,13 +23,13 @@ class AppLauncherAgent:
     
     def _setup_tools(self) -> List[Tool]:
         """Initialize and return the tools for the agent."""
-        launcher = AppLauncherTool()
-        
         return [
             Tool(
                 name="app_launcher",
-                func=launcher.launch_app,
-                description="Useful for launching applications on Windows computers. "
+                func=self.launcher.launch_app,
+                coroutine=self.launcher.alaunch_app,
+                description="Useful for launching applications. Pass just the app name; installed apps "
+               "are found by their usual name (e.g. 'VS Code', 'firefox', 'text editor'). "
                "For Windows apps, use exact names like 'notepad.exe', 'calc.exe', 'chrome.exe'. "
                "For Microsoft Office apps, use 'winword.exe', 'excel.exe', 'powerpnt.exe'."
             )
@@ -33,7 +37,7 @@ class AppLauncherAgent:
     
     def _setup_agent(self):
         """Initialize and return the agent."""
-        prompt = hub.pull("hwchase17/react-chat")
+        prompt = load_react_prompt()
         
         agent = create_react_agent(
             llm=self.llm,
@@ -43,17 +47,52 @@ class AppLauncherAgent:
         
         return agent
     
+    def _run_action(self, action: str, app_name: str) -> str:
+        if action == "close":
+            return self.launcher.close_app(app_name)
+        if action == "status":
+            return self.launcher.app_status(app_name)
+        return self.launcher.launch_app(app_name)
+    
     def run(self, input_text: str, chat_history: List[Union[HumanMessage, AIMessage]] = None) -> str:
         """Run the agent with the given input."""
         try:
             if chat_history is None:
                 chat_history = []
             
+            # Unambiguous launch/close/status commands skip the ReAct loop entirely
+            resolved = self.resolver.resolve_action(input_text)
+            if resolved is not None:
+                return self._run_action(*resolved)
+            
             result = self.agent_executor.invoke({
                 "input": input_text,
                 "chat_history": chat_history
             })
             
+            return result["output"]
+        except Exception as e:
+            return f"Error processing your request: {str(e)}"
+    
+    async def arun(self, input_text: str, chat_history: List[Union[HumanMessage, AIMessage]] = None) -> str:
+        """Async version of run() built on AgentExecutor.ainvoke."""
+        try:
+            if chat_history is None:
+                chat_history = []
+            
+            resolved = self.resolver.resolve_action(input_text)
+            if resolved is not None:
+                action, app_name = resolved
+                if action == "launch":
+                    return await self.launcher.alaunch_app(app_name)
+                # Closing waits for the app to exit
+                return await asyncio.to_thread(self._run_action, action, app_name)
+            
+            result = await self.agent_executor.ainvoke({
+                "input": input_text,
+                "chat_history": chat_history
+            })
+            
             return result["output"]
         except Exception as e:
             return f"Error processing your request: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,543 @@
+import json
+import os
+import platform
+import re
+import shlex
+import threading
+import time
+from configparser import ConfigParser, Error as ConfigParserError
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .utils import get_cache_dir
+
+CATALOG_VERSION = 1
+
+# Words that never identify an app ("open the calculator app")
+_FILLER_WORDS = {"the", "my", "a", "app", "application", "program"}
+_NAME_SUFFIXES = (".exe", ".lnk", ".desktop", ".app", ".bat", ".cmd", ".com")
+# Freedesktop Exec field codes (%f, %U, ...), which are placeholders for arguments
+_FIELD_CODE = re.compile(r"^%[a-zA-Z]$")
+
+# Inexact lookups remembered until the next rebuild
+_RESOLVED_CACHE_SIZE = 1024
+
+# Rank of the name an entry is indexed under (lower wins); aliases rank as names
+NAME_RANK, KEYWORD_RANK = 0, 1
+# Installed-app sources beat bare executables on PATH
+_SOURCE_RANK = {"desktop": 0, "start-menu": 0, "bundle": 0, "path": 1}
+# Sources that describe apps meant to be launched; PATH entries are bare
+# executables and only ever match by their exact name
+INSTALLED_SOURCES = frozenset({"desktop", "start-menu", "bundle"})
+
+# System binaries that are never launched by name, however they are matched
+DENIED_COMMANDS = frozenset({
+    "poweroff", "shutdown", "reboot", "halt", "init", "telinit", "systemctl", "loginctl", "logoff",
+    "kill", "killall", "pkill", "taskkill", "xkill",
+    "rm", "rmdir", "del", "dd", "mkfs", "wipefs", "fdisk", "parted", "format", "diskpart",
+    "sudo", "su", "doas", "pkexec", "runas",
+})
+
+
+class AppEntry(NamedTuple):
+    name: str
+    command: Tuple[str, ...]
+    source: str  # "path", "desktop", "start-menu" or "bundle"
+    shell: bool = False
+    aliases: Tuple[str, ...] = ()  # Executable and file names
+    keywords: Tuple[str, ...] = ()  # Generic names and keywords
+
+    @property
+    def process_name(self) -> str:
+        """The name the app has in the process table.
+
+        For a command run directly that is its executable; shortcuts and
+        bundles are started by a launcher, and their process is named
+        after them.
+        """
+        if self.shell or self.source == "bundle":
+            return self.name
+        return os.path.basename(self.command[0])
+
+
+def _words(name: str) -> List[str]:
+    name = name.strip().lower()
+    for suffix in _NAME_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    return re.findall(r"[a-z0-9]+", name)
+
+
+def normalize_app_name(name: str) -> str:
+    """Catalog key for an app name ('Visual Studio Code' -> 'visualstudiocode', 'Code.exe' -> 'code')."""
+    return "".join(_words(name))
+
+
+def is_denied(name: str) -> bool:
+    """Whether ``name`` (an app name or executable path) is a denied system binary."""
+    return normalize_app_name(os.path.basename(str(name).replace("\\", "/"))) in DENIED_COMMANDS
+
+
+def _denied_entry(entry: "AppEntry") -> bool:
+    # Shell commands are wrappers ('start "" "X.lnk"'), so only their name says what they run
+    return is_denied(entry.name) or (not entry.shell and is_denied(entry.command[0]))
+
+
+def _file_stem(path: str) -> str:
+    stem = os.path.basename(path)
+    for suffix in _NAME_SUFFIXES:
+        if stem.lower().endswith(suffix):
+            return stem[:-len(suffix)]
+    return stem
+
+
+def default_source_dirs(system: Optional[str] = None) -> Dict[str, List[str]]:
+    """Directories scanned for each source on ``system``."""
+    system = system or platform.system()
+    path_dirs = [d for d in os.environ.get("PATH", "").split(os.pathsep) if d]
+    dirs: Dict[str, List[str]] = {"path": path_dirs, "desktop": [], "start-menu": [], "bundle": []}
+    if system == "Windows":
+        for base in (os.environ.get("APPDATA"), os.environ.get("PROGRAMDATA")):
+            if base:
+                dirs["start-menu"].append(os.path.join(base, "Microsoft", "Windows", "Start Menu", "Programs"))
+    elif system == "Darwin":
+        dirs["bundle"] = ["/Applications", "/System/Applications", "/System/Applications/Utilities",
+                          os.path.expanduser("~/Applications")]
+    else:
+        data_home = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+        data_dirs = os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share"
+        dirs["desktop"] = [os.path.join(d, "applications") for d in [data_home, *data_dirs.split(":")] if d]
+    return dirs
+
+
+def _walk_dirs(root: str) -> Iterator[str]:
+    """``root`` and every directory below it (symlinked directories are not followed)."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        yield directory
+        try:
+            with os.scandir(directory) as entries:
+                stack.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+        except OSError:
+            pass
+
+
+def _scan_path(directory: str, system: str) -> Iterator[AppEntry]:
+    if system == "Windows":
+        extensions = {ext.lower() for ext in os.environ.get("PATHEXT", ".COM;.EXE;.BAT;.CMD").split(";") if ext}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                if system == "Windows":
+                    if os.path.splitext(entry.name)[1].lower() not in extensions:
+                        continue
+                elif not os.access(entry.path, os.X_OK):
+                    continue
+                name = _file_stem(entry.name) if system == "Windows" else entry.name
+                yield AppEntry(name, (entry.path,), "path")
+    except OSError:
+        return
+
+
+def parse_desktop_file(path: str) -> Optional[AppEntry]:
+    """AppEntry for a freedesktop ``.desktop`` file, or None if it is not a visible application."""
+    parser = ConfigParser(interpolation=None, strict=False)
+    parser.optionxform = str
+    try:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            parser.read_file(f)
+    except (OSError, ConfigParserError):
+        return None
+    if not parser.has_section("Desktop Entry"):
+        return None
+    section = parser["Desktop Entry"]
+    if (section.get("Type", "Application") != "Application"
+            or section.get("NoDisplay", "").lower() == "true" or section.get("Hidden", "").lower() == "true"):
+        return None
+    name, exec_line = section.get("Name"), section.get("Exec")
+    if not name or not exec_line:
+        return None
+    try:
+        command = tuple(arg for arg in shlex.split(exec_line) if not _FIELD_CODE.match(arg))
+    except ValueError:
+        return None
+    if not command:
+        return None
+    stem = _file_stem(path)
+    aliases = (os.path.basename(command[0]), stem, stem.rsplit(".", 1)[-1])
+    keywords = tuple(k for k in [section.get("GenericName", ""), *section.get("Keywords", "").split(";")] if k)
+    return AppEntry(name, command, "desktop", False, aliases, keywords)
+
+
+def _scan_desktop(directory: str) -> Iterator[AppEntry]:
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".desktop"):
+                    app = parse_desktop_file(entry.path)
+                    if app is not None:
+                        yield app
+    except OSError:
+        return
+
+
+def _scan_start_menu(directory: str) -> Iterator[AppEntry]:
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(".lnk"):
+                    # Shortcuts are opened by the shell, which follows the link
+                    yield AppEntry(_file_stem(entry.name), (f'start "" "{entry.path}"',), "start-menu", True)
+    except OSError:
+        return
+
+
+def _scan_bundles(directory: str) -> Iterator[AppEntry]:
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.endswith(".app"):
+                    yield AppEntry(_file_stem(entry.name), ("open", "-a", entry.path), "bundle")
+    except OSError:
+        return
+
+
+_SCANNERS = {"desktop": _scan_desktop, "start-menu": _scan_start_menu, "bundle": _scan_bundles}
+# Sources whose subdirectories are scanned too
+_RECURSIVE_SOURCES = ("desktop", "start-menu")
+
+
+class _TrieNode:
+    __slots__ = ("children", "key")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.key: Optional[str] = None
+
+
+class AppCatalog:
+    """Installed applications, resolvable by spoken name.
+
+    The catalog is scanned once from the executables on ``PATH``, XDG
+    ``.desktop`` files (Linux), Start-menu shortcuts (Windows) and app
+    bundles (macOS), and persisted as JSON together with the mtime of every
+    scanned directory; a later load reuses it unless one of those
+    directories changed. Names are indexed in a dict and a prefix trie, and
+    ``resolve`` tries, in order: the exact name, the longest known phrase
+    inside the name ("firefox browser"), a prefix ("libreoff") and finally a
+    bounded edit-distance search over the trie ("fierfox"). Only installed
+    apps (desktop files, Start-menu shortcuts, bundles) take part in the
+    inexact steps; a bare executable on PATH must be named exactly, and
+    system binaries in ``DENIED_COMMANDS`` are not indexed at all.
+    """
+
+    def __init__(self, cache_path: Optional[str] = None, system: Optional[str] = None,
+                 source_dirs: Optional[Dict[str, List[str]]] = None, check_interval: float = 30.0):
+        self.system = system or platform.system()
+        self._cache_path = cache_path
+        self.source_dirs = source_dirs if source_dirs is not None else default_source_dirs(self.system)
+        self.check_interval = check_interval
+        self.entries: List[AppEntry] = []
+        self._dir_mtimes: Dict[str, Optional[float]] = {}
+        self._index: Dict[str, List[Tuple[Tuple[int, int, int], int]]] = {}
+        self._trie = _TrieNode()
+        self._resolved: Dict[Tuple[str, bool], Optional[AppEntry]] = {}
+        self._loaded = False
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[AppEntry], system: Optional[str] = None) -> "AppCatalog":
+        """A catalog over fixed entries, with no scanning or persistence."""
+        catalog = cls(system=system, source_dirs={}, check_interval=float("inf"))
+        catalog._set_entries(list(entries), {})
+        catalog._loaded = True
+        return catalog
+
+    @property
+    def cache_path(self) -> str:
+        if self._cache_path is None:
+            self._cache_path = os.path.join(get_cache_dir("catalog"), f"apps-{self.system.lower()}.json")
+        return self._cache_path
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self.entries)
+
+    # Loading
+
+    def _ensure_loaded(self) -> None:
+        with self._lock:
+            if not self._loaded:
+                if not self._load_cache():
+                    self._rebuild()
+                self._loaded = True
+                self._checked_at = time.monotonic()
+
+    def _load_cache(self) -> bool:
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != CATALOG_VERSION or data.get("system") != self.system:
+            return False
+        if data.get("sources") != self.source_dirs or self._stale(data.get("dir_mtimes", {})):
+            return False
+        entries = [AppEntry(e["name"], tuple(e["command"]), e["source"], e["shell"],
+                            tuple(e["aliases"]), tuple(e["keywords"])) for e in data["entries"]]
+        self._set_entries(entries, data["dir_mtimes"])
+        return True
+
+    def _rebuild(self) -> None:
+        entries, dir_mtimes = self.scan()
+        self._set_entries(entries, dir_mtimes)
+        self.save()
+
+    def scan(self) -> Tuple[List[AppEntry], Dict[str, Optional[float]]]:
+        """Scan every source; returns the entries and the mtime of each scanned directory."""
+        entries: List[AppEntry] = []
+        dir_mtimes: Dict[str, Optional[float]] = {}
+        for source, roots in self.source_dirs.items():
+            for root in roots:
+                directories = _walk_dirs(root) if source in _RECURSIVE_SOURCES else [root]
+                for directory in directories:
+                    dir_mtimes[directory] = _mtime(directory)
+                    if dir_mtimes[directory] is None:
+                        continue
+                    if source == "path":
+                        entries.extend(_scan_path(directory, self.system))
+                    else:
+                        entries.extend(_SCANNERS[source](directory))
+        return entries, dir_mtimes
+
+    def save(self) -> None:
+        data = {
+            "version": CATALOG_VERSION,
+            "system": self.system,
+            "sources": self.source_dirs,
+            "dir_mtimes": self._dir_mtimes,
+            "entries": [entry._asdict() for entry in self.entries],
+        }
+        tmp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError:
+            # A read-only cache only costs a rescan next time
+            pass
+
+    @staticmethod
+    def _stale(dir_mtimes: Dict[str, Optional[float]]) -> bool:
+        return any(_mtime(directory) != mtime for directory, mtime in dir_mtimes.items())
+
+    def refresh(self, force: bool = False) -> bool:
+        """Rescan if a source directory changed (checked at most every ``check_interval`` seconds).
+
+        Returns whether the catalog was rebuilt.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._ensure_loaded()
+                return True
+            now = time.monotonic()
+            if not force and now - self._checked_at < self.check_interval:
+                return False
+            self._checked_at = now
+            if not force and not self._stale(self._dir_mtimes):
+                return False
+            self._rebuild()
+            return True
+
+    def _set_entries(self, entries: List[AppEntry], dir_mtimes: Dict[str, Optional[float]]) -> None:
+        entries = [entry for entry in entries if not _denied_entry(entry)]
+        index: Dict[str, List[Tuple[Tuple[int, int, int], int]]] = {}
+        trie = _TrieNode()
+
+        def add(name: str, name_rank: int, position: int) -> None:
+            key = normalize_app_name(name)
+            if not key:
+                return
+            rank = (name_rank, _SOURCE_RANK.get(entries[position].source, 1), len(key))
+            if key not in index:
+                index[key] = []
+                node = trie
+                for char in key:
+                    node = node.children.setdefault(char, _TrieNode())
+                node.key = key
+            index[key].append((rank, position))
+
+        for position, entry in enumerate(entries):
+            add(entry.name, NAME_RANK, position)
+            if entry.source not in INSTALLED_SOURCES:
+                continue
+            # Trailing words of a multi-word name ("chrome" for "Google Chrome")
+            words = _words(entry.name)
+            for start in range(1, len(words)):
+                add(" ".join(words[start:]), KEYWORD_RANK, position)
+            for alias in entry.aliases:
+                add(alias, NAME_RANK, position)
+            for keyword in entry.keywords:
+                add(keyword, KEYWORD_RANK, position)
+        for candidates in index.values():
+            candidates.sort()
+
+        self.entries, self._dir_mtimes, self._index, self._trie = entries, dict(dir_mtimes), index, trie
+        self._resolved = {}
+
+    # Lookups
+
+    def _candidate(self, key: str, installed_only: bool = False) -> Optional[Tuple[Tuple[int, int, int], int]]:
+        """Best (rank, position) indexed under ``key``."""
+        for candidate in self._index.get(key, ()):
+            if not installed_only or self.entries[candidate[1]].source in INSTALLED_SOURCES:
+                return candidate
+        return None
+
+    def _best(self, key: str, installed_only: bool = False) -> Optional[AppEntry]:
+        candidate = self._candidate(key, installed_only)
+        return self.entries[candidate[1]] if candidate else None
+
+    def get(self, name: str) -> Optional[AppEntry]:
+        """Exact lookup by (normalized) name, alias or keyword."""
+        self._ensure_loaded()
+        return self._best(normalize_app_name(name))
+
+    def complete(self, prefix: str, limit: int = 10, installed_only: bool = False) -> List[AppEntry]:
+        """Entries indexed under a name starting with ``prefix``, best first."""
+        self._ensure_loaded()
+        key = normalize_app_name(prefix)
+        node = self._trie
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        ranked = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.key is not None:
+                candidate = self._candidate(node.key, installed_only)
+                if candidate is not None:
+                    ranked.append(candidate)
+            stack.extend(node.children.values())
+        ranked.sort()
+        result, seen = [], set()
+        for _, position in ranked:
+            if position not in seen:
+                seen.add(position)
+                result.append(self.entries[position])
+                if len(result) == limit:
+                    break
+        return result
+
+    def fuzzy(self, name: str, max_distance: Optional[int] = None,
+              installed_only: bool = False) -> List[Tuple[int, AppEntry]]:
+        """(edit distance, entry) for names within ``max_distance`` edits of ``name``, closest first.
+
+        The default bound is 1 edit for names up to 5 characters and 2 above;
+        names shorter than 4 characters are not matched fuzzily.
+        """
+        self._ensure_loaded()
+        word = normalize_app_name(name)
+        if max_distance is None:
+            if len(word) < 4:
+                return []
+            max_distance = 1 if len(word) <= 5 else 2
+        matches: List[Tuple[int, str]] = []
+        first_row = list(range(len(word) + 1))
+        # Levenshtein rows computed along the trie; a branch is dropped once
+        # every cell of its row exceeds the bound
+        stack = [(child, char, first_row) for char, child in self._trie.children.items()]
+        while stack:
+            node, char, previous = stack.pop()
+            left = previous[0] + 1
+            row = [left]
+            for target, diagonal, above in zip(word, previous, previous[1:]):
+                left = min(left + 1, above + 1, diagonal + (target != char))
+                row.append(left)
+            if node.key is not None and row[-1] <= max_distance:
+                matches.append((row[-1], node.key))
+            if min(row) <= max_distance:
+                stack.extend((child, next_char, row) for next_char, child in node.children.items())
+        candidates = ((distance, self._candidate(key, installed_only)) for distance, key in matches)
+        ranked = sorted((distance, candidate) for distance, candidate in candidates if candidate is not None)
+        result, seen = [], set()
+        for distance, (_, position) in ranked:
+            if position not in seen:
+                seen.add(position)
+                result.append((distance, self.entries[position]))
+        return result
+
+    def resolve(self, name: str, partial: bool = True) -> Optional[AppEntry]:
+        """Best entry for a spoken app name, or None.
+
+        With ``partial=False`` only the whole name is matched (exactly or
+        within the fuzzy bound), for callers that must not guess from a
+        fragment of free text.
+        """
+        self._ensure_loaded()
+        words = _words(name)
+        words = [w for w in words if w not in _FILLER_WORDS] or words
+        key = "".join(words)
+        if not key:
+            return None
+
+        entry = self._best(key)
+        if entry is not None:
+            return entry
+
+        # Fuzzy and partial matches take milliseconds; remember them until the next rebuild
+        memo_key = (" ".join(words), partial)
+        if memo_key in self._resolved:
+            return self._resolved[memo_key]
+        entry = self._resolve_inexact(words, key, partial)
+        if len(self._resolved) >= _RESOLVED_CACHE_SIZE:
+            self._resolved.clear()
+        self._resolved[memo_key] = entry
+        return entry
+
+    def _resolve_inexact(self, words: List[str], key: str, partial: bool) -> Optional[AppEntry]:
+        if partial:
+            # Longest known phrase inside the name, leftmost first
+            for length in range(len(words) - 1, 0, -1):
+                for start in range(len(words) - length + 1):
+                    phrase = "".join(words[start:start + length])
+                    if len(phrase) >= 3:
+                        entry = self._best(phrase, installed_only=True)
+                        if entry is not None:
+                            return entry
+            if len(key) >= 3:
+                completions = self.complete(key, limit=1, installed_only=True)
+                if completions:
+                    return completions[0]
+
+        matches = self.fuzzy(key, installed_only=True)
+        return matches[0][1] if matches else None
+
+
+def _mtime(path: str) -> Optional[float]:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+_catalogs: Dict[str, AppCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+
+def get_app_catalog(system: Optional[str] = None) -> AppCatalog:
+    """Return the process-wide catalog for ``system``; it is loaded on first use."""
+    system = system or platform.system()
+    with _catalogs_lock:
+        if system not in _catalogs:
+            _catalogs[system] = AppCatalog(system=system)
+        return _catalogs[system]
@@ -1,17 +1,19 @@
-import subprocess
-import time
 import re
-import platform
-import pyautogui
-import pygetwindow as gw
-import os
-from typing import List, Union
+from typing import List, Optional, Union
 from langchain.agents import Tool
 from langchain_core.messages import AIMessage, HumanMessage
+from .calculator_session import CalculatorSession
+from .expression import evaluate, evaluate_batch, find_expressions
+from .tracing import traced
+
+# An operator after an operand, or a function call; "500" or "pi" alone is not a calculation
+_CALCULATION = re.compile(r"[\w)]\s*(?:\*\*|//|[-+*/%])|\(")
+
 
 class CalculationAgent:
-    def __init__(self, llm):
+    def __init__(self, llm, session: Optional[CalculatorSession] = None):
         self.llm = llm
+        self.session = session or CalculatorSession()
         self.tools = self._setup_tools()
     
     def _setup_tools(self) -> List[Tool]:
@@ -19,95 +21,89 @@ class CalculationAgent:
             Tool(
                 name="calculator",
                 func=self._perform_calculation,
+                coroutine=self._aperform_calculation,
                 description="Performs calculations and shows results in calculator. "
-                          "Format: 'calculate [expression]' or '3+5+2'"
+                          "Format: 'calculate [expression]' or '3+5+2'. "
+                          "Several expressions separated by commas, semicolons or new lines are "
+                          "evaluated together and totalled"
             )
         ]
 
     def _safe_eval(self, expression: str) -> float:
         """Securely evaluate mathematical expressions"""
-        sanitized = re.sub(r'[^\d\+\-\*\/\(\)\.]', '', expression)
-        if not sanitized:
+        if not expression.strip():
             raise ValueError("No valid expression found")
-        return eval(sanitized)
+        return evaluate(expression)
 
+    def _calculate_many(self, expressions: List[str]) -> str:
+        """Evaluate a list of expressions in one vectorized batch"""
+        lines = []
+        total = 0
+        for expression, result in zip(expressions, evaluate_batch(expressions)):
+            if isinstance(result, Exception):
+                lines.append(f"{expression} = error: {result}")
+            else:
+                lines.append(f"{expression} = {result}")
+                total += result
+        lines.append(f"Total: {total}")
+        return "Results:\n" + "\n".join(lines)
+
+    @traced('calculate')
     def _perform_calculation(self, input_text: str) -> str:
-        """Handle calculations with residual value prevention"""
+        """Handle calculations in the persistent calculator session"""
         try:
-            # Extract and validate expression
-            original_expression = self._extract_expression(input_text)
-            if not original_expression:
+            expressions = self._extract_expressions(input_text)
+            if len(expressions) > 1:
+                return self._calculate_many(expressions)
+            if not expressions:
                 return "Please provide a valid mathematical expression"
+            original_expression = expressions[0]
 
             # Calculate actual result
             result = self._safe_eval(original_expression)
             
-            # Create residual-neutral expression
-            neutral_expression = f"{original_expression}+0"
-            
-            # Refresh calculator instance
-            self._close_calculator()
-            self._launch_calculator()
-            time.sleep(1.5)
-            self._focus_calculator()
-            
-            # Input neutralized expression
-            pyautogui.write(f'{neutral_expression}=')
-            time.sleep(0.3)
-            pyautogui.press('enter')
+            # The session clears the display first, so no residual value leaks in
+            self.session.show(original_expression)
             
             return f"Result: {original_expression} = {result}"
 
         except Exception as e:
             return f"Calculation error: {str(e)}"
 
-    def _extract_expression(self, text: str) -> str:
-        """Improved expression extraction"""
-        # Remove command words and previous residuals
-        clean_text = re.sub(r'\b(calculate|calc|calculator|\.exe|open)\b', '', text, flags=re.IGNORECASE)
-        match = re.search(r'((?:[\d\(\)][\+\-\*\/\(\)\d\. ]+))', clean_text)
-        return match.group(1).strip() if match else ''
+    @traced('calculate')
+    async def _aperform_calculation(self, input_text: str) -> str:
+        """Async version of _perform_calculation; waits without blocking the loop"""
+        try:
+            expressions = self._extract_expressions(input_text)
+            if len(expressions) > 1:
+                return self._calculate_many(expressions)
+            if not expressions:
+                return "Please provide a valid mathematical expression"
+            original_expression = expressions[0]
 
-    def _launch_calculator(self):
-        """Platform-specific calculator launch"""
-        system = platform.system()
-        if system == "Windows":
-            subprocess.Popen("calc.exe")
-        elif system == "Darwin":
-            subprocess.Popen(["/System/Applications/Calculator.app/Contents/MacOS/Calculator"])
-        elif system == "Linux":
-            subprocess.Popen(["gnome-calculator"])
+            result = self._safe_eval(original_expression)
+            await self.session.ashow(original_expression)
+            
+            return f"Result: {original_expression} = {result}"
 
-    def _close_calculator(self):
-        """Close existing calculator instances"""
-        system = platform.system()
-        try:
-            if system == "Windows":
-                os.system("taskkill /f /im calculator.exe")
-            elif system == "Darwin":
-                os.system("pkill Calculator")
-            elif system == "Linux":
-                os.system("pkill gnome-calculator")
-        except:
-            pass
+        except Exception as e:
+            return f"Calculation error: {str(e)}"
 
-    def _focus_calculator(self):
-        """Bring calculator to foreground"""
-        system = platform.system()
-        if system == "Windows":
-            windows = gw.getWindowsWithTitle("Calculator")
-            if windows:
-                windows[0].activate()
-        elif system == "Darwin":
-            applescript = '''
-            tell application "Calculator" to activate
-            '''
-            subprocess.run(["osascript", "-e", applescript])
-        elif system == "Linux":
-            subprocess.Popen(["wmctrl", "-a", "Calculator"])
+    def _extract_expressions(self, text: str) -> List[str]:
+        """The calculations in ``text``; a lone number or constant when there is none"""
+        expressions = find_expressions(text)
+        # Bare numbers ("these 500 totals") are counts, not calculations
+        calculations = [expression for expression in expressions if _CALCULATION.search(expression)]
+        return calculations or expressions[:1]
 
     def run(self, input_text: str, chat_history: List[Union[HumanMessage, AIMessage]] = None) -> str:
         try:
             return self._perform_calculation(input_text)
         except Exception as e:
-            return f"Error: {str(e)}"
\ No newline at end of file
+            return f"Error: {str(e)}"
+
+    async def arun(self, input_text: str, chat_history: List[Union[HumanMessage, AIMessage]] = None) -> str:
+        try:
+            return await self._aperform_calculation(input_text)
+        except Exception as e:
+            return f"Error: {str(e)}"
@@ -0,0 +1,221 @@
+import asyncio
+import platform
+import subprocess
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Optional
+
+from .scheduler import FOCUS, requires
+from .tracing import span
+
+
+class WindowBackend(ABC):
+    """Platform hooks CalculatorSession uses to drive the calculator window."""
+
+    @abstractmethod
+    def launch(self) -> None:
+        ...
+
+    @abstractmethod
+    def find_window(self) -> Optional[Any]:
+        """Return a handle for an open calculator window, or None."""
+
+    @abstractmethod
+    def is_alive(self, handle: Any) -> bool:
+        ...
+
+    @abstractmethod
+    def focus(self, handle: Any) -> None:
+        ...
+
+    def clear(self) -> None:
+        """Clear the display (Escape works on Windows, macOS and GNOME calculators)."""
+        import pyautogui
+        pyautogui.press('escape')
+
+    def type_expression(self, expression: str) -> None:
+        import pyautogui
+        pyautogui.write(expression)
+
+    def submit(self) -> None:
+        import pyautogui
+        pyautogui.press('enter')
+
+
+class WindowsCalculatorBackend(WindowBackend):
+    def launch(self) -> None:
+        subprocess.Popen("calc.exe")
+
+    def find_window(self):
+        import pygetwindow as gw
+        windows = gw.getWindowsWithTitle("Calculator")
+        return windows[0] if windows else None
+
+    def is_alive(self, handle) -> bool:
+        import win32gui
+        return bool(win32gui.IsWindow(handle._hWnd))
+
+    def focus(self, handle) -> None:
+        if not handle.isActive:
+            handle.activate()
+
+
+class MacCalculatorBackend(WindowBackend):
+    def __init__(self):
+        self._process: Optional[subprocess.Popen] = None
+
+    def launch(self) -> None:
+        self._process = subprocess.Popen(["/System/Applications/Calculator.app/Contents/MacOS/Calculator"])
+
+    def find_window(self):
+        result = subprocess.run(["pgrep", "-x", "Calculator"], stdout=subprocess.PIPE, text=True)
+        pids = result.stdout.split()
+        return int(pids[0]) if pids else None
+
+    def is_alive(self, handle) -> bool:
+        try:
+            import psutil
+            return psutil.pid_exists(handle)
+        except ImportError:
+            return self._process is not None and self._process.poll() is None
+
+    def focus(self, handle) -> None:
+        subprocess.run(["osascript", "-e", 'tell application "Calculator" to activate'])
+
+
+class LinuxCalculatorBackend(WindowBackend):
+    """gnome-calculator driven through wmctrl.
+
+    The window id is looked up once (while waiting for the window to appear) and
+    then focused directly by id; liveness is checked on the process handle.
+    """
+
+    def __init__(self, title: str = "Calculator"):
+        self.title = title
+        self._process: Optional[subprocess.Popen] = None
+
+    def launch(self) -> None:
+        self._process = subprocess.Popen(["gnome-calculator"])
+
+    def find_window(self):
+        result = subprocess.run(["wmctrl", "-l"], stdout=subprocess.PIPE, text=True)
+        for line in result.stdout.splitlines():
+            parts = line.split(None, 3)
+            if len(parts) == 4 and self.title in parts[3]:
+                return parts[0]
+        return None
+
+    def is_alive(self, handle) -> bool:
+        # A calculator we did not launch is re-checked by id
+        if self._process is None:
+            return self.find_window() == handle
+        return self._process.poll() is None
+
+    def focus(self, handle) -> None:
+        subprocess.run(["wmctrl", "-i", "-a", handle])
+
+
+def default_backend() -> WindowBackend:
+    system = platform.system()
+    if system == "Windows":
+        return WindowsCalculatorBackend()
+    elif system == "Darwin":
+        return MacCalculatorBackend()
+    return LinuxCalculatorBackend()
+
+
+class CalculatorSession:
+    """Keeps one calculator instance alive and reuses it across calculations.
+
+    Instead of killing and relaunching the app with fixed sleeps, the session
+    caches the window handle, polls for the window only when it has to launch
+    one (up to ``ready_timeout`` seconds) and clears the display with keystrokes.
+    """
+
+    def __init__(self, backend: Optional[WindowBackend] = None, ready_timeout: float = 5.0,
+                 poll_interval: float = 0.05, clock: Callable[[], float] = time.monotonic):
+        self.backend = backend or default_backend()
+        self.ready_timeout = ready_timeout
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.launches = 0
+        self._handle = None
+        self._lock = threading.Lock()
+
+    def _cached_handle(self):
+        if self._handle is not None and self.backend.is_alive(self._handle):
+            return self._handle
+        self._handle = self.backend.find_window()
+        return self._handle
+
+    def _launch(self) -> float:
+        self.backend.launch()
+        self.launches += 1
+        return self.clock() + self.ready_timeout
+
+    def ensure_ready(self):
+        """Return the calculator window handle, launching the app if needed."""
+        handle = self._cached_handle()
+        if handle is not None:
+            return handle
+
+        with span("calculator.wait_window", "sleep"):
+            deadline = self._launch()
+            while True:
+                handle = self.backend.find_window()
+                if handle is not None:
+                    self._handle = handle
+                    return handle
+                if self.clock() >= deadline:
+                    raise TimeoutError(f"Calculator window did not appear within {self.ready_timeout}s")
+                time.sleep(self.poll_interval)
+
+    async def aensure_ready(self):
+        """Async version of ensure_ready; polls without blocking the event loop.
+
+        Backend calls (window lookups, the launch) run on worker threads.
+        """
+        handle = await asyncio.to_thread(self._cached_handle)
+        if handle is not None:
+            return handle
+
+        with span("calculator.wait_window", "sleep"):
+            deadline = await asyncio.to_thread(self._launch)
+            while True:
+                handle = await asyncio.to_thread(self.backend.find_window)
+                if handle is not None:
+                    self._handle = handle
+                    return handle
+                if self.clock() >= deadline:
+                    raise TimeoutError(f"Calculator window did not appear within {self.ready_timeout}s")
+                await asyncio.sleep(self.poll_interval)
+
+    def _enter(self, handle, expression: str) -> None:
+        self.backend.focus(handle)
+        self.backend.clear()
+        self.backend.type_expression(expression)
+        self.backend.submit()
+
+    def _locked_enter(self, handle, expression: str) -> None:
+        with self._lock:
+            self._enter(handle, expression)
+
+    @requires(FOCUS)
+    def show(self, expression: str) -> None:
+        """Type ``expression`` into the calculator and evaluate it."""
+        with self._lock:
+            self._enter(self.ensure_ready(), expression)
+
+    @requires(FOCUS)
+    async def ashow(self, expression: str) -> None:
+        # Keystrokes go to whichever window has focus, so never interleave
+        # them with a concurrent sync caller (or any other GUI-driving tool).
+        # Focusing and typing block (pyautogui pauses after every call), so
+        # they run on a worker thread, which also takes the session lock
+        handle = await self.aensure_ready()
+        await asyncio.to_thread(self._locked_enter, handle, expression)
+
+    def invalidate(self) -> None:
+        """Forget the cached window (e.g. after the user closed it)."""
+        self._handle = None
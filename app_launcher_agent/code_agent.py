@@ -1,8 +1,8 @@
 from typing import List, Union
 from langchain.agents import AgentExecutor, Tool, create_react_agent
-from langchain import hub
 from langchain_core.messages import AIMessage, HumanMessage
 from .tools import CodeGenerationTool
+from .prompts import load_react_prompt
 
 class CodeGenerationAgent:
     def __init__(self, llm):
@@ -25,15 +25,16 @@ class CodeGenerationAgent:
             Tool(
                 name="code_generator",
                 func=code_tool.generate_and_write_code,
+                coroutine=code_tool.agenerate_and_write_code,
                 description="Useful for generating code snippets and writing them to text editors. "
                           "Input should specify language, problem, and editor. "
-                          "Example: 'Python Fibonacci in notepad.exe'"
+                          "Example: 'Python Fibonacci in notepad.exe'."
             )
         ]
     
     def _setup_agent(self):
         """Initialize and return the agent."""
-        prompt = hub.pull("hwchase17/react-chat")
+        prompt = load_react_prompt()
         return create_react_agent(
             llm=self.llm,
             tools=self.tools,
@@ -91,5 +92,17 @@ class CodeGenerationAgent:
                 "chat_history": chat_history or []
             })
             return result["output"]
+        except Exception as e:
+            return f"Error generating code: {str(e)}"
+    
+    async def arun(self, input_text: str, chat_history: List[Union[HumanMessage, AIMessage]] = None) -> str:
+        """Async version of run() built on AgentExecutor.ainvoke."""
+        try:
+            parsed = self._parse_input(input_text)
+            result = await self.agent_executor.ainvoke({
+                "input": f"Generate {parsed['language']} code for {parsed['problem']} and write to {parsed['editor']}",
+                "chat_history": chat_history or []
+            })
+            return result["output"]
         except Exception as e:
             return f"Error generating code: {str(e)}"
\ No newline at end of file
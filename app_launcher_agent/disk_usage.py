@@ -0,0 +1,169 @@
+import heapq
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+# Files directly inside the scanned path are totalled under this bucket
+ROOT_BUCKET = "."
+
+
+class FolderUsage(NamedTuple):
+    name: str
+    size: int
+    files: int
+
+
+class UsageReport(NamedTuple):
+    path: str
+    size: int
+    files: int
+    directories: int
+    folders: List[FolderUsage]
+    largest: List[Tuple[int, str]]
+    complete: bool
+    elapsed: float
+
+
+class _DirectoryResult(NamedTuple):
+    size: int
+    files: int
+    subdirectories: List[str]
+    largest: List[Tuple[int, str]]
+
+
+class DiskUsageScanner:
+    """Summarizes disk usage below a path with a pool of ``os.scandir`` workers.
+
+    Each worker reads one directory and hands its subdirectories back to the
+    coordinator, which schedules them until the tree, ``max_depth`` or the
+    ``time_budget`` is exhausted (the report is then marked incomplete).
+    Hard-linked files are counted once (on Windows, where ``DirEntry.stat``
+    leaves the link count unset, each file costs an extra ``os.stat`` for
+    that). Complete reports are cached by path
+    and the directory's mtime for ``cache_ttl`` seconds, because a deep
+    change does not touch the top directory's mtime.
+    """
+
+    def __init__(self, max_workers: int = 8, cache_size: int = 32, cache_ttl: float = 300.0):
+        self.max_workers = max_workers
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._cache: "OrderedDict[tuple, Tuple[float, float, UsageReport]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def scan(self, path: str, top_n: int = 10, max_depth: Optional[int] = None,
+             time_budget: Optional[float] = None) -> UsageReport:
+        path = os.path.abspath(path)
+        mtime = os.stat(path).st_mtime
+        key = (path, top_n, max_depth)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == mtime and time.monotonic() - cached[1] < self.cache_ttl:
+                self._cache.move_to_end(key)
+                return cached[2]
+
+        report = self._scan(path, top_n, max_depth, time_budget)
+        if report.complete:
+            with self._lock:
+                self._cache[key] = (mtime, time.monotonic(), report)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return report
+
+    def clear_cache(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def _scan(self, path: str, top_n: int, max_depth: Optional[int], time_budget: Optional[float]) -> UsageReport:
+        start = time.monotonic()
+        deadline = start + time_budget if time_budget is not None else None
+        seen_inodes: Set[Tuple[int, int]] = set()
+        inode_lock = threading.Lock()
+        buckets: Dict[str, List[int]] = {ROOT_BUCKET: [0, 0]}
+        largest: List[Tuple[int, str]] = []
+        directories = 0
+        complete = True
+
+        def scan_directory(directory: str) -> _DirectoryResult:
+            size = files = 0
+            subdirectories, local_largest = [], []
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirectories.append(entry.path)
+                                continue
+                            stat = entry.stat(follow_symlinks=False)
+                            if not stat.st_nlink:
+                                # Windows DirEntry stats report st_nlink, st_ino and st_dev as 0
+                                stat = os.stat(entry.path, follow_symlinks=False)
+                        except OSError:
+                            continue
+                        if stat.st_nlink > 1:
+                            inode = (stat.st_dev, stat.st_ino)
+                            with inode_lock:
+                                if inode in seen_inodes:
+                                    continue
+                                seen_inodes.add(inode)
+                        size += stat.st_size
+                        files += 1
+                        if len(local_largest) < top_n:
+                            heapq.heappush(local_largest, (stat.st_size, entry.path))
+                        elif top_n and stat.st_size > local_largest[0][0]:
+                            heapq.heapreplace(local_largest, (stat.st_size, entry.path))
+            except OSError:
+                pass
+            return _DirectoryResult(size, files, subdirectories, local_largest)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="disk-usage") as pool:
+            running = {pool.submit(scan_directory, path): (ROOT_BUCKET, 0)}
+            while running:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                finished, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not finished:
+                    complete = False
+                    for future in running:
+                        future.cancel()
+                    break
+
+                for future in finished:
+                    bucket, depth = running.pop(future)
+                    result = future.result()
+                    totals = buckets.setdefault(bucket, [0, 0])
+                    totals[0] += result.size
+                    totals[1] += result.files
+                    for item in result.largest:
+                        if len(largest) < top_n:
+                            heapq.heappush(largest, item)
+                        elif item[0] > largest[0][0]:
+                            heapq.heapreplace(largest, item)
+
+                    if max_depth is not None and depth >= max_depth:
+                        complete = complete and not result.subdirectories
+                        continue
+                    if deadline is not None and time.monotonic() >= deadline:
+                        complete = False
+                        continue
+                    for subdirectory in result.subdirectories:
+                        directories += 1
+                        child_bucket = os.path.basename(subdirectory) if bucket == ROOT_BUCKET else bucket
+                        buckets.setdefault(child_bucket, [0, 0])
+                        running[pool.submit(scan_directory, subdirectory)] = (child_bucket, depth + 1)
+
+        folders = sorted((FolderUsage(name, size, files) for name, (size, files) in buckets.items()),
+                         key=lambda folder: folder.size, reverse=True)
+        return UsageReport(
+            path=path,
+            size=sum(folder.size for folder in folders),
+            files=sum(folder.files for folder in folders),
+            directories=directories,
+            folders=folders,
+            largest=sorted(largest, reverse=True),
+            complete=complete,
+            elapsed=time.monotonic() - start,
+        )
@@ -0,0 +1,339 @@
+import ast
+import math
+import re
+from decimal import Decimal
+from fractions import Fraction
+from functools import lru_cache, reduce
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MODES = ("float", "decimal", "fraction", "numpy")
+
+_BIN_OPS = (ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv, ast.Mod, ast.Pow)
+_UNARY_OPS = (ast.UAdd, ast.USub)
+
+# Exact powers (int, Fraction, integral Decimal) whose result would exceed this many bits are refused
+MAX_POWER_BITS = 100_000
+
+
+class ExpressionError(ValueError):
+    """Raised for expressions the engine refuses to parse or evaluate."""
+
+
+def _integral(value) -> Optional[int]:
+    """``value`` as an int if it is an integer-valued number, else None."""
+    if isinstance(value, int):
+        return value
+    if isinstance(value, Fraction):
+        return value.numerator if value.denominator == 1 else None
+    if isinstance(value, Decimal) and value.is_finite() and value == value.to_integral_value():
+        return int(value)
+    return None
+
+
+def _exact_bits(value) -> Optional[int]:
+    """Bits in the largest part of an exact value; None for floats and non-integral Decimals."""
+    if isinstance(value, Fraction):
+        return max(abs(value.numerator).bit_length(), value.denominator.bit_length())
+    integral = _integral(value)
+    return None if integral is None else abs(integral).bit_length()
+
+
+def _checked_pow(base, exponent):
+    bits, power = _exact_bits(base), _integral(exponent)
+    if bits is not None and power is not None and abs(base) not in (0, 1):
+        # An int raised to a negative int is a float; Fractions and Decimals stay exact
+        size = power if isinstance(base, int) else abs(power)
+        if bits * size > MAX_POWER_BITS:
+            raise ExpressionError("Exponent too large")
+    result = base ** exponent
+    if isinstance(result, complex):
+        raise ExpressionError("Result is not a real number")
+    return result
+
+
+def _vector_min(*args):
+    return reduce(np.minimum, args)
+
+
+def _vector_max(*args):
+    return reduce(np.maximum, args)
+
+
+_FUNCTIONS: Dict[str, Dict[str, Any]] = {
+    "float": {
+        "abs": abs, "round": round, "min": min, "max": max,
+        "sqrt": math.sqrt, "floor": math.floor, "ceil": math.ceil,
+        "exp": math.exp, "log": math.log, "log10": math.log10,
+        "sin": math.sin, "cos": math.cos, "tan": math.tan,
+    },
+    "decimal": {
+        "abs": abs, "round": round, "min": min, "max": max,
+        "sqrt": lambda x: Decimal(x).sqrt(), "floor": math.floor, "ceil": math.ceil,
+        "exp": lambda x: Decimal(x).exp(), "log": lambda x: Decimal(x).ln(),
+        "log10": lambda x: Decimal(x).log10(),
+    },
+    "fraction": {
+        "abs": abs, "round": round, "min": min, "max": max,
+        "floor": math.floor, "ceil": math.ceil,
+    },
+    "numpy": {
+        "abs": np.abs, "round": np.round, "min": _vector_min, "max": _vector_max,
+        "sqrt": np.sqrt, "floor": np.floor, "ceil": np.ceil,
+        "exp": np.exp, "log": np.log, "log10": np.log10,
+        "sin": np.sin, "cos": np.cos, "tan": np.tan,
+    },
+}
+
+_CONSTANTS: Dict[str, Dict[str, Any]] = {
+    "float": {"pi": math.pi, "e": math.e},
+    "decimal": {"pi": Decimal("3.141592653589793238462643383"), "e": Decimal(1).exp()},
+    "fraction": {},
+    "numpy": {"pi": np.pi, "e": np.e},
+}
+
+FUNCTION_NAMES = frozenset(name for functions in _FUNCTIONS.values() for name in functions)
+CONSTANT_NAMES = frozenset(name for constants in _CONSTANTS.values() for name in constants)
+
+_NUMBER_TYPES = {"decimal": Decimal, "fraction": Fraction}
+_POWER = {"float": _checked_pow, "decimal": _checked_pow, "fraction": _checked_pow, "numpy": np.power}
+
+
+_EVALUATION_ERRORS = (ValueError, ArithmeticError, TypeError)
+
+
+def _parse(source: str) -> ast.Expression:
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ExpressionError(f"Invalid expression: {source!r}") from e
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Expression, ast.Load, ast.operator, ast.unaryop)):
+            if isinstance(node, ast.operator) and not isinstance(node, _BIN_OPS):
+                raise ExpressionError(f"Operator not allowed: {type(node).__name__}")
+            if isinstance(node, ast.unaryop) and not isinstance(node, _UNARY_OPS):
+                raise ExpressionError(f"Operator not allowed: {type(node).__name__}")
+        elif isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise ExpressionError(f"Only numbers are allowed, got {node.value!r}")
+        elif isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.keywords:
+                raise ExpressionError("Only plain function calls are allowed")
+        elif not isinstance(node, (ast.BinOp, ast.UnaryOp, ast.Name)):
+            raise ExpressionError(f"Syntax not allowed: {type(node).__name__}")
+    return tree
+
+
+class _Rewriter(ast.NodeTransformer):
+    """Turns a validated tree into one that only calls the engine's namespace."""
+
+    def __init__(self, source: str, mode: str):
+        self.source = source
+        self.mode = mode
+        self.functions = _FUNCTIONS[mode]
+        self.constants = _CONSTANTS[mode]
+        self.variables = set()
+
+    def visit_Call(self, node: ast.Call):
+        if node.func.id not in self.functions:
+            raise ExpressionError(f"Function not available in {self.mode} mode: {node.func.id}")
+        node.args = [self.visit(arg) for arg in node.args]
+        return node
+
+    def visit_Name(self, node: ast.Name):
+        if node.id in self.functions:
+            raise ExpressionError(f"{node.id} must be called")
+        if node.id.startswith("__"):
+            raise ExpressionError(f"Invalid name: {node.id}")
+        if node.id not in self.constants:
+            self.variables.add(node.id)
+        return node
+
+    def visit_BinOp(self, node: ast.BinOp):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Pow):
+            return ast.copy_location(
+                ast.Call(func=ast.Name(id="_pow", ctx=ast.Load()), args=[node.left, node.right], keywords=[]),
+                node)
+        return node
+
+    def visit_Constant(self, node: ast.Constant):
+        if self.mode not in _NUMBER_TYPES:
+            return node
+        # Build exact values from the literal text so 0.1 stays 0.1
+        literal = ast.get_source_segment(self.source, node) or repr(node.value)
+        return ast.copy_location(
+            ast.Call(func=ast.Name(id="_num", ctx=ast.Load()), args=[ast.Constant(literal)], keywords=[]),
+            node)
+
+
+class CompiledExpression:
+    """A validated expression compiled once and evaluated many times.
+
+    Names that are not functions or constants are variables and must be passed
+    to ``evaluate``. In ``numpy`` mode variables may be arrays, and the
+    expression is evaluated element-wise in one pass.
+    """
+
+    def __init__(self, source: str, mode: str = "float"):
+        if mode not in MODES:
+            raise ExpressionError(f"Unknown mode: {mode}")
+        self.source = source.strip()
+        self.mode = mode
+        rewriter = _Rewriter(self.source, mode)
+        tree = ast.fix_missing_locations(rewriter.visit(_parse(self.source)))
+        self.variables = frozenset(rewriter.variables)
+        self._code = compile(tree, "<expression>", "eval")
+        self._namespace = {"__builtins__": {}, "_pow": _POWER[mode], "_num": _NUMBER_TYPES.get(mode),
+                           **_FUNCTIONS[mode], **_CONSTANTS[mode]}
+
+    def evaluate(self, **values):
+        missing = self.variables.difference(values)
+        if missing:
+            raise ExpressionError(f"Unknown variable: {', '.join(sorted(missing))}")
+        if self.mode == "numpy":
+            values = {name: np.asarray(value, dtype=float) for name, value in values.items()}
+            with np.errstate(all="ignore"):
+                return eval(self._code, self._namespace, values)
+        return eval(self._code, self._namespace, values)
+
+    __call__ = evaluate
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.source!r}, mode={self.mode!r})"
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(source: str, mode: str = "float") -> CompiledExpression:
+    """Parse, validate and compile ``source``; repeated sources hit the cache."""
+    return CompiledExpression(source, mode)
+
+
+def evaluate(source: str, mode: str = "float", **values):
+    """Evaluate one expression."""
+    return compile_expression(source, mode).evaluate(**values)
+
+
+_TOKEN = re.compile(r"(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|(?P<name>[A-Za-z_]\w*)"
+                    r"|(?P<op>\*\*|//|[-+*/%])|(?P<open>\()|(?P<close>\))|(?P<comma>,)|(?P<other>\S)")
+
+
+def find_expressions(text: str) -> List[str]:
+    """The runs of ``text`` written in the engine's grammar, in order.
+
+    Numbers, operators (including ``%``, ``//`` and ``**``), parentheses,
+    calls to the engine's functions and its constants are kept together;
+    any other word or symbol ends an expression, as does a comma or
+    semicolon outside parentheses ("2*3, sqrt(16); max(1, 2)" gives three).
+    """
+    expressions = []
+    start = end = None
+    depth = 0
+
+    def flush():
+        nonlocal start, end, depth
+        if start is not None:
+            expression = text[start:end].rstrip(" +-*/%").lstrip(" */%")
+            if expression:
+                expressions.append(expression)
+        start = end = None
+        depth = 0
+
+    for match in _TOKEN.finditer(text):
+        kind, token = match.lastgroup, match.group()
+        if kind == "name":
+            call = text[match.end():].lstrip().startswith("(")
+            if not (token in FUNCTION_NAMES and call or token in CONSTANT_NAMES and not call):
+                kind = "other"
+        if kind == "comma" and depth:
+            end = match.end()
+            continue
+        if kind in ("other", "comma") or (kind == "close" and not depth):
+            flush()
+            continue
+        depth += {"open": 1, "close": -1}.get(kind, 0)
+        if start is None:
+            start = match.start()
+        end = match.end()
+    flush()
+    return expressions
+
+
+# Numeric literals, but not digits inside names such as log10
+_NUMBER = re.compile(r"(?<![\w.])(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?")
+_WHITESPACE = re.compile(r"\s+")
+_SLOT = "#"
+# Integer literals with more digits than this may not be exact as float64
+_MAX_EXACT_DIGITS = 15
+
+
+def _numbered(shape: str) -> str:
+    """Turn "#*#" into the parseable template "_c0*_c1"."""
+    parts = shape.split(_SLOT)
+    return "".join(part + (f"_c{i}" if i < len(parts) - 1 else "") for i, part in enumerate(parts))
+
+
+@lru_cache(maxsize=1024)
+def _keeps_integers(template: str) -> bool:
+    """Whether integer inputs give an integer result (no division, power or calls)."""
+    tree = _parse(template)
+    return not any(isinstance(node, (ast.Div, ast.Pow, ast.Call)) for node in ast.walk(tree))
+
+
+def evaluate_batch(sources: Sequence[str], mode: str = "float") -> List[Any]:
+    """Evaluate many expressions, vectorizing those that share a structure.
+
+    "2*3.5" and "4 * 1.25" share the shape "#*#": each shape is parsed once and
+    evaluated for all its members in one NumPy pass over the literal columns.
+    Returns one result per source, in order; expressions that cannot be
+    evaluated get their exception (``ExpressionError``, ``ZeroDivisionError``,
+    ...) in place of a result instead of failing the whole batch. Decimal and
+    fraction modes are evaluated one by one (with the compiled-expression cache).
+    """
+    if mode != "float":
+        return [_scalar_or_error(source, mode) for source in sources]
+
+    results: List[Any] = [None] * len(sources)
+    groups: Dict[str, Tuple[List[int], List[List[str]]]] = {}
+    for index, source in enumerate(sources):
+        if _SLOT in source or "_c" in source:
+            # Would be confused with the template's own slots and names
+            results[index] = _scalar_or_error(source)
+            continue
+        compact = _WHITESPACE.sub("", source)
+        indices, rows = groups.setdefault(_NUMBER.sub(_SLOT, compact), ([], []))
+        indices.append(index)
+        rows.append(_NUMBER.findall(compact))
+
+    for shape, (indices, rows) in groups.items():
+        try:
+            if len(indices) == 1:
+                raise ExpressionError("Nothing to vectorize")
+            template = _numbered(shape)
+            literals = np.array(rows, dtype=str).reshape(len(rows), -1)
+            columns = {f"_c{i}": column for i, column in enumerate(literals.astype(float).T)}
+            values = np.broadcast_to(compile_expression(template, "numpy").evaluate(**columns), (len(rows),))
+            integer_rows = np.char.isdigit(literals).all(axis=1) & _keeps_integers(template)
+        except _EVALUATION_ERRORS:
+            # Invalid shapes, variables or unsupported calls: evaluate one by one
+            for index in indices:
+                results[index] = _scalar_or_error(sources[index])
+            continue
+
+        # Inexact or failed float results (long integers, overflow, x/0) use the scalar path
+        long_literals = (np.char.isdigit(literals) & (np.char.str_len(literals) > _MAX_EXACT_DIGITS)).any(axis=1)
+        scalar = ~np.isfinite(values) | long_literals | (integer_rows & (np.abs(values) >= 2.0 ** 53))
+        for index, value, integer, fallback in zip(indices, values.tolist(), integer_rows.tolist(), scalar.tolist()):
+            if fallback:
+                results[index] = _scalar_or_error(sources[index])
+            else:
+                results[index] = int(value) if integer else value
+    return results
+
+
+def _scalar_or_error(source: str, mode: str = "float"):
+    try:
+        return evaluate(source, mode)
+    except _EVALUATION_ERRORS as e:
+        return e
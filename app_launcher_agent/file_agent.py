@@ -1,9 +1,16 @@
 import os
 import json
 import re
-from typing import List, Dict, Union
+import heapq
+import time
+from fnmatch import fnmatch
+from itertools import count, islice
+from typing import Iterator, List, Dict, Optional, Union
 from langchain.agents import AgentExecutor, Tool, create_react_agent
-from langchain import hub
+from .prompts import load_react_prompt
+from .file_index import FileIndex, IndexWatcher
+from .disk_usage import ROOT_BUCKET, DiskUsageScanner
+from .scheduler import get_scheduler, path_resource
 
 class FileHandlingAgent:
     def __init__(self, llm):
@@ -23,13 +30,20 @@ class FileHandlingAgent:
             Tool(
                 name="file_operations",
                 func=FileOperationsTool().execute_operation,
-                description="Handles folder creation and directory listing. "
-                          "Input should be a JSON object with 'operation' and 'path'"
+                description="Handles folder creation, directory listing and file search. "
+                          "Input should be a JSON object with 'operation' ('create_folder', 'list', "
+                          "'search' or 'usage') and 'path'. Search takes 'query' (part of the name), 'pattern' "
+                          "or 'ext' and searches the indexed drives unless 'path' is given. "
+                          "Usage reports folder sizes and the largest files; optional 'top', 'depth' "
+                          "and 'time_budget' (seconds). "
+                          "Listings are paged: optional 'limit', 'offset' or 'page', "
+                          "'sort' (name, size or mtime), 'reverse', 'pattern' (glob such as '*.py') "
+                          "and 'total' (true to count all matching entries)"
             )
         ]
 
     def _setup_agent(self):
-        prompt = hub.pull("hwchase17/react-chat")
+        prompt = load_react_prompt()
         return create_react_agent(self.llm, self.tools, prompt)
 
     def run(self, input_text: str, chat_history: List = None) -> str:
@@ -42,17 +56,102 @@ class FileHandlingAgent:
         except Exception as e:
             return f"Error: {str(e)}"
 
+    async def arun(self, input_text: str, chat_history: List = None) -> str:
+        """Async version of run(). Filesystem calls have no async API, so
+        LangChain runs the tool itself in its default executor."""
+        try:
+            result = await self.agent_executor.ainvoke({
+                "input": input_text,
+                "chat_history": chat_history or []
+            })
+            return result["output"]
+        except Exception as e:
+            return f"Error: {str(e)}"
+
+DEFAULT_PAGE_SIZE = 100
+# Seconds a usage scan may take before a partial report is returned
+DEFAULT_USAGE_BUDGET = 10.0
+# Seconds a search waits for a first-time index build before answering from a partial index
+DEFAULT_INDEX_WAIT = 2.0
+
+
+def _entry_size(entry: os.DirEntry) -> int:
+    try:
+        return 0 if entry.is_dir() else entry.stat().st_size
+    except OSError:
+        return 0
+
+
+def _entry_mtime(entry: os.DirEntry) -> float:
+    try:
+        return entry.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+SORT_KEYS = {
+    "name": lambda entry: entry.name.lower(),
+    "size": _entry_size,
+    "mtime": _entry_mtime,
+}
+
+
+def _format_size(size: float) -> str:
+    if size < 1024:
+        return f"{size} B"
+    for unit in ("KB", "MB", "GB", "TB"):
+        size /= 1024
+        if size < 1024 or unit == "TB":
+            return f"{size:.1f} {unit}"
+
+
+def _format_entry(entry: os.DirEntry, sort: Optional[str]) -> str:
+    is_dir = entry.is_dir()
+    line = f"- 📁 {entry.name}" if is_dir else f"- 📄 {entry.name}"
+    if sort == "size" and not is_dir:
+        line += f" ({_format_size(_entry_size(entry))})"
+    return line
+
+
+def default_search_roots() -> List[str]:
+    """Roots to index for search: $APP_LAUNCHER_SEARCH_ROOTS, else the D/E drives, else home."""
+    configured = os.getenv("APP_LAUNCHER_SEARCH_ROOTS")
+    if configured:
+        return [root for root in configured.split(os.pathsep) if root]
+    drives = [drive for drive in ("D:\\", "E:\\") if os.path.isdir(drive)]
+    return drives or [os.path.expanduser("~")]
+
+
+def _within_root(path: str, root: str, pathmod=os.path) -> bool:
+    """Whether ``path`` is ``root`` or below it; paths on different drives never are."""
+    path, root = pathmod.normcase(path), pathmod.normcase(root)
+    if pathmod.splitdrive(path)[0] != pathmod.splitdrive(root)[0]:
+        # commonpath raises ValueError for paths on different drives
+        return False
+    return pathmod.commonpath([root, path]) == pathmod.commonpath([root])
+
+
 class FileOperationsTool:
-    def __init__(self):
+    def __init__(self, index: Optional[FileIndex] = None, search_roots: Optional[List[str]] = None,
+                 index_wait: float = DEFAULT_INDEX_WAIT):
         self.drive_map = {
             'd drive': "D:\\",
             'e drive': "E:\\",
             'd-desk': "D:\\",
             'e-desk': "E:\\"
         }
+        self._index = index
+        self.search_roots = [os.path.abspath(root) for root in (search_roots or default_search_roots())]
+        self._watchers: Dict[str, IndexWatcher] = {}
+        self.index_wait = index_wait
+        self.usage_scanner = DiskUsageScanner()
 
     def _resolve_path(self, path: str) -> str:
-        """Convert natural language paths to valid Windows paths while preserving spaces"""
+        """Convert natural language paths ("d drive") to absolute paths while preserving spaces
+
+        Separators are normalized for the platform, so "/" becomes "\\" on
+        Windows only and POSIX paths are kept as they are.
+        """
         # Replace drive shortcuts first
         for shortcut, actual_path in self.drive_map.items():
             if shortcut in path.lower():
@@ -60,8 +159,7 @@ class FileOperationsTool:
                 break
         
         # Clean path without modifying spaces
-        path = path.replace("/", "\\").strip()
-        return os.path.abspath(path)
+        return os.path.abspath(os.path.normpath(path.strip()))
 
     def execute_operation(self, input_data: Union[str, Dict]) -> str:
         """Handle both natural language and structured inputs"""
@@ -73,13 +171,48 @@ class FileOperationsTool:
                 except json.JSONDecodeError:  # Fallback to natural language
                     input_data = self._parse_natural_language(input_data)
 
+            # Reads share their path with each other; creating a folder holds
+            # it (and so waits for reads of its ancestors and descendants)
+            scheduler = get_scheduler()
             operation = input_data.get("operation", "list").lower()
+            if operation == "search":
+                path = input_data.get("path")
+                path = self._resolve_path(path) if path else None
+                with scheduler.acquire(shared=[path_resource(path)] if path else ()):
+                    return self._search(
+                        query=input_data.get("query"),
+                        pattern=input_data.get("pattern"),
+                        ext=input_data.get("ext"),
+                        path=path,
+                        limit=int(input_data.get("limit", 20)),
+                    )
+
             path = self._resolve_path(input_data.get("path", ""))
             
-            if operation == "create_folder":
-                return self._create_folder(path)
+            if operation == "usage":
+                depth = input_data.get("depth")
+                with scheduler.acquire(shared=[path_resource(path)]):
+                    return self._usage(
+                        path,
+                        top_n=int(input_data.get("top", 10)),
+                        max_depth=int(depth) if depth is not None else None,
+                        time_budget=float(input_data.get("time_budget", DEFAULT_USAGE_BUDGET)),
+                    )
+            elif operation == "create_folder":
+                with scheduler.acquire([path_resource(path)]):
+                    return self._create_folder(path)
             elif operation == "list":
-                return self._list_directory(path)
+                with scheduler.acquire(shared=[path_resource(path)]):
+                    return self._list_directory(
+                        path,
+                        limit=int(input_data.get("limit", DEFAULT_PAGE_SIZE)),
+                        offset=int(input_data.get("offset", 0)),
+                        page=input_data.get("page"),
+                        sort=input_data.get("sort"),
+                        reverse=bool(input_data.get("reverse", False)),
+                        pattern=input_data.get("pattern"),
+                        count_total=bool(input_data.get("total", False)),
+                    )
             return "Unsupported operation"
         
         except Exception as e:
@@ -102,6 +235,26 @@ class FileOperationsTool:
                     "path": os.path.join(drive, folder_name)
                 }
         
+        # Usage pattern: "what is taking space on d drive", "disk usage of e drive"
+        if re.search(r'taking (?:up )?space|disk usage|space usage|how big is|biggest files|largest files', text):
+            drive = re.search(r'\b(d|e) drive', text)
+            return {"operation": "usage", "path": f"{drive.group(1).upper()}:\\" if drive else "D:\\"}
+
+        # Search pattern: "where is my report.docx", "find budget.xlsx", "search for pdf files"
+        search = re.search(r'(?:where is|where\'s|find|search for|locate)\s+(?:my |the )?(?:file |folder )?(?:named |called )?"?([^"]+?)"?(?: files?)?(?: (?:in|on) (d|e) drive)?\??$', text)
+        if search:
+            target = search.group(1).strip()
+            request = {"operation": "search"}
+            if search.group(2):
+                request["path"] = f"{search.group(2).upper()}:\\"
+            if "*" in target or "?" in target:
+                request["pattern"] = target
+            elif re.fullmatch(r'\.?[a-z0-9]{1,5}', target) and not re.search(r'\b(?:named|called)\b', text):
+                request["ext"] = target
+            else:
+                request["query"] = target
+            return request
+
         # List pattern with space handling
         if "list" in text:
             match = re.search(r'(?:in|on|at) (d|e) drive(?: in ([\w\s-]+) folder)?', text)
@@ -110,27 +263,162 @@ class FileOperationsTool:
                 folder = match.group(2).strip() if match.group(2) else ""
                 return {
                     "operation": "list",
-                    "path": os.path.join(drive, folder)
+                    "path": os.path.join(drive, folder),
+                    **self._parse_list_options(text)
                 }
         
         return {"operation": "list", "path": "D:\\"}
 
-    def _list_directory(self, path: str) -> str:
-        """List directory contents with better formatting"""
+    def _parse_list_options(self, text: str) -> Dict:
+        """Sort order, glob filter and page from phrases like 'largest *.log files, page 2'"""
+        options = {}
+        sort = re.search(r'(?:sort(?:ed)? by|by) (name|size|date|modified|mtime)', text)
+        if sort:
+            options["sort"] = {"date": "mtime", "modified": "mtime"}.get(sort.group(1), sort.group(1))
+        if re.search(r'\b(largest|biggest|newest|latest|descending)\b', text):
+            options.setdefault("sort", "mtime" if re.search(r'\b(newest|latest)\b', text) else "size")
+            options["reverse"] = True
+        pattern = re.search(r'(\*[\w.*?-]*)', text)
+        if pattern:
+            options["pattern"] = pattern.group(1)
+        page = re.search(r'\bpage (\d+)', text)
+        if page:
+            options["page"] = int(page.group(1))
+        return options
+
+    def iter_directory(self, path: str, pattern: Optional[str] = None) -> Iterator[os.DirEntry]:
+        """Yield the entries of ``path`` lazily, optionally filtered by a glob pattern.
+
+        ``DirEntry`` caches the file type from the directory read itself, so no
+        per-entry stat is needed unless the caller asks for size or mtime.
+        """
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if pattern is None or fnmatch(entry.name.lower(), pattern.lower()):
+                    yield entry
+
+    def _list_directory(self, path: str, limit: int = None, offset: int = 0, page: Optional[int] = None,
+                        sort: Optional[str] = None, reverse: bool = False, pattern: Optional[str] = None,
+                        count_total: bool = False) -> str:
+        """List one page of directory contents.
+
+        Without ``sort`` entries come in directory order and only the requested
+        page is read (plus one entry to know whether more exist), so the first
+        page of a huge directory is returned in constant time. Sorting has to
+        see every entry but only keeps ``offset + limit`` of them in a heap.
+        """
         try:
             if not os.path.exists(path):
                 return f"Path does not exist: {path}"
-                
-            items = os.listdir(path)
-            # Create markdown-formatted list
-            items_list = "\n".join(
-                [f"- 📁 {item}" if os.path.isdir(os.path.join(path, item)) 
-                 else f"- 📄 {item}" for item in items]
-            )
-            return f"**Contents of {path}:**\n\n{items_list}"
+            if not os.path.isdir(path):
+                return f"Not a directory: {path}"
+
+            limit = max(1, limit or DEFAULT_PAGE_SIZE)
+            if page is not None:
+                offset = (max(1, int(page)) - 1) * limit
+            offset = max(0, offset)
+
+            entries = self.iter_directory(path, pattern)
+            if sort:
+                if sort not in SORT_KEYS:
+                    return f"Unsupported sort key: {sort}. Use one of: {', '.join(SORT_KEYS)}"
+                # zip stops before advancing the counter, so it ends at the entry count
+                counter = count()
+                select = heapq.nlargest if reverse else heapq.nsmallest
+                items = select(offset + limit, (entry for entry, _ in zip(entries, counter)),
+                               key=SORT_KEYS[sort])[offset:]
+                total = next(counter)
+                has_more = offset + len(items) < total
+            else:
+                window = list(islice(entries, offset, offset + limit + 1))
+                has_more = len(window) > limit
+                items = window[:limit]
+                total = offset + len(items) + (1 + sum(1 for _ in entries) if has_more and count_total else 0)
+                if not count_total and has_more:
+                    total = None
+
+            lines = [_format_entry(entry, sort) for entry in items]
+            if not lines:
+                lines = ["_No matching entries_" if pattern or offset else "_Empty directory_"]
+
+            header = f"**Contents of {path}:**"
+            if items:
+                shown = f"{offset + 1}-{offset + len(items)}"
+                header += f" (showing {shown} of {total})" if total is not None else f" (showing {shown})"
+            footer = f"\n\n_More entries available: use offset {offset + len(items)}_" if has_more else ""
+            return f"{header}\n\n" + "\n".join(lines) + footer
         except Exception as e:
             return f"Listing failed: {str(e)}"
 
+    def _get_index(self) -> FileIndex:
+        if self._index is None:
+            self._index = FileIndex()
+        return self._index
+
+    def _ensure_indexed(self, root: str) -> None:
+        """Start indexing ``root`` in the background on first use (or when stale) and keep it current."""
+        index = self._get_index()
+        index.ensure_root(root, background=True)
+        if root not in self._watchers:
+            self._watchers[root] = IndexWatcher(index, root).start()
+
+    def _search(self, query: Optional[str] = None, pattern: Optional[str] = None, ext: Optional[str] = None,
+                path: Optional[str] = None, limit: int = 20) -> str:
+        """Answer a search from the metadata index instead of walking the tree"""
+        if not (query or pattern or ext):
+            return "Please say what to search for (a name, pattern or extension)"
+        if path and not os.path.isdir(path):
+            return f"Path does not exist: {path}"
+
+        if path:
+            covering = [root for root in self.search_roots if _within_root(path, root)]
+            roots = covering[:1] or [path]
+        else:
+            roots = [root for root in self.search_roots if os.path.isdir(root)]
+        for root in roots:
+            self._ensure_indexed(root)
+        # Small trees finish indexing within the wait; larger ones answer from what is indexed so far
+        deadline = time.monotonic() + self.index_wait
+        pending = [root for root in roots
+                   if not self._get_index().wait(root, max(0.0, deadline - time.monotonic()))]
+
+        matches = []
+        for root in roots:
+            matches.extend(self._get_index().search(query=query, pattern=pattern, ext=ext, root=path or root,
+                                                    limit=limit))
+        matches = matches[:limit]
+
+        target = query or pattern or f"*.{ext.lstrip('.')}"
+        note = (f"\n\n_Still indexing {', '.join(pending)}; results may be incomplete, try again shortly_"
+                if pending else "")
+        if not matches:
+            return f"No files matching '{target}' found" + note
+        lines = [f"- 📁 {match.path}" if match.is_dir else f"- 📄 {match.path} ({_format_size(match.size)})"
+                 for match in matches]
+        return f"**Found {len(matches)} match(es) for '{target}':**\n\n" + "\n".join(lines) + note
+
+    def _usage(self, path: str, top_n: int = 10, max_depth: Optional[int] = None,
+               time_budget: Optional[float] = DEFAULT_USAGE_BUDGET) -> str:
+        """Summarize what takes space below ``path``"""
+        if not os.path.isdir(path):
+            return f"Path does not exist: {path}"
+
+        report = self.usage_scanner.scan(path, top_n=top_n, max_depth=max_depth, time_budget=time_budget)
+        lines = [f"**Disk usage of {report.path}:** {_format_size(report.size)} in "
+                 f"{report.files:,} files and {report.directories:,} folders"]
+        if not report.complete:
+            lines.append(f"_Partial result: stopped at the depth or time limit after {report.elapsed:.1f}s_")
+
+        folders = [folder for folder in report.folders if folder.size or folder.files]
+        if folders:
+            lines.append("\n| Folder | Size | Files |\n| --- | ---: | ---: |")
+            lines.extend(f"| {'(files in this folder)' if folder.name == ROOT_BUCKET else folder.name} | "
+                         f"{_format_size(folder.size)} | {folder.files:,} |" for folder in folders[:top_n])
+        if report.largest:
+            lines.append(f"\n**Largest {len(report.largest)} files:**\n")
+            lines.extend(f"- 📄 {file_path} ({_format_size(size)})" for size, file_path in report.largest)
+        return "\n".join(lines)
+
     def _create_folder(self, path: str) -> str:
         """Create folder with validation"""
         try:
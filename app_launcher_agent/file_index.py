@@ -0,0 +1,454 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import sqlite3
+import struct
+import threading
+import time
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .utils import get_cache_dir
+
+# inotify event bits (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+               | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT_HEADER = struct.Struct("iIII")
+
+SCHEMA_VERSION = 2
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    is_dir INTEGER NOT NULL,
+    parent TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_name ON files (name_lower);
+CREATE INDEX IF NOT EXISTS files_parent ON files (parent);
+CREATE INDEX IF NOT EXISTS files_ext ON files (ext);
+CREATE TABLE IF NOT EXISTS roots (
+    root TEXT PRIMARY KEY,
+    indexed_at REAL NOT NULL
+);
+"""
+
+
+class FileRecord(NamedTuple):
+    path: str
+    name: str
+    ext: str
+    size: int
+    mtime: float
+    is_dir: bool
+
+
+def _extension(name: str) -> str:
+    return os.path.splitext(name)[1].lower().lstrip(".")
+
+
+def _row(path: str, stat: os.stat_result, is_dir: bool) -> Tuple:
+    name = os.path.basename(path)
+    return (path, name, name.lower(), "" if is_dir else _extension(name),
+            0 if is_dir else stat.st_size, stat.st_mtime, int(is_dir), os.path.dirname(path))
+
+
+def _signature(row: Tuple) -> Tuple:
+    """The fields of a row that change when the file does: (size, mtime, is_dir)."""
+    return row[4], row[5], row[6]
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _subtree_range(path: str) -> Tuple[str, str]:
+    """Bounds of the primary-key range holding every path below ``path``."""
+    prefix = path.rstrip(os.sep) + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+def _walk(root: str) -> Iterator[Tuple[str, Dict[str, Tuple]]]:
+    """Yield (directory, {path: index row}) for ``root`` and every directory below it
+    (not following symlinks). Unreadable directories are skipped."""
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            continue
+        rows = {}
+        with entries:
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir:
+                    stack.append(entry.path)
+                rows[entry.path] = _row(entry.path, stat, is_dir)
+        yield directory, rows
+
+
+class FileIndex:
+    """Persistent SQLite index of file metadata (name, path, size, mtime, extension).
+
+    ``build`` walks a root and applies only the differences to what is
+    already indexed, directory by directory: new and changed entries are
+    written and vanished ones deleted, in transactions of about
+    ``batch_size`` changes. The lock is only held to read one directory's
+    rows and to commit a batch, so searches keep working during a scan
+    (and see the entries committed so far). Afterwards ``update_path`` and
+    ``remove_path`` keep the root current (driven by an ``IndexWatcher``),
+    and ``ensure_root`` rescans roots whose last full scan is older than
+    ``max_age`` seconds as a fallback for missed events, optionally on a
+    background thread.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_age: float = 24 * 3600, batch_size: int = 5000):
+        self.db_path = db_path or os.path.join(get_cache_dir("file_index"), "index.sqlite3")
+        self.max_age = max_age
+        self.batch_size = batch_size
+        self._lock = threading.RLock()
+        self._builds: Dict[str, threading.Thread] = {}
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # Older layouts are simply rebuilt
+            self._conn.executescript("DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS roots;")
+            self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def roots(self) -> Dict[str, float]:
+        """Indexed roots and the time of their last full scan."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT root, indexed_at FROM roots"))
+
+    def build(self, root: str) -> int:
+        """Bring the index of everything below ``root`` up to date; returns the number of entries."""
+        root = os.path.abspath(root)
+        count = self._sync_tree(root)
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO roots VALUES (?, ?)", (root, time.time()))
+        return count
+
+    def _sync_tree(self, top: str) -> int:
+        count = 0
+        upserts: List[Tuple] = []
+        deletes: List[str] = []
+        for directory, rows in _walk(top):
+            with self._lock:
+                indexed = {path: (size, mtime, is_dir) for path, size, mtime, is_dir in self._conn.execute(
+                    "SELECT path, size, mtime, is_dir FROM files WHERE parent = ?", (directory,))}
+            for path, row in rows.items():
+                previous = indexed.get(path)
+                if previous == _signature(row):
+                    continue
+                if previous is not None and previous[2] and not row[6]:
+                    # A directory replaced by a file: drop what was below it
+                    deletes.append(path)
+                upserts.append(row)
+            deletes.extend(indexed.keys() - rows.keys())
+            count += len(rows)
+            if len(upserts) + len(deletes) >= self.batch_size:
+                self._apply(upserts, deletes)
+                upserts, deletes = [], []
+        self._apply(upserts, deletes)
+        return count
+
+    def _apply(self, upserts: List[Tuple], deletes: List[str]) -> None:
+        if not upserts and not deletes:
+            return
+        with self._lock, self._conn:
+            for path in deletes:
+                self._delete_tree(path)
+            self._insert(upserts)
+
+    def ensure_root(self, root: str, background: bool = False) -> bool:
+        """Scan ``root`` if it was never indexed or is older than ``max_age``; True if a scan ran or started.
+
+        With ``background`` the scan runs on a daemon thread (see ``building`` and ``wait``).
+        """
+        root = os.path.abspath(root)
+        indexed_at = self.roots().get(root)
+        if indexed_at is not None and time.time() - indexed_at < self.max_age:
+            return False
+        if background:
+            self.start_build(root)
+        else:
+            self.build(root)
+        return True
+
+    def start_build(self, root: str) -> threading.Thread:
+        """Run ``build(root)`` on a daemon thread, unless one is already running for it."""
+        root = os.path.abspath(root)
+        with self._lock:
+            thread = self._builds.get(root)
+            if thread is None or not thread.is_alive():
+                thread = threading.Thread(target=self.build, args=(root,), name="file-index-build", daemon=True)
+                self._builds[root] = thread
+                thread.start()
+        return thread
+
+    def building(self, root: str) -> bool:
+        """Whether a background build of ``root`` is running."""
+        thread = self._builds.get(os.path.abspath(root))
+        return thread is not None and thread.is_alive()
+
+    def wait(self, root: str, timeout: Optional[float] = None) -> bool:
+        """Wait for a background build of ``root``; True once none is running."""
+        thread = self._builds.get(os.path.abspath(root))
+        if thread is not None:
+            thread.join(timeout)
+        return not self.building(root)
+
+    def _insert(self, rows: List[Tuple]) -> int:
+        self._conn.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    def _delete_tree(self, path: str, include_root: bool = True) -> None:
+        self._conn.execute("DELETE FROM files WHERE path >= ? AND path < ?", _subtree_range(path))
+        if include_root:
+            self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def update_path(self, path: str) -> None:
+        """Re-read one path; a new directory is indexed recursively."""
+        try:
+            stat = os.stat(path, follow_symlinks=False)
+        except OSError:
+            self.remove_path(path)
+            return
+        is_dir = os.path.isdir(path) and not os.path.islink(path)
+        with self._lock, self._conn:
+            self._insert([_row(path, stat, is_dir)])
+        if is_dir:
+            self._sync_tree(path)
+
+    def remove_path(self, path: str) -> None:
+        """Drop ``path`` and, if it was a directory, everything below it."""
+        with self._lock, self._conn:
+            self._delete_tree(path)
+
+    def search(self, query: Optional[str] = None, pattern: Optional[str] = None, ext: Optional[str] = None,
+               root: Optional[str] = None, limit: int = 50) -> List[FileRecord]:
+        """Find entries by name substring, glob pattern and/or extension.
+
+        Exact name matches come first, then prefix matches, then the most
+        recently modified.
+        """
+        clauses, params = [], []
+        order = "mtime DESC"
+        if query:
+            query = query.lower()
+            clauses.append("name_lower LIKE ? ESCAPE '\\'")
+            params.append(f"%{_escape_like(query)}%")
+            order = "name_lower = ? DESC, name_lower LIKE ? ESCAPE '\\' DESC, mtime DESC"
+        if pattern:
+            clauses.append("name_lower GLOB ?")
+            params.append(pattern.lower())
+        if ext:
+            clauses.append("ext = ?")
+            params.append(ext.lower().lstrip("."))
+        if root:
+            clauses.append("path >= ? AND path < ?")
+            params.extend(_subtree_range(os.path.abspath(root)))
+        if query:
+            params.extend([query, f"{_escape_like(query)}%"])
+
+        where = " AND ".join(clauses) or "1"
+        sql = (f"SELECT path, name, ext, size, mtime, is_dir FROM files WHERE {where} "
+               f"ORDER BY {order} LIMIT ?")
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, limit)).fetchall()
+        return [FileRecord(path, name, ext, size, mtime, bool(is_dir)) for path, name, ext, size, mtime, is_dir in rows]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+
+def _load_inotify():
+    if not hasattr(os, "O_NONBLOCK"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1  # noqa: B018 - raises AttributeError where inotify is missing
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+def _default_max_watches() -> int:
+    """A quarter of the per-user inotify limit (shared with every other program), at most 8192."""
+    try:
+        with open("/proc/sys/fs/inotify/max_user_watches") as f:
+            return max(1, min(8192, int(f.read()) // 4))
+    except (OSError, ValueError):
+        return 8192
+
+
+class IndexWatcher:
+    """Keeps a FileIndex root current from inotify events on a background thread.
+
+    Every directory below the root gets a watch (set up on the background
+    thread; ``ready`` is set once it is decided); created, written, moved and
+    deleted entries are applied to the index as they happen. Where inotify is
+    unavailable (Windows, macOS), the tree needs more than ``max_watches``
+    watches, or the kernel drops events (queue overflow or watch limit
+    reached), the root is rescanned incrementally every ``rescan_interval``
+    seconds instead.
+    """
+
+    def __init__(self, index: FileIndex, root: str, rescan_interval: float = 300.0,
+                 max_watches: Optional[int] = None):
+        self.index = index
+        self.root = os.path.abspath(root)
+        self.rescan_interval = rescan_interval
+        self.max_watches = _default_max_watches() if max_watches is None else max_watches
+        self.using_inotify = False
+        self.ready = threading.Event()
+        self._libc = _load_inotify()
+        self._fd: Optional[int] = None
+        self._watches: Dict[int, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "IndexWatcher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="file-index-watch", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        self.using_inotify = self._setup_inotify()
+        self.ready.set()
+        if self.using_inotify:
+            self._watch_loop()
+        else:
+            self._rescan_loop()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _setup_inotify(self) -> bool:
+        if self._libc is None:
+            return False
+        fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return False
+        self._fd = fd
+        if not self._add_tree(self.root):
+            os.close(fd)
+            self._fd = None
+            self._watches.clear()
+            return False
+        return True
+
+    def _add_watch(self, path: str) -> bool:
+        if len(self._watches) >= self.max_watches or self._stop.is_set():
+            return False
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            # Unreadable or vanished directories are skipped; ENOSPC means the
+            # per-user watch limit is exhausted and events would go missing
+            return ctypes.get_errno() != errno.ENOSPC
+        self._watches[wd] = path
+        return True
+
+    def _add_tree(self, root: str) -> bool:
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            if not self._add_watch(directory):
+                return False
+            try:
+                with os.scandir(directory) as entries:
+                    stack.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+            except OSError:
+                continue
+        return True
+
+    def _watch_loop(self) -> None:
+        while not self._stop.is_set():
+            readable, _, _ = select.select([self._fd], [], [], 0.5)
+            if not readable:
+                continue
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                return
+            if not self.handle_events(data):
+                # Events were lost; fall back to periodic full rescans
+                self.index.build(self.root)
+                self._rescan_loop()
+                return
+
+    def handle_events(self, data: bytes) -> bool:
+        """Apply a buffer of raw inotify events; False if the queue overflowed."""
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                return False
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            if not name:
+                # Event on the watched directory itself (deleted or moved away)
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                    self.index.remove_path(directory)
+                continue
+
+            path = os.path.join(directory, name)
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                self.index.remove_path(path)
+            elif mask & (IN_CREATE | IN_MOVED_TO | IN_CLOSE_WRITE | IN_ATTRIB | IN_MODIFY):
+                self.index.update_path(path)
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    if not self._add_tree(path):
+                        return False
+        return True
+
+    def _rescan_loop(self) -> None:
+        while not self._stop.wait(self.rescan_interval):
+            self.index.build(self.root)
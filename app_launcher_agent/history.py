@@ -0,0 +1,223 @@
+import threading
+from typing import Callable, List, Optional, Tuple, Union
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+# Rough per-message cost of the role/formatting wrapped around the content
+MESSAGE_OVERHEAD_TOKENS = 4
+# Upper bound for the note appended to a truncated message
+_TRUNCATION_NOTE_TOKENS = 24
+
+_SUMMARY_PROMPT = """Update the running summary of a conversation between a user and a desktop \
+assistant that launches apps, writes documents, manages files and changes system settings.
+Keep facts later requests may refer to (file names, paths, apps, settings, results) and drop chit-chat.
+Answer with the updated summary only, in at most {max_words} words.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}
+"""
+
+_encoding = None
+_encoding_lock = threading.Lock()
+
+
+def _load_encoding():
+    global _encoding
+    with _encoding_lock:
+        if _encoding is None:
+            try:
+                import tiktoken
+                _encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception:
+                # tiktoken missing, or its vocabulary cannot be downloaded
+                _encoding = False
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Token count of ``text`` (tiktoken when available, else ~4 characters per token)."""
+    encoding = _load_encoding()
+    if encoding:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def _message_tokens(message: BaseMessage) -> int:
+    return count_tokens(message.content) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    """Cut ``text`` to roughly ``max_tokens`` tokens at a line or word boundary."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    cut = text[:max_tokens * 4]
+    while cut and count_tokens(cut) > max_tokens:
+        cut = cut[:int(len(cut) * 0.9)]
+    boundary = max(cut.rfind("\n"), cut.rfind(" "))
+    return cut[:boundary] if boundary > len(cut) // 2 else cut
+
+
+def _split_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+    """Group messages into turns, each starting at a user message."""
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([message])
+        else:
+            turns[-1].append(message)
+    return turns
+
+
+def _role(message: BaseMessage) -> str:
+    return "User" if isinstance(message, HumanMessage) else "Assistant"
+
+
+class HistoryWindow:
+    """Bounds the chat history passed to agents by a token budget.
+
+    The last ``keep_turns`` turns are passed verbatim (long messages are cut
+    to ``max_message_tokens`` with a note pointing at the full message), and
+    everything older is folded into a rolling summary. The summary is
+    updated incrementally: only turns that left the window since the last
+    update are folded in, in batches of ``fold_turns``. With an ``llm`` the
+    summary is written by the model, otherwise it keeps the first words of
+    each turn. Either way the result stays within ``max_tokens``.
+
+    A history replaced by a different list starts a new summary; callers
+    that drop or load older messages go through ``trim`` and ``prepend`` so
+    the summary carries over.
+    """
+
+    def __init__(self, llm=None, max_tokens: int = 1500, keep_turns: int = 4, max_message_tokens: int = 300,
+                 summary_max_tokens: int = 250, fold_turns: int = 2,
+                 summarize: Optional[Callable[[str, List[BaseMessage]], str]] = None):
+        self.llm = llm
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self.max_message_tokens = max_message_tokens
+        self.summary_max_tokens = summary_max_tokens
+        self.fold_turns = fold_turns
+        self._summarize = summarize or (self._llm_summary if llm is not None else self._extractive_summary)
+        self.summary = ""
+        # Number of leading messages of the history already folded into the summary
+        self.summarized_upto = 0
+        self._first_message: Optional[BaseMessage] = None
+        # Messages of the session before the first one in the history (for message numbers)
+        self._offset = 0
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.summary = ""
+            self.summarized_upto = 0
+            self._first_message = None
+            self._offset = 0
+
+    def trim(self, chat_history: List[BaseMessage], keep: int) -> List[BaseMessage]:
+        """Return the last ``keep`` messages of ``chat_history``; dropped ones stay in the summary."""
+        with self._lock:
+            self._sync(chat_history)
+            dropped = len(chat_history) - keep
+            if dropped <= 0:
+                return chat_history
+            if dropped > self.summarized_upto:
+                self._fold(_split_turns(chat_history[self.summarized_upto:dropped]))
+            self.summarized_upto -= dropped
+            self._offset += dropped
+            kept = chat_history[dropped:]
+            self._first_message = kept[0] if kept else None
+            return kept
+
+    def prepend(self, older: List[BaseMessage], chat_history: List[BaseMessage]) -> List[BaseMessage]:
+        """Return ``older + chat_history``; the older messages are shown, not sent or summarized again."""
+        with self._lock:
+            self._sync(chat_history)
+            combined = older + chat_history
+            self.summarized_upto += len(older)
+            self._offset = max(0, self._offset - len(older))
+            self._first_message = combined[0] if combined else None
+            return combined
+
+    def _sync(self, chat_history: List[BaseMessage]) -> None:
+        """Start over if ``chat_history`` is not the history summarized so far (lock held)."""
+        first = chat_history[0] if chat_history else None
+        if self.summarized_upto > len(chat_history) or first is not self._first_message:
+            # The history was cleared or replaced
+            self.summary, self.summarized_upto, self._offset = "", 0, 0
+        self._first_message = first
+
+    def window(self, chat_history: List[Union[HumanMessage, AIMessage]]) -> List[BaseMessage]:
+        """The messages to send with the next request."""
+        with self._lock:
+            self._sync(chat_history)
+
+            turns = _split_turns(chat_history[self.summarized_upto:])
+            pending = max(0, len(turns) - self.keep_turns)
+            # Fold in batches so the summary is not rewritten on every request
+            if pending >= self.fold_turns or (pending and not self._fits(turns[pending:])):
+                self._fold(turns[:pending])
+                turns = turns[pending:]
+
+            # A few huge turns can still exceed the budget; fold from the oldest
+            while len(turns) > 1 and not self._fits(turns):
+                self._fold(turns[:1])
+                turns = turns[1:]
+
+            kept = self._render(turns, self._offset + len(chat_history) - sum(len(turn) for turn in turns))
+            if self.summary:
+                return [SystemMessage(content=f"Summary of the earlier conversation: {self.summary}")] + kept
+            return kept
+
+    def _fits(self, turns: List[List[BaseMessage]]) -> bool:
+        summary_tokens = count_tokens(self.summary) + MESSAGE_OVERHEAD_TOKENS if self.summary else 0
+        cap = self.max_message_tokens + _TRUNCATION_NOTE_TOKENS + MESSAGE_OVERHEAD_TOKENS
+        tokens = sum(min(_message_tokens(m), cap) for turn in turns for m in turn)
+        return summary_tokens + tokens <= self.max_tokens
+
+    def _render(self, turns: List[List[BaseMessage]], first_index: int) -> List[BaseMessage]:
+        kept, index = [], first_index
+        for turn in turns:
+            for message in turn:
+                index += 1
+                if count_tokens(message.content) > self.max_message_tokens:
+                    content = (f"{_truncate(message.content, self.max_message_tokens)}\n"
+                               f"[... truncated; the full text is message #{index} of this chat]")
+                    message = type(message)(content=content)
+                kept.append(message)
+        return kept
+
+    def _fold(self, turns: List[List[BaseMessage]]) -> None:
+        messages = [message for turn in turns for message in turn]
+        if not messages:
+            return
+        try:
+            summary = self._summarize(self.summary, messages)
+        except Exception:
+            summary = self._extractive_summary(self.summary, messages)
+        self.summary = _truncate(summary.strip(), self.summary_max_tokens)
+        self.summarized_upto += len(messages)
+
+    def _extractive_summary(self, summary: str, messages: List[BaseMessage]) -> str:
+        """One short line per message appended to the summary; oldest lines drop first."""
+        lines = [line for line in summary.split("\n") if line]
+        for message in messages:
+            words = message.content.split()
+            snippet = " ".join(words[:15]) + (" ..." if len(words) > 15 else "")
+            lines.append(f"{_role(message)}: {snippet}")
+        while len(lines) > 1 and count_tokens("\n".join(lines)) > self.summary_max_tokens:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    def _llm_summary(self, summary: str, messages: List[BaseMessage]) -> str:
+        transcript = "\n".join(f"{_role(m)}: {_truncate(m.content, self.max_message_tokens)}" for m in messages)
+        prompt = _SUMMARY_PROMPT.format(max_words=int(self.summary_max_tokens * 0.7),
+                                        summary=summary or "(none)", messages=transcript)
+        return self.llm.invoke(prompt).content
+
+    def stats(self, chat_history: List[BaseMessage]) -> Tuple[int, int]:
+        """(tokens in the full history, tokens in the window sent to agents)."""
+        full = sum(_message_tokens(m) for m in chat_history)
+        return full, sum(_message_tokens(m) for m in self.window(chat_history))
@@ -0,0 +1,121 @@
+import platform
+import re
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from .app_catalog import AppCatalog
+from .tools import WINDOWS_APPS
+
+# Common spoken names for the entries of WINDOWS_APPS
+APP_ALIASES: Dict[str, str] = {
+    "google chrome": "chrome",
+    "chrome browser": "chrome",
+    "calc": "calculator",
+    "microsoft word": "word",
+    "ms word": "word",
+    "winword": "word",
+    "microsoft excel": "excel",
+    "ms excel": "excel",
+    "microsoft powerpoint": "powerpoint",
+    "ms paint": "paint",
+    "mspaint": "paint",
+    "command prompt": "cmd",
+    "file explorer": "explorer",
+    "windows explorer": "explorer",
+}
+
+_LAUNCH_PATTERN = re.compile(
+    r"^(?:please\s+)?(?:can you\s+|could you\s+)?(?:open|launch|start|run)\s+"
+    r"(?:up\s+)?(?:the\s+|my\s+)?(?P<app>[\w .+-]+?)"
+    r"(?:\s+(?:app|application|program))?(?:\s+please)?[.!]?$",
+    re.IGNORECASE,
+)
+
+_CLOSE_PATTERN = re.compile(
+    r"^(?:please\s+)?(?:can you\s+|could you\s+)?(?:close|quit|exit|kill)\s+"
+    r"(?:the\s+|my\s+)?(?P<app>[\w .+-]+?)"
+    r"(?:\s+(?:app|application|program))?(?:\s+please)?[.!]?$",
+    re.IGNORECASE,
+)
+
+_STATUS_PATTERN = re.compile(
+    r"^(?:is|are)\s+(?:the\s+|my\s+)?(?P<app>[\w .+-]+?)"
+    r"(?:\s+(?:app|application|program))?\s+(?:still\s+)?(?:running|open)\??$",
+    re.IGNORECASE,
+)
+
+_ACTION_PATTERNS = (("launch", _LAUNCH_PATTERN), ("close", _CLOSE_PATTERN), ("status", _STATUS_PATTERN))
+
+
+class LaunchResolver:
+    """Resolves unambiguous launch commands ("open notepad") without the LLM.
+
+    Only inputs whose whole target maps to a known app are resolved; anything
+    else returns None so the caller can fall back to the full agent. The
+    ``WINDOWS_APPS`` table (and its aliases) only applies on Windows, where
+    AppLauncherTool can launch its entries. With a ``catalog``, installed
+    apps are recognized too (by their whole name, or within the catalog's
+    fuzzy bound) and resolve to their process name ("Firefox Web Browser"
+    -> "firefox"), which is what the process index and the launch tracker
+    match on.
+    """
+
+    def __init__(self, apps: Optional[Iterable[str]] = None, aliases: Optional[Dict[str, str]] = None,
+                 catalog: Optional[AppCatalog] = None, system: Optional[str] = None):
+        if apps is None:
+            apps = WINDOWS_APPS if (system or platform.system()) == "Windows" else ()
+        self.apps = {name.lower(): name for name in apps}
+        self.aliases = dict(APP_ALIASES if aliases is None else aliases)
+        # Executable names ("chrome.exe", "winword.exe") resolve to their table key
+        for name, executable in WINDOWS_APPS.items():
+            if name in self.apps:
+                executable = executable[0] if isinstance(executable, tuple) else executable
+                self.aliases.setdefault(executable.lower(), name)
+        self.catalog = catalog
+        self.stats = {"bypassed": 0, "fallback": 0}
+        self._lock = threading.Lock()
+
+    def resolve(self, input_text: str) -> Optional[str]:
+        """Return the app to launch for ``input_text``, or None if not confident."""
+        match = _LAUNCH_PATTERN.match(" ".join(input_text.split()))
+        app_name = self._lookup(match.group("app")) if match else None
+        with self._lock:
+            self.stats["bypassed" if app_name else "fallback"] += 1
+        return app_name
+
+    def resolve_action(self, input_text: str) -> Optional[Tuple[str, str]]:
+        """Return (action, app) for unambiguous launch, close and status commands.
+
+        ``action`` is "launch", "close" or "status"; None if not confident.
+        """
+        text = " ".join(input_text.split())
+        resolved = None
+        for action, pattern in _ACTION_PATTERNS:
+            match = pattern.match(text)
+            if match:
+                app_name = self._lookup(match.group("app"))
+                resolved = (action, app_name) if app_name else None
+                break
+        with self._lock:
+            self.stats["bypassed" if resolved else "fallback"] += 1
+        return resolved
+
+    def _lookup(self, target: str) -> Optional[str]:
+        target = target.lower().strip()
+        if target in self.apps:
+            return self.apps[target]
+        alias = self.aliases.get(target)
+        if alias is None and target.endswith(".exe"):
+            alias = self.aliases.get(target[:-len(".exe")])
+        if alias:
+            return self.apps.get(alias)
+        if self.catalog is not None:
+            entry = self.catalog.resolve(target, partial=False)
+            return entry.process_name if entry else None
+        return None
+
+    @property
+    def bypass_rate(self) -> float:
+        """Share of resolve() calls that skipped the agent."""
+        total = self.stats["bypassed"] + self.stats["fallback"]
+        return self.stats["bypassed"] / total if total else 0.0
@@ -0,0 +1,177 @@
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, NamedTuple, Optional, Tuple, Union
+
+from .process_index import normalize_process_name
+
+Command = Union[str, List[str]]
+
+# Launchers that hand the app to another process and exit; their PID is not the app's
+HANDOFF_LAUNCHERS = frozenset({"open"})
+
+
+class LaunchedProcess(NamedTuple):
+    app: str
+    pid: int
+    started: float  # Wall-clock time of the spawn
+    spawn_latency: float  # Seconds spent in the spawn call
+    handle: Optional[subprocess.Popen] = None  # None for posix_spawn children
+
+
+class SpawnStats(NamedTuple):
+    count: int
+    mean: float
+    last: float
+    max: float
+
+
+def spawn(command: Command, shell: bool = False) -> Tuple[int, Optional[subprocess.Popen]]:
+    """Start ``command`` and return (pid, Popen handle); the handle is None when posix_spawn was used.
+
+    On POSIX an argument list is started with ``os.posix_spawnp`` in a new
+    session: no shell and no fork of the interpreter, and closing the
+    assistant does not take the app down with it. Everything else goes
+    through ``subprocess.Popen``.
+    """
+    if not shell and not isinstance(command, str) and hasattr(os, "posix_spawnp"):
+        return os.posix_spawnp(command[0], command, os.environ, setsid=True), None
+    process = subprocess.Popen(command, shell=shell)
+    return process.pid, process
+
+
+def _tracks(command: Command, shell: bool) -> bool:
+    """True when the spawned PID is the app itself."""
+    if shell or isinstance(command, str):
+        return False
+    return os.path.basename(command[0]) not in HANDOFF_LAUNCHERS
+
+
+class LaunchTracker:
+    """Registry of the processes started by the launcher, keyed by normalized app name.
+
+    Status checks and "close X" for tracked apps are dict lookups plus one
+    liveness check of the recorded PID (``poll`` on the Popen handle, or a
+    non-blocking ``waitpid`` for posix_spawn children, which also reaps
+    them). Spawn latencies are kept per app for the last ``latency_samples``
+    launches.
+    """
+
+    def __init__(self, latency_samples: int = 50):
+        self.latency_samples = latency_samples
+        self._processes: Dict[str, LaunchedProcess] = {}
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def spawn(self, app_name: str, command: Command, shell: bool = False) -> LaunchedProcess:
+        """Start ``command`` for ``app_name`` and record it.
+
+        Shell launches and launches through a ``HANDOFF_LAUNCHERS`` entry
+        (macOS ``open -a``) are timed but not tracked, since their PID is the
+        shell's or launcher's rather than the app's.
+        """
+        started = time.time()
+        start = time.perf_counter()
+        pid, handle = spawn(command, shell)
+        latency = time.perf_counter() - start
+
+        record = LaunchedProcess(normalize_process_name(app_name), pid, started, latency, handle)
+        self.reap()
+        with self._lock:
+            self._latencies.setdefault(record.app, deque(maxlen=self.latency_samples)).append(latency)
+            if _tracks(command, shell):
+                self._processes[record.app] = record
+        return record
+
+    def running(self, app_name: str) -> Optional[LaunchedProcess]:
+        """The tracked process for ``app_name`` if it is still alive."""
+        key = normalize_process_name(app_name)
+        with self._lock:
+            record = self._processes.get(key)
+            if record is None:
+                return None
+            if _alive(record):
+                return record
+            del self._processes[key]
+            return None
+
+    def reap(self) -> None:
+        """Drop (and reap) every tracked process that has exited."""
+        with self._lock:
+            for key, record in list(self._processes.items()):
+                if not _alive(record):
+                    del self._processes[key]
+
+    def close(self, app_name: str, timeout: float = 3.0) -> Optional[LaunchedProcess]:
+        """Terminate the tracked process for ``app_name`` (killing it after ``timeout``).
+
+        Returns the closed process, or None when nothing tracked was running.
+        """
+        record = self.running(app_name)
+        if record is None:
+            return None
+        _signal(record, signal.SIGTERM)
+        if not _wait(record, timeout):
+            _signal(record, getattr(signal, "SIGKILL", signal.SIGTERM))
+            _wait(record, timeout)
+        with self._lock:
+            if self._processes.get(record.app) is record:
+                del self._processes[record.app]
+        return record
+
+    def processes(self) -> List[LaunchedProcess]:
+        """Tracked processes that are still alive."""
+        self.reap()
+        with self._lock:
+            return list(self._processes.values())
+
+    def spawn_stats(self) -> Dict[str, SpawnStats]:
+        """Spawn latency per app over the recorded launches."""
+        with self._lock:
+            return {
+                app: SpawnStats(len(samples), sum(samples) / len(samples), samples[-1], max(samples))
+                for app, samples in self._latencies.items()
+            }
+
+
+def _alive(record: LaunchedProcess) -> bool:
+    if record.handle is not None:
+        return record.handle.poll() is None
+    try:
+        pid, _ = os.waitpid(record.pid, os.WNOHANG)
+    except ChildProcessError:
+        # Not our child any more (already reaped)
+        return False
+    return pid == 0
+
+
+def _signal(record: LaunchedProcess, signum: int) -> None:
+    try:
+        if record.handle is not None:
+            if signum == signal.SIGTERM:
+                record.handle.terminate()
+            else:
+                record.handle.kill()
+        else:
+            os.kill(record.pid, signum)
+    except ProcessLookupError:
+        pass
+
+
+def _wait(record: LaunchedProcess, timeout: float) -> bool:
+    """Wait up to ``timeout`` seconds for the process to exit."""
+    if record.handle is not None:
+        try:
+            record.handle.wait(timeout)
+            return True
+        except subprocess.TimeoutExpired:
+            return False
+    deadline = time.monotonic() + timeout
+    while _alive(record):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(0.02)
+    return True
@@ -0,0 +1,252 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple
+
+from .utils import get_cache_dir
+
+# Number of disk writes between two trims of the disk tier
+TRIM_EVERY = 32
+
+_bypass: ContextVar[bool] = ContextVar("llm_cache_bypass", default=False)
+
+
+@contextmanager
+def bypassing_cache(bypass: bool = True):
+    """Make cached LLM calls inside this block go to the model (e.g. the user asked for a fresh answer)."""
+    token = _bypass.set(bypass)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def cache_bypassed() -> bool:
+    """Whether the caller asked to skip the response cache."""
+    return _bypass.get()
+
+
+def _model_params(llm) -> Optional[Dict]:
+    """Parameters that identify the model's output, or None if unknown."""
+    params = getattr(llm, "_identifying_params", None)
+    if not isinstance(params, dict):
+        return None
+    return {k: v for k, v in params.items() if isinstance(v, (str, int, float, bool, type(None)))}
+
+
+class LLMResponseCache:
+    """Two-tier (memory LRU + disk) cache for LLM completions.
+
+    Keys are the sha256 of the whitespace-normalized prompt together with the model
+    parameters, so changing model or temperature never returns stale text.
+    Disk entries older than ``max_age`` seconds are ignored and evicted; the disk
+    tier is also trimmed to ``max_disk_entries`` / ``max_disk_bytes``.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_memory_entries: int = 256,
+                 max_disk_entries: int = 2048, max_disk_bytes: int = 50 * 1024 * 1024,
+                 max_age: float = 7 * 24 * 3600):
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.max_age = max_age
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "bypassed": 0}
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writes_since_trim = 0
+
+    def _dir(self) -> str:
+        if self.cache_dir is None:
+            self.cache_dir = get_cache_dir("llm")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        return self.cache_dir
+
+    def make_key(self, llm, prompt: str) -> Optional[str]:
+        """Cache key for ``prompt`` on ``llm``; None when the model can't be identified."""
+        params = _model_params(llm)
+        if params is None:
+            return None
+        normalized = " ".join(prompt.split())
+        payload = json.dumps({"prompt": normalized, "model": params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[1] <= self.max_age:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry[0]
+
+        content, created = self._read_disk(key, now)
+        with self._lock:
+            if content is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["disk_hits"] += 1
+            self._remember(key, content, created)
+        return content
+
+    def set(self, key: str, content: str) -> None:
+        created = time.time()
+        with self._lock:
+            self._remember(key, content, created)
+        self._write_disk(key, content, created)
+
+    def _lookup(self, llm, prompt: str, use_cache: bool) -> Tuple[Optional[str], Optional[str]]:
+        """Return (key, cached content); key is None when the call bypasses the cache."""
+        key = self.make_key(llm, prompt) if use_cache and not cache_bypassed() else None
+        if key is None:
+            with self._lock:
+                self.stats["bypassed"] += 1
+            return None, None
+        return key, self.get(key)
+
+    def invoke(self, llm, prompt: str, use_cache: bool = True) -> str:
+        """Return ``llm.invoke(prompt).content``, served from the cache when possible."""
+        key, content = self._lookup(llm, prompt, use_cache)
+        if content is None:
+            content = llm.invoke(prompt).content
+            if key is not None:
+                self.set(key, content)
+        return content
+
+    async def ainvoke(self, llm, prompt: str, use_cache: bool = True) -> str:
+        """Async version of invoke() built on ``llm.ainvoke``."""
+        key, content = self._lookup(llm, prompt, use_cache)
+        if content is None:
+            content = (await llm.ainvoke(prompt)).content
+            if key is not None:
+                self.set(key, content)
+        return content
+
+    def stream(self, llm, prompt: str, use_cache: bool = True) -> Iterator[str]:
+        """Yield the completion in chunks as ``llm.stream`` produces them.
+
+        A cache hit is yielded as a single chunk; a miss is stored once the
+        stream has been fully consumed.
+        """
+        key, content = self._lookup(llm, prompt, use_cache)
+        if content is not None:
+            yield content
+            return
+
+        parts = []
+        for chunk in llm.stream(prompt):
+            text = getattr(chunk, "content", chunk)
+            if text:
+                parts.append(text)
+                yield text
+        if key is not None:
+            self.set(key, "".join(parts))
+
+    async def astream(self, llm, prompt: str, use_cache: bool = True) -> AsyncIterator[str]:
+        """Async version of stream() built on ``llm.astream``."""
+        key, content = self._lookup(llm, prompt, use_cache)
+        if content is not None:
+            yield content
+            return
+
+        parts = []
+        async for chunk in llm.astream(prompt):
+            text = getattr(chunk, "content", chunk)
+            if text:
+                parts.append(text)
+                yield text
+        if key is not None:
+            self.set(key, "".join(parts))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        for name in os.listdir(self._dir()):
+            if name.endswith(".json"):
+                os.remove(os.path.join(self._dir(), name))
+
+    def _remember(self, key: str, content: str, created: float) -> None:
+        self._memory[key] = (content, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self._dir(), f"{key}.json")
+
+    def _read_disk(self, key: str, now: float):
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None, None
+        if now - entry.get("created", 0) > self.max_age:
+            _remove_quietly(self._path(key))
+            return None, None
+        return entry.get("content"), entry["created"]
+
+    def _write_disk(self, key: str, content: str, created: float) -> None:
+        try:
+            tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"content": content, "created": created}, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            return
+
+        with self._lock:
+            self._writes_since_trim += 1
+            due = self._writes_since_trim >= TRIM_EVERY
+            if due:
+                self._writes_since_trim = 0
+        if due:
+            self.trim()
+
+    def trim(self) -> None:
+        """Evict expired entries, then the oldest until size limits are met."""
+        with self._lock:
+            self._writes_since_trim = 0
+        now = time.time()
+        entries = []
+        with os.scandir(self._dir()) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                stat = entry.stat()
+                if now - stat.st_mtime > self.max_age:
+                    _remove_quietly(entry.path)
+                else:
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        entries.sort()
+        count = len(entries)
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if count <= self.max_disk_entries and total_bytes <= self.max_disk_bytes:
+                break
+            _remove_quietly(path)
+            count -= 1
+            total_bytes -= size
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+_default_cache: Optional[LLMResponseCache] = None
+
+
+def get_response_cache() -> LLMResponseCache:
+    """Return the process-wide LLM response cache."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = LLMResponseCache()
+    return _default_cache
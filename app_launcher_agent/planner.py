@@ -0,0 +1,189 @@
+import contextvars
+import re
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .router import IntentRouter
+from .tracing import span
+
+# Words that start a command; clauses without one inherit the previous verb
+COMMAND_VERBS = {
+    "open", "launch", "start", "run", "close", "quit", "set", "mute", "unmute",
+    "increase", "decrease", "lower", "raise", "turn", "enable", "disable", "dim",
+    "create", "make", "list", "show", "find", "search", "calculate", "compute",
+}
+
+# Words that belong to the verb ("turn off", "turn the volume down" aside)
+_PARTICLES = {"on", "off", "up", "down"}
+
+# File names ("notes.txt"), paths and drive letters; "and" near them is part of a name
+_PATH_LIKE = re.compile(r"[\\/]|\b[a-z]:|\w\.[a-z][a-z0-9]{0,4}\b", re.IGNORECASE)
+
+# Agents whose clauses are only split off when they carry their own verb:
+# file names and folder names, and math expressions, often contain "and"
+_OWN_VERB_AGENTS = {"file", "calc"}
+
+# Clause separators; the captured text tells whether the next clause must wait
+_SEPARATOR = re.compile(r"\s*(,\s*and then|,\s*then|\band then\b|\bthen\b|,\s*and\b|\band\b|;|,)\s*",
+                        re.IGNORECASE)
+
+
+def _verb_phrase(words: List[str]) -> str:
+    """The command verb with its particles ("turn off")."""
+    end = 1
+    while end < len(words) and words[end].lower() in _PARTICLES:
+        end += 1
+    return " ".join(words[:end])
+
+
+def _split(text: str) -> List[Tuple[str, bool, bool]]:
+    """Split compound input into (clause, waits_for_previous, has_own_verb) triples."""
+    parts = _SEPARATOR.split(text.strip())
+    clauses = []
+    verb = None
+    sequential = False
+    for index, part in enumerate(parts):
+        if index % 2:
+            sequential = "then" in part.lower()
+            continue
+        part = part.strip(" .")
+        if not part:
+            continue
+        words = part.split()
+        own_verb = words[0].lower() in COMMAND_VERBS
+        if own_verb:
+            verb = _verb_phrase(words)
+        elif verb is not None:
+            part = f"{verb} {part}"
+        clauses.append((part, sequential and bool(clauses), own_verb))
+        sequential = False
+    return clauses
+
+
+def split_commands(text: str) -> List[Tuple[str, bool]]:
+    """Split compound input into (clause, waits_for_previous) pairs.
+
+    Clauses that do not start with a command verb inherit the previous verb
+    phrase, so "Open Chrome and Excel" becomes "Open Chrome" and "Open Excel"
+    and "turn off bluetooth and wifi" keeps the "off" in both clauses.
+    """
+    return [(clause, sequential) for clause, sequential, _ in _split(text)]
+
+
+class PlanStep:
+    """One routed sub-command of a compound request."""
+
+    def __init__(self, index: int, text: str, agent: str, depends_on: Sequence[int] = ()):
+        self.index = index
+        self.text = text
+        self.agent = agent
+        self.depends_on = list(depends_on)
+        self.result: Optional[str] = None
+
+    def __repr__(self) -> str:
+        return f"PlanStep({self.index}, {self.text!r}, agent={self.agent!r}, depends_on={self.depends_on})"
+
+
+class CommandPlanner:
+    """Turns user input into a dependency DAG of routed sub-commands.
+
+    Input is only split when every clause routes confidently to an agent in
+    ``splittable_agents``; writing and code requests stay whole because "and"
+    there is usually part of the topic. A clause without its own verb (one
+    that inherits the previous verb) must also route on its own to an agent
+    outside the file and calculator agents, in input that names no file or path:
+    "open notepad and calculate 5*5" splits, while "calculate 5 and 6",
+    "create folder salt and pepper in d drive" and "open Tom and Jerry.mp4"
+    stay whole.
+    """
+
+    def __init__(self, router: Optional[IntentRouter] = None,
+                 splittable_agents: Sequence[str] = ("app", "system", "file", "calc")):
+        self.router = router or IntentRouter()
+        self.splittable_agents = set(splittable_agents)
+
+    def plan(self, text: str) -> List[PlanStep]:
+        split = _split(text)
+        if len(split) > 1:
+            routes = self.router.classify([clause for clause, _, _ in split])
+            names_path = bool(_PATH_LIKE.search(text))
+            if all(self._splittable(own_verb, route, names_path) for (_, _, own_verb), route in zip(split, routes)):
+                clauses = [(clause, sequential) for clause, sequential, _ in split]
+                return self._build_steps(clauses, [r.agent for r in routes])
+        return [PlanStep(0, text, self.router.route(text).agent)]
+
+    def _splittable(self, own_verb: bool, route, names_path: bool) -> bool:
+        if route.fallback or route.agent not in self.splittable_agents:
+            return False
+        return own_verb or (route.agent not in _OWN_VERB_AGENTS and not names_path)
+
+    def _build_steps(self, clauses: List[Tuple[str, bool]], agents: List[str]) -> List[PlanStep]:
+        steps = []
+        last_file_step = None
+        for index, ((clause, sequential), agent) in enumerate(zip(clauses, agents)):
+            depends_on = []
+            if sequential:
+                depends_on.append(index - 1)
+            # Filesystem steps may touch the same paths, so keep them in order
+            if agent == "file" and last_file_step is not None and last_file_step not in depends_on:
+                depends_on.append(last_file_step)
+            if agent == "file":
+                last_file_step = index
+            steps.append(PlanStep(index, clause, agent, depends_on))
+        return steps
+
+
+class PlanExecutor:
+    """Runs plan steps on a bounded thread pool as soon as their dependencies finish.
+
+    Each step runs in a copy of the caller's context, so the request's trace
+    (and any other context variables) follow it onto the pool thread.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+
+    def execute(self, steps: List[PlanStep], run_step: Callable[[PlanStep], str]) -> List[PlanStep]:
+        pending: Dict[int, PlanStep] = {step.index: step for step in steps}
+        done = set()
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="plan-step") as pool:
+            while pending or running:
+                for index, step in list(pending.items()):
+                    if all(dep in done for dep in step.depends_on):
+                        context = contextvars.copy_context()
+                        running[pool.submit(context.run, run_step, step)] = step
+                        del pending[index]
+
+                if not running:
+                    raise ValueError("Plan has a dependency cycle")
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step = running.pop(future)
+                    try:
+                        step.result = future.result()
+                    except Exception as e:
+                        step.result = f"Error: {str(e)}"
+                    done.add(step.index)
+        return steps
+
+
+def merge_results(steps: List[PlanStep]) -> str:
+    """Combine step results into one reply."""
+    if len(steps) == 1:
+        return steps[0].result or ""
+    return "\n".join(f"- **{step.text}**: {step.result}" for step in steps)
+
+
+def run_plan(steps: List[PlanStep], registry, chat_history=None, executor: Optional[PlanExecutor] = None) -> str:
+    """Execute ``steps`` with agents from ``registry`` and merge the replies."""
+    executor = executor or PlanExecutor()
+
+    def run_step(step: PlanStep) -> str:
+        with span(step.agent, "agent", step=step.index, text=step.text):
+            return registry.get(step.agent).run(step.text, chat_history)
+
+    executor.execute(steps, run_step)
+    return merge_results(steps)
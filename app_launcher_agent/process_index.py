@@ -0,0 +1,132 @@
+import os
+import bisect
+import threading
+import time
+import psutil
+from typing import Dict, List, Optional, Set, Tuple
+
+from .tracing import span
+
+# App names whose process is called something else; lookups also try these
+PROCESS_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "word": ("winword",),
+    "powerpoint": ("powerpnt",),
+    "paint": ("mspaint",),
+    "calculator": ("calc", "calculatorapp", "gnome-calculator"),
+    "vs code": ("code",),
+    "vscode": ("code",),
+}
+
+
+def normalize_process_name(name: str) -> str:
+    """Normalize an executable or app name for index lookups ('Chrome.EXE' -> 'chrome')."""
+    name = os.path.basename(str(name).strip().strip('"').replace("\\", "/")).lower()
+    for suffix in (".exe", ".app"):
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return name
+
+
+class ProcessIndex:
+    """Index of running processes keyed by normalized executable name.
+
+    The index is refreshed incrementally: only processes that appeared since
+    the last refresh have their name read, and vanished ones are dropped.
+    Processes are identified by (PID, creation time), so a PID reused by a
+    new process is read again. Refreshes happen at most once per ``ttl``
+    seconds unless ``invalidate()`` is called.
+
+    Names match the executable exactly ("notepad" is not "notepad++"); app
+    names whose executable differs ("word" runs as winword.exe) are looked
+    up through ``PROCESS_ALIASES``.
+    """
+
+    MATCH_MODES = ("exact", "prefix")
+
+    def __init__(self, ttl: float = 2.0):
+        self.ttl = ttl
+        self._names: Dict[Tuple[int, float], str] = {}  # (pid, create_time) -> name
+        self._name_pids: Dict[str, Set[int]] = {}
+        self._sorted_names: Optional[List[str]] = None
+        self._last_refresh: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def invalidate(self) -> None:
+        """Force a refresh on the next lookup (e.g. right after launching an app)."""
+        with self._lock:
+            self._last_refresh = None
+
+    def refresh(self, force: bool = False) -> None:
+        """Diff the current PID set against the index and update changed entries."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._last_refresh is not None and now - self._last_refresh < self.ttl:
+                return
+
+            with span("process_index.refresh", "process"):
+                current = {}
+                for proc in psutil.process_iter():
+                    try:
+                        # Cached by psutil, so this costs nothing after the first refresh
+                        current[(proc.pid, proc.create_time())] = proc
+                    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                        continue
+
+                # Drop vanished processes first: a reused PID may be added back below
+                for key in set(self._names) - set(current):
+                    self._remove(key)
+
+                for key, proc in current.items():
+                    if key in self._names:
+                        continue
+                    try:
+                        name = proc.name()
+                    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                        continue
+                    if not name:
+                        continue
+                    self._add(key, normalize_process_name(name))
+
+            self._last_refresh = now
+
+    def _add(self, key: Tuple[int, float], name: str) -> None:
+        self._names[key] = name
+        if name not in self._name_pids:
+            self._name_pids[name] = set()
+            self._sorted_names = None
+        self._name_pids[name].add(key[0])
+
+    def _remove(self, key: Tuple[int, float]) -> None:
+        name = self._names.pop(key)
+        pids = self._name_pids[name]
+        pids.discard(key[0])
+        if not pids:
+            del self._name_pids[name]
+            self._sorted_names = None
+
+    def pids(self, app_name: str, match: str = "exact") -> Set[int]:
+        """Return the PIDs whose executable matches ``app_name``."""
+        if match not in self.MATCH_MODES:
+            raise ValueError(f"Unsupported match mode: {match}")
+
+        self.refresh()
+        key = normalize_process_name(app_name)
+        keys = (key, *PROCESS_ALIASES.get(key, ()))
+        with self._lock:
+            if match == "exact":
+                return set().union(*(self._name_pids.get(name, ()) for name in keys))
+
+            if self._sorted_names is None:
+                self._sorted_names = sorted(self._name_pids)
+            names = self._sorted_names
+            result = set()
+            for key in keys:
+                for i in range(bisect.bisect_left(names, key), len(names)):
+                    if not names[i].startswith(key):
+                        break
+                    result.update(self._name_pids[names[i]])
+            return result
+
+    def is_running(self, app_name: str, match: str = "exact") -> bool:
+        """Check whether any process matches ``app_name``."""
+        return bool(self.pids(app_name, match))
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+from langchain_core.prompts import PromptTemplate
+
+from .tracing import span
+from .utils import get_cache_dir
+
+REACT_CHAT_PROMPT = "hwchase17/react-chat"
+
+# Hub references actually pulled for each prompt name. Pin a commit with
+# "owner/repo:<commit>" to stop upstream edits from changing agent behaviour.
+PROMPT_PINS: Dict[str, str] = {
+    REACT_CHAT_PROMPT: "hwchase17/react-chat",
+}
+
+# Bundled copies used when neither the cache nor the hub is reachable
+BUNDLED_TEMPLATES: Dict[str, str] = {
+    REACT_CHAT_PROMPT: """Assistant is a large language model trained by OpenAI.
+
+Assistant is designed to be able to assist with a wide range of tasks, from answering simple questions to providing in-depth explanations and discussions on a wide range of topics. As a language model, Assistant is able to generate human-like text based on the input it receives, allowing it to engage in natural-sounding conversations and provide responses that are coherent and relevant to the topic at hand.
+
+Assistant is constantly learning and improving, and its capabilities are constantly evolving. It is able to process and understand large amounts of text, and can use this knowledge to provide accurate and informative responses to a wide range of questions. Additionally, Assistant is able to generate its own text based on the input it receives, allowing it to engage in discussions and provide explanations and descriptions on a wide range of topics.
+
+Overall, Assistant is a powerful tool that can help with a wide range of tasks and provide valuable insights and information on a wide range of topics. Whether you need help with a specific question or just want to have a conversation about a particular topic, Assistant is here to assist.
+
+TOOLS:
+------
+
+Assistant has access to the following tools:
+
+{tools}
+
+To use a tool, please use the following format:
+
+```
+Thought: Do I need to use a tool? Yes
+Action: the action to take, should be one of [{tool_names}]
+Action Input: the input to the action
+Observation: the result of the action
+```
+
+When you have a response to say to the Human, or if you do not need to use a tool, you MUST use the format:
+
+```
+Thought: Do I need to use a tool? No
+Final Answer: [your response here]
+```
+
+Begin!
+
+Previous conversation history:
+{chat_history}
+
+New input: {input}
+{agent_scratchpad}""",
+}
+
+
+class PromptStore:
+    """Shared source of agent prompt templates.
+
+    Lookup order: in-process memo, on-disk content-addressed cache, ``hub.pull``
+    and finally the bundled template. Disk entries live in ``blobs/<sha256>.json``
+    and ``index.json`` maps each pinned hub reference to the blob hash, so a
+    changed pin never serves a stale template.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, pins: Optional[Dict[str, str]] = None,
+                 offline: Optional[bool] = None):
+        self.cache_dir = cache_dir
+        self.pins = dict(PROMPT_PINS if pins is None else pins)
+        if offline is None:
+            offline = os.getenv("APP_LAUNCHER_OFFLINE", "").lower() in ("1", "true", "yes")
+        self.offline = offline
+        self._memo: Dict[str, PromptTemplate] = {}
+        self._lock = threading.Lock()
+
+    def _dir(self) -> str:
+        if self.cache_dir is None:
+            self.cache_dir = get_cache_dir("prompts")
+        os.makedirs(os.path.join(self.cache_dir, "blobs"), exist_ok=True)
+        return self.cache_dir
+
+    def get(self, name: str = REACT_CHAT_PROMPT) -> PromptTemplate:
+        """Return the prompt template for ``name``."""
+        prompt = self._memo.get(name)
+        if prompt is not None:
+            return prompt
+
+        with self._lock:
+            if name not in self._memo:
+                self._memo[name] = self._load(name)
+            return self._memo[name]
+
+    def _load(self, name: str) -> PromptTemplate:
+        reference = self.pins.get(name, name)
+
+        data = self._read_cache(reference)
+        if data is None and not self.offline:
+            data = self._pull(reference)
+            if data is not None:
+                self._write_cache(reference, data)
+        if data is None and name in BUNDLED_TEMPLATES:
+            data = {"template": BUNDLED_TEMPLATES[name], "template_format": "f-string"}
+        if data is None:
+            raise ValueError(f"Prompt '{name}' is not cached and could not be pulled")
+
+        return PromptTemplate.from_template(data["template"], template_format=data["template_format"])
+
+    def _pull(self, reference: str) -> Optional[dict]:
+        try:
+            from langchain import hub
+            with span("hub.pull", "prompt", reference=reference):
+                prompt = hub.pull(reference)
+        except Exception:
+            return None
+        if not isinstance(prompt, PromptTemplate):
+            return None
+        return {"template": prompt.template, "template_format": prompt.template_format}
+
+    def _index_path(self) -> str:
+        return os.path.join(self._dir(), "index.json")
+
+    def _read_index(self) -> Dict[str, str]:
+        try:
+            with open(self._index_path(), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _read_cache(self, reference: str) -> Optional[dict]:
+        digest = self._read_index().get(reference)
+        if not digest:
+            return None
+        try:
+            with open(os.path.join(self._dir(), "blobs", f"{digest}.json"), "rb") as f:
+                raw = f.read()
+        except OSError:
+            return None
+        # Content addressing doubles as an integrity check
+        if hashlib.sha256(raw).hexdigest() != digest:
+            return None
+        return json.loads(raw.decode("utf-8"))
+
+    def _write_cache(self, reference: str, data: dict) -> None:
+        try:
+            raw = json.dumps(data, sort_keys=True).encode("utf-8")
+            digest = hashlib.sha256(raw).hexdigest()
+            blob_path = os.path.join(self._dir(), "blobs", f"{digest}.json")
+            if not os.path.exists(blob_path):
+                _atomic_write(blob_path, raw)
+            index = self._read_index()
+            index[reference] = digest
+            _atomic_write(self._index_path(), json.dumps(index, indent=2, sort_keys=True).encode("utf-8"))
+        except OSError:
+            # A read-only cache directory only costs us the next cold start
+            pass
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+_default_store: Optional[PromptStore] = None
+
+
+def get_prompt_store() -> PromptStore:
+    """Return the process-wide prompt store shared by all agents."""
+    global _default_store
+    if _default_store is None:
+        _default_store = PromptStore()
+    return _default_store
+
+
+def load_react_prompt() -> PromptTemplate:
+    """Return the ReAct chat prompt used by the agents."""
+    return get_prompt_store().get(REACT_CHAT_PROMPT)
@@ -0,0 +1,80 @@
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .agent import AppLauncherAgent
+from .writer_agent import WritingAgent
+from .file_agent import FileHandlingAgent
+from .code_agent import CodeGenerationAgent
+from .calculation_agent import CalculationAgent
+from .system_agent import SystemControlAgent
+
+DEFAULT_AGENT_FACTORIES: Dict[str, Callable] = {
+    "calc": CalculationAgent,
+    "app": AppLauncherAgent,
+    "writer": WritingAgent,
+    "file": FileHandlingAgent,
+    "code": CodeGenerationAgent,
+    "system": SystemControlAgent,
+}
+
+
+class AgentRegistry:
+    """Builds agents on first use instead of constructing all of them up front.
+
+    Each factory is called with the LLM the first time its agent is requested.
+    Construction time is recorded per agent in ``build_times`` (seconds).
+    """
+
+    def __init__(self, llm, factories: Optional[Dict[str, Callable]] = None):
+        self.llm = llm
+        self.factories = dict(DEFAULT_AGENT_FACTORIES if factories is None else factories)
+        self.build_times: Dict[str, float] = {}
+        self._agents: Dict[str, object] = {}
+        self._locks = {name: threading.Lock() for name in self.factories}
+        self._warm_thread: Optional[threading.Thread] = None
+
+    def names(self) -> List[str]:
+        return list(self.factories)
+
+    def is_built(self, name: str) -> bool:
+        return name in self._agents
+
+    def get(self, name: str):
+        """Return the agent registered under ``name``, building it if needed."""
+        agent = self._agents.get(name)
+        if agent is not None:
+            return agent
+        if name not in self.factories:
+            raise KeyError(f"Unknown agent: {name}")
+
+        with self._locks[name]:
+            # Another thread (e.g. the warmer) may have finished it meanwhile
+            agent = self._agents.get(name)
+            if agent is None:
+                start = time.perf_counter()
+                agent = self.factories[name](self.llm)
+                self.build_times[name] = time.perf_counter() - start
+                self._agents[name] = agent
+        return agent
+
+    def warm(self, names: Optional[Iterable[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+        """Build the given agents (all by default), optionally on a daemon thread."""
+        pending = [n for n in (names or self.factories) if not self.is_built(n)]
+
+        def _build_all():
+            for name in pending:
+                try:
+                    self.get(name)
+                except Exception:
+                    # Warming is best effort; the error resurfaces on first real use
+                    pass
+
+        if not background:
+            _build_all()
+            return None
+        if self._warm_thread is not None and self._warm_thread.is_alive():
+            return self._warm_thread
+        self._warm_thread = threading.Thread(target=_build_all, name="agent-warmup", daemon=True)
+        self._warm_thread.start()
+        return self._warm_thread
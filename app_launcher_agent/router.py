@@ -0,0 +1,125 @@
+import re
+import zlib
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+# Example phrasings per agent. Each one becomes a row of the exemplar matrix;
+# an input is routed to the agent owning its most similar exemplar.
+INTENT_EXAMPLES: Dict[str, List[str]] = {
+    "app": [
+        "open notepad", "open chrome", "launch excel", "start word", "open calculator app",
+        "launch google chrome browser", "start powerpoint", "open paint", "open the command prompt",
+        "open file explorer", "launch vs code", "start firefox", "run spotify", "open microsoft word",
+        "can you open teams", "please launch outlook", "bring up the terminal", "open my browser",
+        "close notepad", "close chrome", "quit excel", "is chrome running",
+    ],
+    "writer": [
+        "write an essay about artificial intelligence", "write about climate change",
+        "write a 500-word essay about ai ethics in word", "write an article on renewable energy",
+        "compose text about the ocean", "create a document about history",
+        "write a poem about the sea", "draft a letter to my manager", "write a story about a dragon",
+        "write a blog post about travel in wordpad", "write a report on global warming in notepad",
+        "summarize the benefits of exercise in a document", "write a cover letter",
+    ],
+    "code": [
+        "write python code for fibonacci", "create python fibonacci sequence code in notepad",
+        "generate java program to reverse a string", "write a function to sort a list",
+        "c++ program for binary search", "javascript code to validate email",
+        "write an algorithm for bubble sort", "code to check prime numbers",
+        "program that reads a csv file", "implement quicksort in python", "write a sql query example",
+        "generate a python script to rename files", "write a recursive factorial function",
+    ],
+    "file": [
+        "list files in d drive", "list contents of e drive", "create folder project in d drive",
+        "create a folder named reports on e drive", "show files in the downloads folder",
+        "make a new directory called photos", "what is inside d drive", "list the documents folder",
+        "where is my report.docx", "find the file budget.xlsx", "search for pdf files",
+        "what is taking space on d drive", "show disk usage of e drive", "delete empty folder",
+    ],
+    "calc": [
+        "calculate 25*4+18/3", "calculate (25*4)+(18/3)", "what is 15 + 27", "3+5+2", "12 * 8",
+        "100 / 4", "compute 2 to the power of 10", "what is 45 minus 17", "solve 3*(4+5)",
+        "square root of 144", "how much is 18 percent of 250", "calculate these line totals",
+        "add 250 and 375", "multiply 12 by 9", "divide 100 by 7", "7-3", "calc 9/3",
+    ],
+    "system": [
+        "increase brightness", "decrease the brightness", "set brightness to 70%", "lower volume",
+        "turn up the volume", "mute volume", "unmute the sound", "set volume to 40 percent",
+        "enable bluetooth", "turn off bluetooth", "disable bluetooth", "make the screen brighter",
+        "make it quieter", "what is the current volume", "dim the screen", "turn on bluetooth",
+    ],
+}
+
+
+class RouteResult(NamedTuple):
+    agent: str
+    score: float
+    fallback: bool
+
+
+class IntentRouter:
+    """Routes user input to an agent by hashed character n-gram similarity.
+
+    Exemplar phrases are vectorized once at construction; classifying a batch is
+    a single matrix product against the exemplar matrix followed by a per-agent
+    max. Scores below ``threshold`` are routed to ``fallback_agent``.
+    """
+
+    def __init__(self, examples: Optional[Dict[str, List[str]]] = None, dim: int = 4096,
+                 ngram_range: Sequence[int] = (2, 4), threshold: float = 0.25,
+                 fallback_agent: str = "app"):
+        self.examples = dict(INTENT_EXAMPLES if examples is None else examples)
+        self.dim = dim
+        self.ngram_range = tuple(ngram_range)
+        self.threshold = threshold
+        self.fallback_agent = fallback_agent
+
+        self.agents = list(self.examples)
+        phrases = [p for agent in self.agents for p in self.examples[agent]]
+        sizes = [len(self.examples[agent]) for agent in self.agents]
+        # Exemplars are grouped per agent so per-agent maxima are one reduceat
+        self._group_starts = np.cumsum([0] + sizes[:-1])
+        self._exemplars = self.vectorize(phrases)
+
+    def _features(self, text: str) -> List[int]:
+        # Digits are folded so "12*8" and "3*4" share n-grams
+        text = re.sub(r"\d", "0", " ".join(text.lower().split()))
+        padded = f" {text} "
+        lo, hi = self.ngram_range
+        buckets = [zlib.crc32(padded[i:i + n].encode("utf-8")) % self.dim
+                   for n in range(lo, hi + 1) for i in range(len(padded) - n + 1)]
+        # Whole words as extra features so keywords weigh more than shared letters
+        buckets.extend(zlib.crc32(f"w:{w}".encode("utf-8")) % self.dim for w in text.split())
+        return buckets
+
+    def vectorize(self, texts: Sequence[str]) -> np.ndarray:
+        """Return L2-normalized hashed n-gram vectors, one row per text."""
+        flat = [row * self.dim + bucket for row, text in enumerate(texts) for bucket in self._features(text)]
+        counts = np.bincount(np.asarray(flat, dtype=np.int64), minlength=len(texts) * self.dim)
+        matrix = counts.reshape(len(texts), self.dim).astype(np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+    def classify(self, texts: List[str]) -> List[RouteResult]:
+        """Classify a batch of inputs; returns one RouteResult per input."""
+        if not texts:
+            return []
+        similarities = self.vectorize(texts) @ self._exemplars.T
+        per_agent = np.maximum.reduceat(similarities, self._group_starts, axis=1)
+        best = per_agent.argmax(axis=1)
+        scores = np.clip(per_agent[np.arange(len(texts)), best], 0.0, 1.0)
+
+        results = []
+        for index, score in zip(best, scores):
+            score = float(score)
+            if score < self.threshold:
+                results.append(RouteResult(self.fallback_agent, score, True))
+            else:
+                results.append(RouteResult(self.agents[index], score, False))
+        return results
+
+    def route(self, text: str) -> RouteResult:
+        """Classify a single input."""
+        return self.classify([text])[0]
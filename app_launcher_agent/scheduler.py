@@ -0,0 +1,286 @@
+import asyncio
+import functools
+import inspect
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+from .tracing import span
+
+# Resources tools declare; anything else is an opaque exclusive-by-name key
+FOCUS = "gui.focus"  # Keyboard input and the foreground window
+AUDIO = "device.audio"
+DISPLAY = "device.display"
+BLUETOOTH = "device.bluetooth"
+
+
+def path_resource(path: str) -> str:
+    """Resource key for a filesystem path; it overlaps its ancestors and descendants."""
+    return "fs:" + os.path.normcase(os.path.abspath(path)).rstrip("\\/")
+
+
+def overlaps(a: str, b: str) -> bool:
+    if a == b:
+        return True
+    if a.startswith("fs:") and b.startswith("fs:"):
+        shorter, longer = sorted((a[3:], b[3:]), key=len)
+        return longer.startswith(shorter) and longer[len(shorter)] in "\\/"
+    return False
+
+
+class Grant:
+    """A set of resources held together: ``exclusive`` ones conflict with any overlapping
+    use, ``shared`` ones only with overlapping exclusive use."""
+
+    __slots__ = ("exclusive", "shared", "owner")
+
+    def __init__(self, exclusive: FrozenSet[str], shared: FrozenSet[str], owner):
+        self.exclusive = exclusive
+        self.shared = shared
+        self.owner = owner
+
+    @property
+    def resources(self) -> FrozenSet[str]:
+        return self.exclusive | self.shared
+
+    def conflicts(self, other: "Grant") -> bool:
+        return any(overlaps(a, b) for a in self.exclusive for b in other.resources) or \
+            any(overlaps(a, b) for a in self.shared for b in other.exclusive)
+
+
+class _Waiter:
+    __slots__ = ("grant", "event", "loop", "future", "enqueued")
+
+    def __init__(self, grant: Grant, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.grant = grant
+        self.loop = loop
+        self.future: Optional[asyncio.Future] = loop.create_future() if loop else None
+        self.event = None if loop else threading.Event()
+        self.enqueued = time.perf_counter()
+
+    def wake(self) -> None:
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+def _owner():
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        task = None
+    return task if task is not None else threading.get_ident()
+
+
+class ResourceScheduler:
+    """Lets tool calls run in parallel unless they need conflicting resources.
+
+    Each call names the resources it uses (keyboard focus, an audio device,
+    a filesystem path, ...). Calls whose resources do not conflict proceed
+    at once; conflicting ones queue in arrival order. A queued call is
+    admitted only when it conflicts with nothing held and with nothing
+    queued ahead of it, so a stream of shared users cannot starve an
+    exclusive one. Resources already held by the calling thread (or task)
+    are not requested again, so declared tools can call each other.
+
+    A call may ``linger``: its resources stay held for that many seconds
+    after it returns (when it succeeded), for effects that outlive the call,
+    such as a launched window that takes the keyboard focus once it is up.
+    A lingering grant belongs to no one, so even its own thread queues for it.
+
+    Time spent queued is recorded per resource; see ``stats()`` and
+    ``render()``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._held: List[Grant] = []
+        self._queue: List[_Waiter] = []
+        self._waits: Dict[str, List[float]] = {}  # resource -> [count, sum, max]
+
+    def _request(self, exclusive: Iterable[str], shared: Iterable[str]) -> Optional[Grant]:
+        owner = _owner()
+        exclusive, shared = frozenset(exclusive), frozenset(shared) - frozenset(exclusive)
+        with self._lock:
+            mine = [grant for grant in self._held if grant.owner == owner]
+        held_exclusive = frozenset().union(*(g.exclusive for g in mine))
+        held_shared = frozenset().union(*(g.shared for g in mine))
+        upgrades = exclusive & held_shared - held_exclusive
+        if upgrades:
+            raise RuntimeError(f"Cannot upgrade shared resources to exclusive: {sorted(upgrades)}")
+        exclusive -= held_exclusive
+        shared -= held_exclusive | held_shared
+        if not exclusive and not shared:
+            return None
+        return Grant(exclusive, shared, owner)
+
+    def _enqueue(self, waiter: _Waiter) -> bool:
+        """Queue ``waiter``; True when it was granted immediately."""
+        with self._lock:
+            self._queue.append(waiter)
+            granted = self._grant()
+        return waiter in granted
+
+    def _grant(self) -> List[_Waiter]:
+        """Admit every queued waiter that conflicts with nothing held or ahead of it (lock held)."""
+        granted, ahead = [], []
+        for waiter in self._queue:
+            grant = waiter.grant
+            if any(grant.conflicts(other) for other in self._held) or \
+                    any(grant.conflicts(other.grant) for other in ahead):
+                ahead.append(waiter)
+                continue
+            self._held.append(grant)
+            granted.append(waiter)
+        self._queue = ahead
+        return granted
+
+    def _admitted(self, waiter: _Waiter) -> None:
+        wait = time.perf_counter() - waiter.enqueued
+        with self._lock:
+            for resource in waiter.grant.resources:
+                stats = self._waits.setdefault(resource, [0, 0.0, 0.0])
+                stats[0] += 1
+                stats[1] += wait
+                stats[2] = max(stats[2], wait)
+
+    def _release(self, grant: Grant) -> None:
+        with self._lock:
+            self._held.remove(grant)
+            granted = self._grant()
+        for waiter in granted:
+            waiter.wake()
+
+    def _release_later(self, grant: Grant, linger: float) -> None:
+        if linger <= 0:
+            self._release(grant)
+            return
+        with self._lock:
+            grant.owner = None
+        timer = threading.Timer(linger, self._release, (grant,))
+        timer.daemon = True
+        timer.start()
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        with self._lock:
+            if waiter in self._queue:
+                self._queue.remove(waiter)
+            elif waiter.grant in self._held:
+                # Granted in the meantime; hand it straight back
+                self._held.remove(waiter.grant)
+            granted = self._grant()
+        for other in granted:
+            other.wake()
+
+    @contextmanager
+    def acquire(self, exclusive: Iterable[str] = (), shared: Iterable[str] = (), linger: float = 0.0):
+        """Hold ``exclusive`` and ``shared`` resources for the duration of the block.
+
+        After a block that did not raise they stay held ``linger`` more seconds.
+        """
+        grant = self._request(exclusive, shared)
+        if grant is None:
+            yield
+            return
+        waiter = _Waiter(grant)
+        if not self._enqueue(waiter):
+            with span("scheduler.wait", "queue", resources=sorted(grant.resources)):
+                waiter.event.wait()
+        self._admitted(waiter)
+        try:
+            yield
+        except BaseException:
+            self._release(grant)
+            raise
+        self._release_later(grant, linger)
+
+    @asynccontextmanager
+    async def aacquire(self, exclusive: Iterable[str] = (), shared: Iterable[str] = (), linger: float = 0.0):
+        """Async version of acquire; waits without blocking the event loop."""
+        grant = self._request(exclusive, shared)
+        if grant is None:
+            yield
+            return
+        waiter = _Waiter(grant, asyncio.get_running_loop())
+        if not self._enqueue(waiter):
+            try:
+                with span("scheduler.wait", "queue", resources=sorted(grant.resources)):
+                    await waiter.future
+            except BaseException:
+                self._abandon(waiter)
+                raise
+        self._admitted(waiter)
+        try:
+            yield
+        except BaseException:
+            self._release(grant)
+            raise
+        self._release_later(grant, linger)
+
+    def stats(self) -> Dict[str, Tuple[int, float, float]]:
+        """(admissions, total seconds queued, longest wait) per resource."""
+        with self._lock:
+            return {resource: (int(count), total, longest)
+                    for resource, (count, total, longest) in self._waits.items()}
+
+    def load(self) -> Dict[str, int]:
+        with self._lock:
+            return {"held": len(self._held), "queued": len(self._queue)}
+
+    def render(self, prefix: str = "app_launcher") -> str:
+        """Queue wait per resource in the Prometheus text format."""
+        name = f"{prefix}_resource_wait_seconds"
+        lines = [f"# HELP {name} Time tool calls queued for a resource.", f"# TYPE {name} summary"]
+        for resource, (count, total, _) in sorted(self.stats().items()):
+            label = resource.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{name}_sum{{resource="{label}"}} {total:.6f}')
+            lines.append(f'{name}_count{{resource="{label}"}} {count}')
+        load = self.load()
+        lines += [f"# HELP {prefix}_resource_waiters Tool calls currently queued for resources.",
+                  f"# TYPE {prefix}_resource_waiters gauge",
+                  f"{prefix}_resource_waiters {load['queued']}"]
+        return "\n".join(lines) + "\n"
+
+
+_default_scheduler = ResourceScheduler()
+
+
+def get_scheduler() -> ResourceScheduler:
+    """Return the process-wide scheduler shared by every tool."""
+    return _default_scheduler
+
+
+def requires(*exclusive: str, shared: Iterable[str] = (), scheduler: Optional[ResourceScheduler] = None,
+             linger: Union[float, Callable[[], float]] = 0.0):
+    """Decorator holding resources from the process-wide scheduler around each call (sync or async).
+
+    ``linger`` (seconds, or a function returning them at call time) keeps the
+    resources held after a call returns; see ``ResourceScheduler``.
+    """
+    shared = tuple(shared)
+
+    def seconds() -> float:
+        return linger() if callable(linger) else linger
+
+    def decorator(function: Callable) -> Callable:
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                async with (scheduler or get_scheduler()).aacquire(exclusive, shared, seconds()):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with (scheduler or get_scheduler()).acquire(exclusive, shared, seconds()):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
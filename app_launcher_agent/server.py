@@ -0,0 +1,510 @@
+"""Headless ASGI service exposing routing and the agents to concurrent clients.
+
+Endpoints:
+
+* ``GET /health``: liveness plus current load.
+* ``GET /metrics``: Prometheus text (request counters, queue wait, spans).
+* ``GET /agents``: registered agent names.
+* ``POST /route`` ``{"text"}``: the routed agent and plan, without running.
+* ``POST /run`` ``{"text", "history"?, "no_cache"?}``: route, plan and run.
+* ``POST /agents/<name>/run`` ``{"text", "history"?, "no_cache"?}``: run one agent.
+* ``WS /ws``: send ``{"text", "agent"?, "history"?, "no_cache"?}`` per request; receive
+  ``{"type": "chunk", "text"}`` messages as tools stream generated text,
+  then ``{"type": "result", ...}`` (or ``{"type": "error", ...}``).
+
+``"no_cache": true`` asks for freshly generated text: the request's LLM
+calls skip the response cache.
+
+Every endpoint except ``/health`` requires ``Authorization: Bearer <token>``
+(see ``load_token``). POST bodies must be sent as ``application/json`` and
+requests carrying an ``Origin`` header (browsers) are refused unless the
+origin is allowed, so a web page cannot drive the agents through the
+user's browser.
+
+Agents run on a bounded thread pool. At most ``max_workers + max_queue``
+requests are admitted at once; beyond that HTTP requests get 503 with a
+Retry-After header and WebSocket requests an error message, instead of
+piling up unbounded work.
+
+Run with ``python -m app_launcher_agent.server`` (requires uvicorn).
+"""
+import asyncio
+import contextvars
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from .llm_cache import bypassing_cache
+from .planner import CommandPlanner, PlanExecutor, run_plan
+from .registry import AgentRegistry
+from .router import IntentRouter
+from .scheduler import ResourceScheduler, get_scheduler
+from .streaming import TokenStream, streaming_to
+from .tracing import PrometheusExporter, Tracer, get_tracer, span
+from .utils import get_cache_dir
+
+_END = object()
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: Tuple[Tuple[bytes, bytes], ...] = ()):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers
+
+
+class _LoopTokenStream(TokenStream):
+    """TokenStream whose chunks are consumed on an event loop instead of a blocking iterator."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        super().__init__()
+        self._loop = loop
+        self._chunks: "asyncio.Queue" = asyncio.Queue()
+
+    def put(self, chunk: str) -> None:
+        if not chunk or self.closed:
+            return
+        if self.first_chunk_latency is None:
+            self.first_chunk_latency = time.perf_counter() - self.created_at
+        self._loop.call_soon_threadsafe(self._chunks.put_nowait, chunk)
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self._loop.call_soon_threadsafe(self._chunks.put_nowait, _END)
+
+    async def chunks(self):
+        while True:
+            chunk = await self._chunks.get()
+            if chunk is _END:
+                return
+            yield chunk
+
+
+def token_path() -> str:
+    return os.path.join(get_cache_dir("server"), "api_token")
+
+
+def load_token() -> str:
+    """The API token: ``APP_LAUNCHER_API_TOKEN``, else the contents of the file named by
+    ``APP_LAUNCHER_API_TOKEN_FILE``, else a random token kept in ``token_path()``
+    (created with owner-only permissions on first use)."""
+    token = os.getenv("APP_LAUNCHER_API_TOKEN")
+    if token:
+        return token.strip()
+    path = os.getenv("APP_LAUNCHER_API_TOKEN_FILE") or token_path()
+    try:
+        with open(path, encoding="utf-8") as f:
+            token = f.read().strip()
+    except FileNotFoundError:
+        if os.getenv("APP_LAUNCHER_API_TOKEN_FILE"):
+            raise
+        token = ""
+    if token:
+        return token
+    token = secrets.token_urlsafe(32)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+    return token
+
+
+def _allowed_origins_from_env() -> List[str]:
+    return [origin.strip() for origin in os.getenv("APP_LAUNCHER_ALLOWED_ORIGINS", "").split(",") if origin.strip()]
+
+
+def _headers(scope) -> Dict[bytes, bytes]:
+    return {name.lower(): value for name, value in scope.get("headers", [])}
+
+
+def parse_history(history: Any) -> List:
+    """Chat history from ``[{"role": "user"|"assistant", "content": ...}, ...]``."""
+    if history is None:
+        return []
+    if not isinstance(history, list):
+        raise HTTPError(400, "'history' must be a list of messages")
+    messages = []
+    for item in history:
+        if not isinstance(item, dict) or item.get("role") not in ("user", "assistant"):
+            raise HTTPError(400, "History messages need a 'role' of 'user' or 'assistant'")
+        message_class = HumanMessage if item["role"] == "user" else AIMessage
+        messages.append(message_class(content=str(item.get("content", ""))))
+    return messages
+
+
+class AgentServer:
+    """ASGI application serving an ``AgentRegistry``.
+
+    ``max_workers`` agent runs execute at once; up to ``max_queue`` more wait
+    for a worker. Within that, tools that drive shared resources (keyboard
+    focus, audio, paths) are ordered by the resource scheduler.
+    ``request_timeout`` bounds how long a client waits for a result (the run
+    itself cannot be interrupted and keeps its worker).
+    """
+
+    def __init__(self, registry: AgentRegistry, router: Optional[IntentRouter] = None,
+                 planner: Optional[CommandPlanner] = None, max_workers: int = 4, max_queue: int = 16,
+                 request_timeout: float = 120.0, max_body: int = 1 << 20, tracer: Optional[Tracer] = None,
+                 scheduler: Optional[ResourceScheduler] = None, token: Optional[str] = None,
+                 allowed_origins: Optional[Iterable[str]] = None):
+        self.registry = registry
+        self.router = router or IntentRouter()
+        self.planner = planner or CommandPlanner(self.router)
+        self.plan_executor = PlanExecutor(max_workers=max_workers)
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.request_timeout = request_timeout
+        self.max_body = max_body
+        self.tracer = tracer or get_tracer()
+        self.scheduler = scheduler or get_scheduler()
+        self._token = (token or load_token()).encode()
+        self.allowed_origins = set(_allowed_origins_from_env() if allowed_origins is None else allowed_origins)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-worker")
+        self._admitted = 0  # Only touched on the event loop
+        self._running = 0
+        self._stats_lock = threading.Lock()
+        self._responses: Dict[Tuple[str, int], int] = {}
+        self._rejected = 0
+        self._queue_wait_sum = 0.0
+        self._queue_wait_count = 0
+        self._started = time.time()
+
+    # Admission and execution
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def load(self) -> Dict[str, int]:
+        with self._stats_lock:
+            running = self._running
+        return {"admitted": self._admitted, "running": running,
+                "queued": max(0, self._admitted - running), "capacity": self.capacity}
+
+    def _admit(self) -> None:
+        if self._admitted >= self.capacity:
+            with self._stats_lock:
+                self._rejected += 1
+            raise HTTPError(503, "Server is at capacity, retry later", ((b"retry-after", b"1"),))
+        self._admitted += 1
+
+    def _release(self, _future=None) -> None:
+        self._admitted -= 1
+
+    async def execute(self, text: str, agent: Optional[str] = None, history: Optional[List] = None,
+                      stream: Optional[TokenStream] = None, no_cache: bool = False) -> Dict[str, Any]:
+        """Run a request on the worker pool, subject to admission control.
+
+        ``no_cache`` sends every LLM call of the request to the model instead
+        of the response cache.
+        """
+        if not text or not isinstance(text, str):
+            raise HTTPError(400, "'text' must be a non-empty string")
+        if agent is not None and agent not in self.registry.names():
+            raise HTTPError(404, f"Unknown agent: {agent}")
+        self._admit()
+
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        future = loop.run_in_executor(self._pool, context.run, self._run, text, agent, history or [],
+                                      stream, no_cache, time.perf_counter())
+        # The slot is held until the worker is really done, even if the client gave up
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.request_timeout)
+        except asyncio.TimeoutError:
+            raise HTTPError(504, f"Request did not finish within {self.request_timeout}s")
+
+    def _run(self, text: str, agent: Optional[str], history: List, stream: Optional[TokenStream],
+             no_cache: bool, enqueued: float) -> Dict[str, Any]:
+        queue_wait = time.perf_counter() - enqueued
+        with self._stats_lock:
+            self._running += 1
+            self._queue_wait_sum += queue_wait
+            self._queue_wait_count += 1
+        try:
+            with self.tracer.request("api", agent=agent or "auto") as trace, streaming_to(stream), \
+                    bypassing_cache(no_cache):
+                if agent is not None:
+                    agents = [agent]
+                    result = self.registry.get(agent).run(text, history)
+                else:
+                    with span("plan", "router"):
+                        steps = self.planner.plan(text)
+                    agents = [step.agent for step in steps]
+                    if len(steps) > 1:
+                        result = run_plan(steps, self.registry, history, self.plan_executor)
+                    else:
+                        result = self.registry.get(steps[0].agent).run(text, history)
+            return {
+                "result": result,
+                "agents": agents,
+                "trace_id": trace.trace_id,
+                "queue_ms": round(queue_wait * 1000, 3),
+                "duration_ms": round(trace.duration * 1000, 3),
+            }
+        finally:
+            with self._stats_lock:
+                self._running -= 1
+            if stream is not None:
+                stream.close()
+
+    def route(self, text: str) -> Dict[str, Any]:
+        if not text or not isinstance(text, str):
+            raise HTTPError(400, "'text' must be a non-empty string")
+        result = self.router.route(text)
+        steps = self.planner.plan(text)
+        return {
+            "agent": result.agent,
+            "score": round(float(result.score), 4),
+            "fallback": result.fallback,
+            "plan": [{"index": s.index, "text": s.text, "agent": s.agent, "depends_on": list(s.depends_on)}
+                     for s in steps],
+        }
+
+    # Metrics
+
+    def metrics(self) -> str:
+        load = self.load()
+        with self._stats_lock:
+            responses = sorted(self._responses.items())
+            rejected = self._rejected
+            wait_sum, wait_count = self._queue_wait_sum, self._queue_wait_count
+        lines = [
+            "# HELP app_launcher_http_responses_total Responses by endpoint and status.",
+            "# TYPE app_launcher_http_responses_total counter",
+        ]
+        lines += [f'app_launcher_http_responses_total{{endpoint="{endpoint}",status="{status}"}} {count}'
+                  for (endpoint, status), count in responses]
+        lines += [
+            "# HELP app_launcher_rejected_total Requests refused because the server was at capacity.",
+            "# TYPE app_launcher_rejected_total counter",
+            f"app_launcher_rejected_total {rejected}",
+            "# HELP app_launcher_queue_wait_seconds Time admitted requests waited for a worker.",
+            "# TYPE app_launcher_queue_wait_seconds summary",
+            f"app_launcher_queue_wait_seconds_sum {wait_sum:.6f}",
+            f"app_launcher_queue_wait_seconds_count {wait_count}",
+            "# HELP app_launcher_requests_in_flight Requests running or waiting for a worker.",
+            "# TYPE app_launcher_requests_in_flight gauge",
+            f'app_launcher_requests_in_flight{{state="running"}} {load["running"]}',
+            f'app_launcher_requests_in_flight{{state="queued"}} {load["queued"]}',
+        ]
+        text = "\n".join(lines) + "\n" + self.scheduler.render()
+        for exporter in self.tracer.exporters:
+            if isinstance(exporter, PrometheusExporter):
+                text += exporter.render()
+        return text
+
+    def _count(self, endpoint: str, status: int) -> None:
+        with self._stats_lock:
+            key = (endpoint, status)
+            self._responses[key] = self._responses.get(key, 0) + 1
+
+    # Access control
+
+    def _check_access(self, headers: Dict[bytes, bytes]) -> None:
+        origin = headers.get(b"origin")
+        if origin is not None and origin.decode("latin-1") not in self.allowed_origins:
+            raise HTTPError(403, "Origin not allowed")
+        scheme, _, token = headers.get(b"authorization", b"").partition(b" ")
+        if scheme.lower() != b"bearer" or not hmac.compare_digest(token.strip(), self._token):
+            raise HTTPError(401, "Missing or invalid bearer token", ((b"www-authenticate", b"Bearer"),))
+
+    # ASGI
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] == "http":
+            await self._http(scope, receive, send)
+        elif scope["type"] == "websocket":
+            await self._websocket(scope, receive, send)
+        elif scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self._pool.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send) -> None:
+        method, path = scope["method"], scope["path"].rstrip("/") or "/"
+        endpoint = path if not path.startswith("/agents/") else "/agents/run"
+        headers = _headers(scope)
+        try:
+            if path != "/health":
+                self._check_access(headers)
+            if method == "POST" and headers.get(b"content-type", b"").split(b";")[0].strip().lower() \
+                    != b"application/json":
+                raise HTTPError(415, "POST bodies must be application/json")
+            if method == "GET" and path == "/health":
+                status, body = 200, {"status": "ok", "uptime_s": round(time.time() - self._started, 3),
+                                     **self.load(), "resources": self.scheduler.load()}
+            elif method == "GET" and path == "/metrics":
+                self._count(endpoint, 200)
+                await _send_response(send, 200, self.metrics().encode(),
+                                     b"text/plain; version=0.0.4; charset=utf-8")
+                return
+            elif method == "GET" and path == "/agents":
+                status, body = 200, {"agents": self.registry.names()}
+            elif method == "POST" and path == "/route":
+                payload = await self._read_json(receive)
+                status, body = 200, self.route(payload.get("text"))
+            elif method == "POST" and path == "/run":
+                payload = await self._read_json(receive)
+                status, body = 200, await self.execute(payload.get("text"), None,
+                                                       parse_history(payload.get("history")),
+                                                       no_cache=bool(payload.get("no_cache")))
+            elif method == "POST" and path.startswith("/agents/") and path.endswith("/run"):
+                name = path[len("/agents/"):-len("/run")]
+                payload = await self._read_json(receive)
+                status, body = 200, await self.execute(payload.get("text"), name,
+                                                       parse_history(payload.get("history")),
+                                                       no_cache=bool(payload.get("no_cache")))
+            else:
+                raise HTTPError(404, f"No route for {method} {path}")
+        except HTTPError as e:
+            self._count(endpoint, e.status)
+            await _send_json(send, e.status, {"error": e.message}, e.headers)
+            return
+        except Exception as e:
+            self._count(endpoint, 500)
+            await _send_json(send, 500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self._count(endpoint, status)
+        await _send_json(send, status, body)
+
+    async def _read_json(self, receive) -> Dict[str, Any]:
+        body = b""
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise HTTPError(400, "Client disconnected")
+            body += message.get("body", b"")
+            if len(body) > self.max_body:
+                raise HTTPError(413, "Request body too large")
+            if not message.get("more_body"):
+                break
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Body must be JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        return payload
+
+    async def _websocket(self, scope, receive, send) -> None:
+        message = await receive()
+        if message["type"] != "websocket.connect":
+            return
+        if scope["path"].rstrip("/") != "/ws":
+            await send({"type": "websocket.close", "code": 1008})
+            return
+        try:
+            # Browsers send cookies but no Authorization header cross-site;
+            # the Origin check also stops a page from hijacking a socket
+            self._check_access(_headers(scope))
+        except HTTPError as e:
+            self._count("/ws", e.status)
+            await send({"type": "websocket.close", "code": 1008})
+            return
+        await send({"type": "websocket.accept"})
+
+        while True:
+            message = await receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message["type"] != "websocket.receive":
+                continue
+            try:
+                payload = json.loads(message.get("text") or message.get("bytes") or b"{}")
+            except ValueError:
+                payload = None
+            try:
+                if not isinstance(payload, dict):
+                    raise HTTPError(400, "Message must be a JSON object")
+                stream = _LoopTokenStream(asyncio.get_running_loop())
+                run = asyncio.ensure_future(self.execute(payload.get("text"), payload.get("agent"),
+                                                         parse_history(payload.get("history")), stream,
+                                                         bool(payload.get("no_cache"))))
+                # If execute() is refused the worker never closes the stream
+                run.add_done_callback(lambda _: stream.close())
+                async for chunk in stream.chunks():
+                    await send({"type": "websocket.send", "text": json.dumps({"type": "chunk", "text": chunk})})
+                reply = {"type": "result", **(await run)}
+                self._count("/ws", 200)
+            except HTTPError as e:
+                self._count("/ws", e.status)
+                reply = {"type": "error", "status": e.status, "error": e.message}
+            except Exception as e:
+                self._count("/ws", 500)
+                reply = {"type": "error", "status": 500, "error": f"{type(e).__name__}: {e}"}
+            await send({"type": "websocket.send", "text": json.dumps(reply)})
+
+
+async def _send_response(send, status: int, body: bytes, content_type: bytes,
+                         headers: Tuple[Tuple[bytes, bytes], ...] = ()) -> None:
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode()), *headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_json(send, status: int, payload: Dict[str, Any],
+                     headers: Tuple[Tuple[bytes, bytes], ...] = ()) -> None:
+    body = json.dumps(payload, default=str).encode()
+    await _send_response(send, status, body, b"application/json", headers)
+
+
+def create_app(llm, max_workers: int = 4, max_queue: int = 16, **kwargs) -> AgentServer:
+    """An ``AgentServer`` over the default agents, built lazily with ``llm``."""
+    return AgentServer(AgentRegistry(llm), max_workers=max_workers, max_queue=max_queue, **kwargs)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve the app launcher agents over HTTP and WebSocket.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=4, help="Agent runs executing at once")
+    parser.add_argument("--max-queue", type=int, default=16, help="Admitted runs waiting for a worker")
+    parser.add_argument("--allow-origin", action="append", default=None,
+                        help="Browser origin allowed to call the API (repeatable)")
+    args = parser.parse_args(argv)
+
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("The server needs uvicorn: pip install uvicorn")
+    from dotenv import load_dotenv
+    from langchain_openai import ChatOpenAI
+
+    load_dotenv()
+    llm = ChatOpenAI(
+        model="gpt-3.5-turbo",
+        temperature=0.1,
+        base_url="https://api.nexus.navigatelabsai.com",
+        api_key=os.getenv("API_KEY")
+    )
+    app = create_app(llm, args.workers, args.max_queue, allowed_origins=args.allow_origin)
+    if not os.getenv("APP_LAUNCHER_API_TOKEN") and not os.getenv("APP_LAUNCHER_API_TOKEN_FILE"):
+        print(f"API token is stored in {token_path()}")
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,283 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.tracers.context import register_configure_hook
+
+from .utils import get_cache_dir
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    title TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    name TEXT,
+    created REAL NOT NULL,
+    compressed INTEGER NOT NULL,
+    content BLOB NOT NULL,
+    PRIMARY KEY (session_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS sessions_updated ON sessions (updated);
+"""
+
+_ROLES = {HumanMessage: "user", AIMessage: "assistant", SystemMessage: "system"}
+_MESSAGE_TYPES = {role: message_type for message_type, role in _ROLES.items()}
+
+
+class StoredMessage(NamedTuple):
+    seq: int
+    role: str
+    content: str
+    created: float
+    name: Optional[str] = None
+
+
+class SessionInfo(NamedTuple):
+    id: str
+    title: Optional[str]
+    created: float
+    updated: float
+    messages: int
+
+
+def _default_db_path() -> str:
+    return os.path.join(get_cache_dir("history"), "conversations.sqlite3")
+
+
+class ConversationStore:
+    """Append-only SQLite (WAL) log of chat turns and tool results.
+
+    Appends are buffered and committed in batches of ``batch_size`` (or once
+    ``flush_interval`` seconds have passed since the last commit, checked on
+    append); call ``flush`` at the end of a turn to make it durable. Contents
+    of at least ``compress_threshold`` bytes are stored zlib-compressed when
+    that makes them smaller. Sessions are read back a page at a time, newest
+    first, so resuming an old session never loads all of it.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, batch_size: int = 16, flush_interval: float = 1.0,
+                 compress_threshold: int = 4096):
+        self.db_path = db_path or _default_db_path()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.compress_threshold = compress_threshold
+        self._lock = threading.RLock()
+        self._pending: List[Tuple] = []
+        self._touched: Dict[str, float] = {}
+        self._next_seq: Dict[str, int] = {}
+        self._last_flush = time.monotonic()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+    def create_session(self, title: Optional[str] = None) -> str:
+        session_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO sessions VALUES (?, ?, ?, ?)", (session_id, title, now, now))
+        self._next_seq[session_id] = 0
+        return session_id
+
+    def has_session(self, session_id: str) -> bool:
+        with self._lock:
+            return self._conn.execute("SELECT 1 FROM sessions WHERE id = ?", (session_id,)).fetchone() is not None
+
+    def _encode(self, content: str) -> Tuple[int, bytes]:
+        data = content.encode("utf-8")
+        if len(data) >= self.compress_threshold:
+            packed = zlib.compress(data, 6)
+            if len(packed) < len(data):
+                return 1, packed
+        return 0, data
+
+    @staticmethod
+    def _decode(compressed: int, data: bytes) -> str:
+        return (zlib.decompress(data) if compressed else bytes(data)).decode("utf-8")
+
+    def _seq(self, session_id: str) -> int:
+        if session_id not in self._next_seq:
+            row = self._conn.execute("SELECT MAX(seq) FROM messages WHERE session_id = ?", (session_id,)).fetchone()
+            self._next_seq[session_id] = 0 if row[0] is None else row[0] + 1
+        seq = self._next_seq[session_id]
+        self._next_seq[session_id] = seq + 1
+        return seq
+
+    def append(self, session_id: str, message: Union[BaseMessage, str], content: Optional[str] = None,
+               name: Optional[str] = None) -> int:
+        """Queue a message (a LangChain message, or a role plus content) and return its sequence number."""
+        if isinstance(message, BaseMessage):
+            role = _ROLES.get(type(message), "assistant")
+            content = message.content
+        else:
+            role = message
+        now = time.time()
+        with self._lock:
+            seq = self._seq(session_id)
+            compressed, data = self._encode(content or "")
+            self._pending.append((session_id, seq, role, name, now, compressed, data))
+            self._touched[session_id] = now
+            if (len(self._pending) >= self.batch_size
+                    or time.monotonic() - self._last_flush >= self.flush_interval):
+                self.flush()
+        return seq
+
+    def append_tool_result(self, session_id: str, tool_name: str, output: str) -> int:
+        """Log a tool's raw output next to the turn that produced it."""
+        return self.append(session_id, "tool", output, name=tool_name)
+
+    def append_tool_results(self, session_id: str, recorder: "ToolResultRecorder") -> None:
+        for tool_name, output in recorder.results:
+            self.append_tool_result(session_id, tool_name, output)
+
+    def flush(self) -> None:
+        """Commit all queued messages in one transaction."""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending:
+                return
+            with self._conn:
+                self._conn.executemany("INSERT INTO messages VALUES (?, ?, ?, ?, ?, ?, ?)", self._pending)
+                self._conn.executemany("UPDATE sessions SET updated = ? WHERE id = ?",
+                                       [(updated, session_id) for session_id, updated in self._touched.items()])
+            self._pending = []
+            self._touched = {}
+
+    def load_records(self, session_id: str, limit: int = 50, before: Optional[int] = None,
+                     roles: Optional[Tuple[str, ...]] = None) -> List[StoredMessage]:
+        """Up to ``limit`` messages older than sequence number ``before``, oldest first."""
+        clauses, params = ["session_id = ?"], [session_id]
+        if before is not None:
+            clauses.append("seq < ?")
+            params.append(before)
+        if roles:
+            clauses.append(f"role IN ({', '.join('?' for _ in roles)})")
+            params.extend(roles)
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(
+                f"SELECT seq, role, name, created, compressed, content FROM messages "
+                f"WHERE {' AND '.join(clauses)} ORDER BY seq DESC LIMIT ?", (*params, limit)).fetchall()
+        return [StoredMessage(seq, role, self._decode(compressed, content), created, name)
+                for seq, role, name, created, compressed, content in reversed(rows)]
+
+    def load_messages(self, session_id: str, limit: int = 50,
+                      before: Optional[int] = None) -> Tuple[List[BaseMessage], Optional[int]]:
+        """A page of chat messages (tool results excluded) and the cursor for the previous page.
+
+        The cursor is None when the page reaches the start of the session.
+        """
+        records = self.load_records(session_id, limit, before, roles=tuple(_MESSAGE_TYPES))
+        messages = [_MESSAGE_TYPES[record.role](content=record.content) for record in records]
+        cursor = records[0].seq if len(records) == limit and records[0].seq > 0 else None
+        return messages, cursor
+
+    def page_start(self, session_id: str, newest: int) -> Optional[int]:
+        """Sequence number of the oldest of the ``newest`` latest chat messages.
+
+        Used as the ``before`` cursor after dropping older messages from memory.
+        """
+        if newest <= 0:
+            return None
+        roles = tuple(_MESSAGE_TYPES)
+        with self._lock:
+            self.flush()
+            row = self._conn.execute(
+                f"SELECT seq FROM messages WHERE session_id = ? AND role IN ({', '.join('?' for _ in roles)}) "
+                f"ORDER BY seq DESC LIMIT 1 OFFSET ?", (session_id, *roles, newest - 1)).fetchone()
+        return row[0] if row else None
+
+    def count(self, session_id: str) -> int:
+        with self._lock:
+            self.flush()
+            return self._conn.execute("SELECT COUNT(*) FROM messages WHERE session_id = ?",
+                                      (session_id,)).fetchone()[0]
+
+    def sessions(self, limit: int = 20, offset: int = 0) -> List[SessionInfo]:
+        """Sessions, most recently updated first."""
+        with self._lock:
+            self.flush()
+            rows = self._conn.execute(
+                "SELECT s.id, s.title, s.created, s.updated, "
+                "(SELECT COUNT(*) FROM messages m WHERE m.session_id = s.id) "
+                "FROM sessions s ORDER BY s.updated DESC LIMIT ? OFFSET ?", (limit, offset)).fetchall()
+        return [SessionInfo(*row) for row in rows]
+
+    def set_title(self, session_id: str, title: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE sessions SET title = ? WHERE id = ?", (title, session_id))
+
+
+class ToolResultRecorder(BaseCallbackHandler):
+    """Collects (tool name, output) for every LangChain tool run, in the order they finish."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.results: List[Tuple[str, str]] = []
+        self._names: Dict[UUID, str] = {}
+        self._lock = threading.Lock()
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        with self._lock:
+            self._names[run_id] = kwargs.get("name") or (serialized or {}).get("name") or "tool"
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._record(run_id, str(getattr(output, "content", output)))
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._record(run_id, f"Error: {error}")
+
+    def _record(self, run_id: UUID, output: str) -> None:
+        with self._lock:
+            self.results.append((self._names.pop(run_id, "tool"), output))
+
+
+_tool_recorder: ContextVar[Optional[ToolResultRecorder]] = ContextVar("tool_results", default=None)
+
+# Every LangChain run started inside recording_tool_results() reports to its recorder
+register_configure_hook(_tool_recorder, inheritable=True)
+
+
+@contextmanager
+def recording_tool_results() -> Iterator[ToolResultRecorder]:
+    """Collect the output of tools run in this context (and contexts copied from it)."""
+    recorder = ToolResultRecorder()
+    token = _tool_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _tool_recorder.reset(token)
+
+
+_default_store: Optional[ConversationStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_conversation_store() -> ConversationStore:
+    """Return the process-wide conversation store."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = ConversationStore()
+    return _default_store
@@ -0,0 +1,59 @@
+import queue
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+_SENTINEL = object()
+
+
+class TokenStream:
+    """Thread-safe stream of text chunks from a producer (tool) to a consumer (UI).
+
+    Iterating blocks until the next chunk arrives and stops once ``close()`` has
+    been called. ``first_chunk_latency`` records the seconds from creation to the
+    first chunk, i.e. the time to first visible output.
+    """
+
+    def __init__(self):
+        self._queue: "queue.Queue" = queue.Queue()
+        self.created_at = time.perf_counter()
+        self.first_chunk_latency: Optional[float] = None
+        self.closed = False
+
+    def put(self, chunk: str) -> None:
+        if not chunk or self.closed:
+            return
+        if self.first_chunk_latency is None:
+            self.first_chunk_latency = time.perf_counter() - self.created_at
+        self._queue.put(chunk)
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self._queue.put(_SENTINEL)
+
+    def __iter__(self) -> Iterator[str]:
+        while True:
+            chunk = self._queue.get()
+            if chunk is _SENTINEL:
+                return
+            yield chunk
+
+
+_current_stream: ContextVar[Optional[TokenStream]] = ContextVar("token_stream", default=None)
+
+
+@contextmanager
+def streaming_to(stream: Optional[TokenStream]):
+    """Make tools called inside this block publish generated text to ``stream``."""
+    token = _current_stream.set(stream)
+    try:
+        yield stream
+    finally:
+        _current_stream.reset(token)
+
+
+def current_stream() -> Optional[TokenStream]:
+    """The stream tools should publish to, if the caller asked for one."""
+    return _current_stream.get()
@@ -1,12 +1,27 @@
-from typing import List, Union
+import asyncio
+import re
+from typing import List, Optional, Tuple, Union
 from langchain.agents import AgentExecutor, Tool, create_react_agent
-from langchain import hub
 from langchain_core.messages import AIMessage, HumanMessage
 from .tools import SystemOperationsTool
+from .prompts import load_react_prompt
+
+_INCREASE_WORDS = {"increase", "up", "raise", "higher", "louder", "brighter", "more"}
+_DECREASE_WORDS = {"decrease", "down", "lower", "reduce", "quieter", "softer", "dimmer", "darker", "dim", "less"}
+# Relative phrasing that names its control ("make the screen darker")
+_BRIGHTNESS_WORDS = {"brighter", "dimmer", "darker", "dim"}
+_VOLUME_WORDS = {"louder", "quieter", "softer"}
+_SET_WORDS = {"set", "make", "change", "put", "adjust", "turn"}
+_QUERY_WORDS = ("what", "current", "how loud", "how bright", "check", "level is")
+_LEVEL = re.compile(r"\b(\d{1,3})\s*(?:%|percent\b)?")
+_TO_LEVEL = re.compile(r"\bto\s+(\d{1,3})\b")
+_BY_LEVEL = re.compile(r"\bby\s+(\d{1,3})\b")
 
 class SystemControlAgent:
-    def __init__(self, llm):
+    def __init__(self, llm, system_tool: Optional[SystemOperationsTool] = None):
         self.llm = llm
+        # One tool (and backend) for the agent's lifetime, so device handles are reused
+        self.system_tool = system_tool or SystemOperationsTool()
         self.tools = self._setup_tools()
         self.agent = self._setup_agent()
         self.agent_executor = AgentExecutor(
@@ -22,30 +37,102 @@ class SystemControlAgent:
             Tool(
                 name="windows_system_control",
                 func=self._handle_windows_operation,
-                description="Windows system controls: brightness, volume, Bluetooth. "
-                          "Commands: 'increase brightness', 'lower volume', 'enable bluetooth'"
+                coroutine=self._ahandle_windows_operation,
+                description="System controls (Windows and Linux): brightness, volume, Bluetooth. "
+                          "Pass the whole request in one call; absolute levels are applied in one step. "
+                          "Commands: 'set brightness to 70%', 'volume up by 10%', 'lower volume', "
+                          "'mute', 'unmute', 'what is the volume', 'enable bluetooth'"
             )
         ]
 
-    def _handle_windows_operation(self, input_text: str) -> str:
+    def _parse_operation(self, input_text: str) -> Tuple[str, str, Optional[int]]:
+        """Return (control, action, amount) for the requested operation.
+
+        Actions are "increase"/"decrease" (by ``amount`` or one step), "set"
+        (to ``amount``), "query", "mute"/"unmute" and "enable"/"disable".
+        """
         input_text = input_text.lower()
+
+        if "bluetooth" in input_text:
+            return "bluetooth", "enable" if any(kw in input_text for kw in ["enable", "turn on"]) else "disable", None
+
+        if re.search(r"\bunmute\b", input_text):
+            return "volume", "unmute", None
+        if re.search(r"\bmute\b", input_text):
+            return "volume", "mute", None
+
+        words = set(re.findall(r"[a-z]+", input_text))
+        if "brightness" in input_text or words & _BRIGHTNESS_WORDS:
+            control = "brightness"
+        elif "volume" in input_text or "sound" in input_text or words & _VOLUME_WORDS:
+            control = "volume"
+        else:
+            return "", "", None
+
+        direction = None
+        if words & _INCREASE_WORDS:
+            direction = "increase"
+        elif words & _DECREASE_WORDS:
+            direction = "decrease"
+        number = _LEVEL.search(input_text)
+
+        # A polite request ("can you set the volume to 50%?") is still a command
+        asks = input_text.rstrip().endswith("?") and not (words & _SET_WORDS or direction or number)
+        if any(kw in input_text for kw in _QUERY_WORDS) or asks:
+            return control, "query", None
+        if any(kw in input_text for kw in ["max", "full"]):
+            return control, "set", 100
+        if any(kw in input_text for kw in ["minimum", " min"]):
+            return control, "set", 0
+
+        # "from 80 to 40" sets 40; "by 10" is a relative step even when "to" also appears
+        target, step = _TO_LEVEL.search(input_text), _BY_LEVEL.search(input_text)
+        if target and not step:
+            return control, "set", int(target.group(1))
+        if number:
+            amount = int((step or number).group(1))
+            return (control, direction, amount) if direction else (control, "set", amount)
+
+        return control, direction or "decrease", None
+
+    def _handle_windows_operation(self, input_text: str) -> str:
+        control, action, amount = self._parse_operation(input_text)
+
+        if control == "bluetooth":
+            return self.system_tool.toggle_bluetooth(action)
+
+        if action in ("mute", "unmute"):
+            return self.system_tool.set_mute(action == "mute")
+
+        if action == "query":
+            return self.system_tool.query(control)
+
+        if control == "brightness":
+            if action == "set":
+                return self.system_tool.set_brightness(amount)
+            return self.system_tool.adjust_brightness(action, amount)
+
+        elif control == "volume":
+            if action == "set":
+                return self.system_tool.set_volume(amount)
+            return self.system_tool.adjust_volume(action, amount)
+
+        return "Unsupported system operation"
+
+    async def _ahandle_windows_operation(self, input_text: str) -> str:
+        control, action, _ = self._parse_operation(input_text)
         
-        if "brightness" in input_text:
-            direction = "increase" if "increase" in input_text else "decrease"
-            return SystemOperationsTool().adjust_brightness(direction)
-        
-        elif "volume" in input_text:
-            direction = "increase" if any(kw in input_text for kw in ["increase", "up"]) else "decrease"
-            return SystemOperationsTool().adjust_volume(direction)
+        if control == "bluetooth":
+            return await self.system_tool.atoggle_bluetooth(action)
         
-        elif "bluetooth" in input_text:
-            state = "enable" if any(kw in input_text for kw in ["enable", "turn on"]) else "disable"
-            return SystemOperationsTool().toggle_bluetooth(state)
+        elif control in ("brightness", "volume"):
+            # Backend calls (COM, sysfs, pactl) are blocking with no async API
+            return await asyncio.to_thread(self._handle_windows_operation, input_text)
         
         return "Unsupported system operation"
 
     def _setup_agent(self):
-        prompt = hub.pull("hwchase17/react-chat")
+        prompt = load_react_prompt()
         return create_react_agent(
             llm=self.llm,
             tools=self.tools,
@@ -59,5 +146,16 @@ class SystemControlAgent:
                 "chat_history": chat_history or []
             })
             return result["output"]
+        except Exception as e:
+            return f"System error: {str(e)}"
+
+    async def arun(self, input_text: str, chat_history: List[Union[HumanMessage, AIMessage]] = None) -> str:
+        """Async version of run() built on AgentExecutor.ainvoke."""
+        try:
+            result = await self.agent_executor.ainvoke({
+                "input": input_text,
+                "chat_history": chat_history or []
+            })
+            return result["output"]
         except Exception as e:
             return f"System error: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,420 @@
+import asyncio
+import os
+import platform
+import re
+import shutil
+import subprocess
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+
+def run_command(command: List[str], shell: bool = False) -> str:
+    """Run ``command`` and return its output ("Success" when it prints nothing)."""
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, shell=shell)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip() or f"{command[0]} exited with status {result.returncode}")
+    return result.stdout.strip() or "Success"
+
+
+async def arun_command(command: List[str], shell: bool = False) -> str:
+    """Async version of run_command"""
+    if shell:
+        process = await asyncio.create_subprocess_shell(
+            subprocess.list2cmdline(command), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    else:
+        process = await asyncio.create_subprocess_exec(*command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(stderr.decode(errors="replace").strip()
+                           or f"{command[0]} exited with status {process.returncode}")
+    return stdout.decode(errors="replace").strip() or "Success"
+
+
+class SystemBackend(ABC):
+    """Platform hooks for SystemOperationsTool. Levels are percentages (0-100).
+
+    Muting is optional: backends that implement ``get_muted``/``set_muted``
+    set ``supports_mute``, and callers check it before using them.
+    """
+
+    supports_mute = False
+
+    @abstractmethod
+    def get_brightness(self) -> int:
+        ...
+
+    @abstractmethod
+    def set_brightness(self, percent: int) -> int:
+        ...
+
+    @abstractmethod
+    def get_volume(self) -> int:
+        ...
+
+    @abstractmethod
+    def set_volume(self, percent: int) -> int:
+        ...
+
+    def get_muted(self) -> bool:
+        raise NotImplementedError(f"{type(self).__name__} cannot mute")
+
+    def set_muted(self, muted: bool) -> bool:
+        raise NotImplementedError(f"{type(self).__name__} cannot mute")
+
+    @abstractmethod
+    def bluetooth_command(self, enable: bool) -> List[str]:
+        ...
+
+    # Whether bluetooth_command has to go through the shell
+    shell = False
+
+    def set_bluetooth(self, enable: bool) -> str:
+        return run_command(self.bluetooth_command(enable), shell=self.shell)
+
+    async def aset_bluetooth(self, enable: bool) -> str:
+        return await arun_command(self.bluetooth_command(enable), shell=self.shell)
+
+    def close(self) -> None:
+        """Release any pooled device handles."""
+
+
+def _clamp(percent: float) -> int:
+    return int(max(0, min(100, round(percent))))
+
+
+def _co_initialize() -> None:
+    import pythoncom
+    pythoncom.CoInitialize()
+
+
+class WindowsSystemBackend(SystemBackend):
+    """WMI brightness and pycaw volume with handles opened once.
+
+    COM objects belong to the thread that created them, so every call runs
+    on one dedicated COM thread that owns the WMI connection and the
+    ``IAudioEndpointVolume`` interface; after the first call an adjustment
+    is a method call on a cached handle. WMI brightness reads are queries,
+    so the last known level is cached for ``state_ttl`` seconds. A handle
+    that fails (monitor or audio device changed) is reopened once.
+    """
+
+    shell = True
+    supports_mute = True
+
+    def __init__(self, state_ttl: float = 2.0):
+        self.state_ttl = state_ttl
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._wmi = None
+        self._brightness_methods = None
+        self._volume = None
+        self._brightness: Optional[int] = None
+        self._brightness_read_at = 0.0
+
+    def _call(self, function: Callable, *args):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="com",
+                                                    initializer=_co_initialize)
+        return self._executor.submit(self._with_reopen, function, *args).result()
+
+    def _with_reopen(self, function: Callable, *args):
+        try:
+            return function(*args)
+        except Exception:
+            self._wmi = self._brightness_methods = self._volume = None
+            return function(*args)
+
+    def _open_brightness(self):
+        if self._wmi is None:
+            import wmi
+            self._wmi = wmi.WMI(namespace="wmi")
+            self._brightness_methods = self._wmi.WmiMonitorBrightnessMethods()[0]
+        return self._wmi
+
+    def _open_volume(self):
+        if self._volume is None:
+            from ctypes import POINTER, cast
+            from comtypes import CLSCTX_ALL
+            from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+
+            interface = AudioUtilities.GetSpeakers().Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+            self._volume = cast(interface, POINTER(IAudioEndpointVolume))
+        return self._volume
+
+    def get_brightness(self) -> int:
+        if self._brightness is not None and time.monotonic() - self._brightness_read_at < self.state_ttl:
+            return self._brightness
+        return self._remember_brightness(
+            self._call(lambda: int(self._open_brightness().WmiMonitorBrightness()[0].CurrentBrightness)))
+
+    def set_brightness(self, percent: int) -> int:
+        percent = _clamp(percent)
+
+        def apply():
+            self._open_brightness()
+            self._brightness_methods.WmiSetBrightness(percent, 0)
+
+        self._call(apply)
+        return self._remember_brightness(percent)
+
+    def _remember_brightness(self, percent: int) -> int:
+        self._brightness, self._brightness_read_at = percent, time.monotonic()
+        return percent
+
+    def get_volume(self) -> int:
+        return self._call(lambda: _clamp(self._open_volume().GetMasterVolumeLevelScalar() * 100))
+
+    def set_volume(self, percent: int) -> int:
+        percent = _clamp(percent)
+        self._call(lambda: self._open_volume().SetMasterVolumeLevelScalar(percent / 100, None))
+        return percent
+
+    def get_muted(self) -> bool:
+        return self._call(lambda: bool(self._open_volume().GetMute()))
+
+    def set_muted(self, muted: bool) -> bool:
+        self._call(lambda: self._open_volume().SetMute(int(muted), None))
+        return muted
+
+    def bluetooth_command(self, enable: bool) -> List[str]:
+        state = "enable" if enable else "disable"
+        return [
+            "powershell", "-Command",
+            f"Start-Process -Verb RunAs -FilePath 'pnputil' -ArgumentList '/{state} Bluetooth'"
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.submit(self._release).result()
+                self._executor.shutdown()
+                self._executor = None
+
+    def _release(self) -> None:
+        import pythoncom
+        self._wmi = self._brightness_methods = self._volume = None
+        pythoncom.CoUninitialize()
+
+
+_PACTL_VOLUME = re.compile(r"(\d+)%")
+_PACTL_MUTE = re.compile(r"Mute:\s*(yes|no)")
+
+
+class LinuxSystemBackend(SystemBackend):
+    """Brightness through ``/sys/class/backlight`` and volume through a pactl-compatible binary.
+
+    The backlight device is discovered once and its ``brightness`` file is
+    kept open, so an adjustment is a pread/pwrite on a cached descriptor.
+    Without write access (no udev rule or group granting it) the level can
+    still be read, and setting it raises PermissionError. The last known
+    volume is cached for ``state_ttl`` seconds, which saves one pactl round
+    trip per adjustment.
+    """
+
+    # Preferred backlight interfaces, as in systemd-backlight
+    BACKLIGHT_TYPES = ("firmware", "platform", "raw")
+    supports_mute = True
+
+    def __init__(self, backlight_root: str = "/sys/class/backlight", pactl: str = "pactl",
+                 sink: str = "@DEFAULT_SINK@", rfkill: str = "rfkill", state_ttl: float = 2.0):
+        self.backlight_root = backlight_root
+        self.pactl = pactl
+        self.sink = sink
+        self.rfkill = rfkill
+        self.state_ttl = state_ttl
+        self._lock = threading.Lock()
+        self._brightness_fd: Optional[int] = None
+        self._brightness_path: Optional[str] = None
+        self._brightness_writable = False
+        self._max_brightness: Optional[int] = None
+        self._volume: Optional[int] = None
+        self._volume_read_at = 0.0
+
+    def _backlight_device(self) -> str:
+        try:
+            devices = sorted(os.listdir(self.backlight_root))
+        except OSError:
+            devices = []
+        if not devices:
+            raise RuntimeError(f"No backlight device under {self.backlight_root}")
+
+        def rank(device):
+            try:
+                with open(os.path.join(self.backlight_root, device, "type")) as f:
+                    kind = f.read().strip()
+            except OSError:
+                kind = ""
+            return self.BACKLIGHT_TYPES.index(kind) if kind in self.BACKLIGHT_TYPES else len(self.BACKLIGHT_TYPES)
+
+        return os.path.join(self.backlight_root, min(devices, key=rank))
+
+    def _open_brightness(self) -> int:
+        if self._brightness_fd is None:
+            device = self._backlight_device()
+            with open(os.path.join(device, "max_brightness")) as f:
+                self._max_brightness = int(f.read().strip())
+            path = os.path.join(device, "brightness")
+            try:
+                self._brightness_fd = os.open(path, os.O_RDWR)
+                self._brightness_writable = True
+            except PermissionError:
+                # Readable without the udev rule / group that grants write access
+                self._brightness_fd = os.open(path, os.O_RDONLY)
+                self._brightness_writable = False
+            self._brightness_path = path
+        return self._brightness_fd
+
+    def get_brightness(self) -> int:
+        with self._lock:
+            fd = self._open_brightness()
+            raw = int(os.pread(fd, 32, 0).decode().strip())
+            return _clamp(raw * 100 / self._max_brightness)
+
+    def set_brightness(self, percent: int) -> int:
+        percent = _clamp(percent)
+        with self._lock:
+            fd = self._open_brightness()
+            if not self._brightness_writable:
+                raise PermissionError(f"permission denied writing {self._brightness_path}: add a udev rule "
+                                      f"(or join the group) that grants write access to the backlight")
+            os.pwrite(fd, str(round(percent * self._max_brightness / 100)).encode(), 0)
+        return percent
+
+    def get_volume(self) -> int:
+        with self._lock:
+            if self._volume is not None and time.monotonic() - self._volume_read_at < self.state_ttl:
+                return self._volume
+        output = run_command([self.pactl, "get-sink-volume", self.sink])
+        match = _PACTL_VOLUME.search(output)
+        if not match:
+            raise RuntimeError(f"Unexpected pactl output: {output}")
+        return self._remember_volume(int(match.group(1)))
+
+    def set_volume(self, percent: int) -> int:
+        percent = _clamp(percent)
+        run_command([self.pactl, "set-sink-volume", self.sink, f"{percent}%"])
+        return self._remember_volume(percent)
+
+    def _remember_volume(self, percent: int) -> int:
+        with self._lock:
+            self._volume, self._volume_read_at = percent, time.monotonic()
+        return percent
+
+    def get_muted(self) -> bool:
+        output = run_command([self.pactl, "get-sink-mute", self.sink])
+        match = _PACTL_MUTE.search(output)
+        if not match:
+            raise RuntimeError(f"Unexpected pactl output: {output}")
+        return match.group(1) == "yes"
+
+    def set_muted(self, muted: bool) -> bool:
+        run_command([self.pactl, "set-sink-mute", self.sink, "1" if muted else "0"])
+        return muted
+
+    def bluetooth_command(self, enable: bool) -> List[str]:
+        return [self.rfkill, "unblock" if enable else "block", "bluetooth"]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._brightness_fd is not None:
+                os.close(self._brightness_fd)
+                self._brightness_fd = None
+
+
+class _Burst:
+    def __init__(self):
+        self.absolute: Optional[int] = None
+        self.delta = 0
+        self.done = threading.Event()
+        self.result: Optional[int] = None
+        self.error: Optional[Exception] = None
+
+
+class AdjustmentCoalescer:
+    """Merges bursts of changes to one level (brightness, volume) into a single device write.
+
+    A change that arrives when nothing was written in the last ``window``
+    seconds is applied at once. Changes arriving while a write is in flight,
+    or within ``window`` seconds of the last one, form a burst that waits
+    out the rest of the window: relative changes add up and an absolute one
+    replaces whatever was queued before it; the level is then read (only
+    when no absolute value was given) and written once, and every caller in
+    the burst gets the final level. Bursts are applied one at a time, so the
+    next one reads what the last one wrote.
+    """
+
+    def __init__(self, read: Callable[[], int], write: Callable[[int], int], window: float = 0.1):
+        self.read = read
+        self.write = write
+        self.window = window
+        self._lock = threading.Lock()
+        self._apply_lock = threading.Lock()
+        self._burst: Optional[_Burst] = None
+        self._last_write = float("-inf")
+
+    def adjust(self, delta: int) -> int:
+        """Move the level by ``delta`` percentage points; returns the level written."""
+        return self._submit(delta=delta)
+
+    def set(self, percent: int) -> int:
+        """Set the level to ``percent``; returns the level written."""
+        return self._submit(absolute=percent)
+
+    def _submit(self, delta: int = 0, absolute: Optional[int] = None) -> int:
+        with self._lock:
+            burst = self._burst
+            leader = burst is None
+            if leader:
+                burst = self._burst = _Burst()
+                pause = self._last_write + self.window - time.monotonic()
+            if absolute is not None:
+                burst.absolute, burst.delta = absolute, 0
+            else:
+                burst.delta += delta
+
+        if leader:
+            if pause > 0:
+                time.sleep(pause)
+            with self._apply_lock:
+                with self._lock:
+                    # Later changes start the next burst
+                    self._burst = None
+                try:
+                    base = burst.absolute if burst.absolute is not None else self.read()
+                    burst.result = self.write(base + burst.delta)
+                except Exception as e:
+                    burst.error = e
+                finally:
+                    with self._lock:
+                        self._last_write = time.monotonic()
+                    burst.done.set()
+        else:
+            burst.done.wait()
+
+        if burst.error is not None:
+            raise burst.error
+        return burst.result
+
+
+def default_backend() -> SystemBackend:
+    if platform.system() == "Windows":
+        return WindowsSystemBackend()
+    pactl = shutil.which("pactl") or "pactl"
+    return LinuxSystemBackend(pactl=pactl)
+
+
+_default_backend: Optional[SystemBackend] = None
+_default_backend_lock = threading.Lock()
+
+
+def get_system_backend() -> SystemBackend:
+    """Return the process-wide backend, so device handles are shared by every tool."""
+    global _default_backend
+    with _default_backend_lock:
+        if _default_backend is None:
+            _default_backend = default_backend()
+    return _default_backend
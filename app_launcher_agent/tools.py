@@ -1,166 +1,449 @@
 import re
 import os
+import asyncio
 import subprocess
-import psutil
 import platform
+import shutil
 import tempfile
-from typing import Dict, Optional
+from typing import AsyncIterator, Awaitable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import time
+import psutil
+from .app_catalog import AppCatalog, get_app_catalog, is_denied
+from .launch_tracker import LaunchTracker
+from .process_index import ProcessIndex
+from .scheduler import AUDIO, BLUETOOTH, DISPLAY, FOCUS, get_scheduler, requires
+from .llm_cache import LLMResponseCache, get_response_cache
+from .streaming import current_stream
+from .tracing import asleep, sleep, traced
+from .system_backends import AdjustmentCoalescer, SystemBackend, get_system_backend
+
+Command = Union[str, List[str]]
+
+# Seconds a newly spawned window may take to appear and grab the keyboard focus;
+# launches keep FOCUS that long so the window cannot land in another tool's keystrokes
+WINDOW_SETTLE = 1.0
+
+
+def _window_settle() -> float:
+    return WINDOW_SETTLE
+
+async def _spawn_async(command: Command, shell: bool = False):
+    """Start a process without blocking the event loop (and without waiting for it)."""
+    if shell:
+        if not isinstance(command, str):
+            command = subprocess.list2cmdline(command)
+        return await asyncio.create_subprocess_shell(command)
+    if isinstance(command, str):
+        command = [command]
+    return await asyncio.create_subprocess_exec(*command)
+
+async def _single_chunk(content: Awaitable[str]) -> AsyncIterator[str]:
+    yield await content
 
 class TextEditorTool:
     """Tool for writing content to text editors."""
     
-    def __init__(self, llm):
+    def __init__(self, llm, cache: Optional[LLMResponseCache] = None, streaming: bool = True):
         self.system = platform.system()
         self.llm = llm
+        self.cache = cache or get_response_cache()
+        self.streaming = streaming  # Append tokens to the file as they arrive
     
-    def _generate_content(self, topic: str) -> str:
-        """Generate content about the given topic using LLM."""
-        prompt = f"Write a comprehensive, well-structured text about: {topic}\n\n" \
+    def _content_prompt(self, topic: str) -> str:
+        return f"Write a comprehensive, well-structured text about: {topic}\n\n" \
                  "The text should:\n" \
                  "- Be between 300-500 words\n" \
                  "- Have proper paragraphs\n" \
                  "- Be informative and engaging\n" \
                  "- Avoid code examples\n" \
                  "- Use Markdown formatting for headings and lists"
+    
+    def _generate_content(self, topic: str) -> str:
+        """Generate content about the given topic using LLM."""
+        return self.cache.invoke(self.llm, self._content_prompt(topic))
+    
+    def _editor_command(self, app_name: str, file_path: str) -> Optional[Tuple[Command, bool]]:
+        """Return (command, use_shell) that opens file_path in the editor"""
+        if self.system == "Windows":
+            return [app_name, file_path], True
+        elif self.system == "Darwin":  # macOS
+            return ["open", "-a", "TextEdit", file_path], False
+        elif self.system == "Linux":
+            return ["gedit", file_path], False
+        return None
+    
+    def _reloads_file(self, app_name: str) -> bool:
+        """Whether the editor picks up later writes to an open file (TextEdit does;
+        Notepad, WordPad, Word and gedit keep what they loaded)."""
+        return self.system == "Darwin"
+    
+    @requires(FOCUS, linger=_window_settle)
+    def _open_in_editor(self, app_name: str, file_path: str) -> None:
+        """Open file in specified editor (its window takes the keyboard focus once it is up)"""
+        command = self._editor_command(app_name, file_path)
+        if command:
+            subprocess.Popen(command[0], shell=command[1])
+    
+    @requires(FOCUS, linger=_window_settle)
+    async def _aopen_in_editor(self, app_name: str, file_path: str) -> None:
+        command = self._editor_command(app_name, file_path)
+        if command:
+            await _spawn_async(*command)
+    
+    def _write_streamed(self, chunks: Iterable[str], suffix: str, app_name: str) -> str:
+        """Append chunks to a new temp file and open it in the editor.
+
+        Each chunk is flushed as it arrives and also published to the caller's
+        TokenStream (if any) so the chat UI can render it incrementally. Editors
+        that reload the file are opened on the first chunk; the rest only once
+        the whole text is written.
+        """
+        stream = current_stream()
+        live = self._reloads_file(app_name)
+        opened = False
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False, mode='w+', encoding='utf-8') as tmp:
+            file_path = tmp.name
+            for chunk in chunks:
+                tmp.write(chunk)
+                tmp.flush()
+                if live and not opened:
+                    self._open_in_editor(app_name, file_path)
+                    opened = True
+                if stream is not None:
+                    stream.put(chunk)
         
-        response = self.llm.invoke(prompt)
-        return response.content
+        if not opened:
+            self._open_in_editor(app_name, file_path)
+        return file_path
     
+    async def _awrite_streamed(self, chunks: AsyncIterator[str], suffix: str, app_name: str) -> str:
+        """Async counterpart of _write_streamed."""
+        stream = current_stream()
+        live = self._reloads_file(app_name)
+        opened = False
+        with tempfile.NamedTemporaryFile(suffix=suffix, delete=False, mode='w+', encoding='utf-8') as tmp:
+            file_path = tmp.name
+            async for chunk in chunks:
+                tmp.write(chunk)
+                tmp.flush()
+                if live and not opened:
+                    await self._aopen_in_editor(app_name, file_path)
+                    opened = True
+                if stream is not None:
+                    stream.put(chunk)
+        
+        if not opened:
+            await self._aopen_in_editor(app_name, file_path)
+        return file_path
+    
+    def _parse_request(self, input_text: str) -> Optional[Tuple[str, str]]:
+        """Return (editor, topic), or None for programming requests."""
+        # Default values
+        app_name = 'notepad.exe'
+        topic = input_text
+        
+        # Check if specific editor is requested
+        if any(kw in input_text.lower() for kw in ["code", "program", "function"]):
+            return None
+        if "winword.exe" in input_text.lower():
+            app_name = 'winword.exe'
+            # Extract topic by removing the editor part
+            topic = input_text.lower().replace("in winword.exe", "").replace("winword.exe", "").strip()
+        elif "wordpad.exe" in input_text.lower():
+            app_name = 'wordpad.exe'
+            topic = input_text.lower().replace("in wordpad.exe", "").replace("wordpad.exe", "").strip()
+        
+        # Further clean the topic if it contains "write about" or similar
+        if "write about" in topic.lower():
+            topic = topic.lower().split("write about")[1].strip()
+        if "write a" in topic.lower():
+            topic = topic.lower().split("write a")[1].strip()
+        
+        return app_name, topic
+    
+    @traced('write_to_file')
     def write_to_file(self, input_text: str) -> str:
         """Handle writing content with specified editor."""
         try:
-            # Default values
-            app_name = 'notepad.exe'
-            topic = input_text
-            
-            # Check if specific editor is requested
-            if any(kw in input_text.lower() for kw in ["code", "program", "function"]):
+            request = self._parse_request(input_text)
+            if request is None:
                 return "Error: Use code generation commands for programming tasks"
-            if "winword.exe" in input_text.lower():
-                app_name = 'winword.exe'
-                # Extract topic by removing the editor part
-                topic = input_text.lower().replace("in winword.exe", "").replace("winword.exe", "").strip()
-            elif "wordpad.exe" in input_text.lower():
-                app_name = 'wordpad.exe'
-                topic = input_text.lower().replace("in wordpad.exe", "").replace("wordpad.exe", "").strip()
+            app_name, topic = request
             
-            # Further clean the topic if it contains "write about" or similar
-            if "write about" in topic.lower():
-                topic = topic.lower().split("write about")[1].strip()
-            if "write a" in topic.lower():
-                topic = topic.lower().split("write a")[1].strip()
+            if self.streaming:
+                chunks = self.cache.stream(self.llm, self._content_prompt(topic))
+            else:
+                chunks = [self._generate_content(topic)]
+            self._write_streamed(chunks, '.txt', app_name)
             
-            content = self._generate_content(topic)
+            sleep(1, 'editor.open_delay')  # Small delay to ensure file is opened
             
-            # Create temp file
-            with tempfile.NamedTemporaryFile(suffix='.txt', delete=False, mode='w+', encoding='utf-8') as tmp:
-                file_path = tmp.name
-                tmp.write(content)
+            return f"Successfully wrote about '{topic}' and opened in {app_name}"
+        
+        except Exception as e:
+            return f"Error writing to file: {str(e)}"
+    
+    @traced('write_to_file')
+    async def awrite_to_file(self, input_text: str) -> str:
+        """Async version of write_to_file; awaits the LLM, editor spawn and delay."""
+        try:
+            request = self._parse_request(input_text)
+            if request is None:
+                return "Error: Use code generation commands for programming tasks"
+            app_name, topic = request
             
-            # Open file in specified editor
-            if self.system == "Windows":
-                subprocess.Popen([app_name, file_path], shell=True)
-            elif self.system == "Darwin":  # macOS
-                subprocess.Popen(["open", "-a", "TextEdit", file_path])
-            elif self.system == "Linux":
-                subprocess.Popen(["gedit", file_path])
+            prompt = self._content_prompt(topic)
+            if self.streaming:
+                chunks = self.cache.astream(self.llm, prompt)
+            else:
+                chunks = _single_chunk(self.cache.ainvoke(self.llm, prompt))
+            await self._awrite_streamed(chunks, '.txt', app_name)
             
-            time.sleep(1)  # Small delay to ensure file is opened
+            await asleep(1, 'editor.open_delay')  # Small delay to ensure file is opened
             
             return f"Successfully wrote about '{topic}' and opened in {app_name}"
         
         except Exception as e:
             return f"Error writing to file: {str(e)}"
 
+# Known Windows applications and their executables
+WINDOWS_APPS = {
+    "notepad": "notepad.exe",
+    "chrome": "chrome.exe",
+    "calculator": "calc.exe",
+    "word": ("winword.exe", "/n"),
+    "excel": "excel.exe",
+    "powerpoint": "powerpnt.exe",
+    "paint": "mspaint.exe",
+    "cmd": "cmd.exe",
+    "explorer": "explorer.exe",
+}
+
 class AppLauncherTool:
-    """Tool for launching applications on the system."""
+    """Tool for launching applications on the system.
+
+    Apps started here are recorded in a ``LaunchTracker``, so status checks,
+    duplicate-launch suppression and closing them are lookups by name; the
+    process index is only scanned for apps started some other way. Names
+    outside ``WINDOWS_APPS`` are resolved through the installed-app catalog.
+    """
     
-    def __init__(self):
+    def __init__(self, process_index: Optional[ProcessIndex] = None, tracker: Optional[LaunchTracker] = None,
+                 catalog: Optional[AppCatalog] = None):
         self.system = platform.system()
+        self.process_index = process_index or ProcessIndex()
+        self.tracker = tracker or LaunchTracker()
+        self.catalog = catalog or get_app_catalog(self.system)
     
-    def is_app_running(self, app_name: str) -> bool:
-        """Check if an application is already running."""
-        for proc in psutil.process_iter(['name']):
-            if app_name.lower() in proc.info['name'].lower():
-                return True
-        return False
+    def is_app_running(self, app_name: str, match: str = "exact") -> bool:
+        """Check if an application is already running.
+
+        ``match`` is either "exact" (normalized executable name) or "prefix".
+        """
+        if self.tracker.running(app_name) is not None:
+            return True
+        return self.process_index.is_running(app_name, match)
+    
+    def _catalog_command(self, app_name: str) -> Optional[Tuple[Command, bool, str]]:
+        entry = self.catalog.resolve(app_name)
+        if entry is None and self.catalog.refresh():
+            # Something was installed or removed since the catalog was built
+            entry = self.catalog.resolve(app_name)
+        if entry is None:
+            return None
+        command = entry.command[0] if entry.shell else list(entry.command)
+        return command, entry.shell, f"Successfully launched {entry.name}"
+    
+    def _launch_command(self, app_name: str) -> Optional[Tuple[Command, bool, str]]:
+        """Return (command, use_shell, success message) for launching app_name."""
+        if is_denied(app_name):
+            # Never power off, kill or delete because a name sounded like an app
+            return None
+        
+        if self.system != "Windows" or app_name.lower() not in WINDOWS_APPS:
+            launch = self._catalog_command(app_name)
+            if launch is not None:
+                return launch
+        
+        if self.system == "Windows":
+            # Windows-specific launch logic
+            # Try to find the app in our dictionary
+            executable = WINDOWS_APPS.get(app_name.lower())
+            
+            if executable:
+                executable, *args = executable if isinstance(executable, tuple) else (executable,)
+                # Use full path for system apps
+                system_path = os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'System32')
+                full_path = os.path.join(system_path, executable)
+                
+                if os.path.exists(full_path):
+                    return [full_path, *args], False, f"Successfully launched {app_name}"
+                
+                # Resolve through PATH so no shell is needed
+                found = shutil.which(executable)
+                if found:
+                    return [found, *args], False, f"Successfully launched {app_name}"
+                
+                # Fallback to shell execution if it is not on PATH either
+                return [executable, *args], True, f"Successfully launched {app_name}"
+            
+            # Try direct execution for other apps
+            return f'start "" "{app_name}"', True, f"Attempted to launch {app_name}"
+        
+        elif self.system == "Darwin":  # macOS
+            return ["open", "-a", app_name], False, f"Successfully launched {app_name}"
+        
+        elif self.system == "Linux":
+            return [app_name], False, f"Successfully launched {app_name}"
+        
+        return None
     
+    @traced('launch_app')
+    @requires(FOCUS, linger=_window_settle)
     def launch_app(self, app_name: str) -> str:
-        """Launch an application on the system."""
+        """Launch an application on the system (a new window takes the keyboard focus once it is up)."""
         try:
             if self.is_app_running(app_name):
                 return f"{app_name} is already running."
             
-            if self.system == "Windows":
-                # Windows-specific launch logic
-                apps = {
-                    "notepad": "notepad.exe",
-                    "chrome": "chrome.exe",
-                    "calculator": "calc.exe",
-                    "word": ("winword.exe", "/n"),
-                    "excel": "excel.exe",
-                    "powerpoint": "powerpnt.exe",
-                    "paint": "mspaint.exe",
-                    "cmd": "cmd.exe",
-                    "explorer": "explorer.exe",
-                }
-                
-                # Try to find the app in our dictionary
-                executable = apps.get(app_name.lower())
-                
-                if executable:
-                    try:
-                        # Use full path for system apps
-                        system_path = os.path.join(os.environ['WINDIR'], 'System32')
-                        full_path = os.path.join(system_path, executable)
-                        
-                        if os.path.exists(full_path):
-                            subprocess.Popen(full_path)
-                            return f"Successfully launched {app_name}"
-                        
-                        # Fallback to direct execution if path not found
-                        subprocess.Popen(executable, shell=True)
-                        return f"Successfully launched {app_name}"
-                    except Exception as e:
-                        return f"Failed to launch {app_name}: {str(e)}"
-                
-                # Try direct execution for other apps
-                try:
-                    subprocess.Popen(f'start "" "{app_name}"', shell=True)
-                    return f"Attempted to launch {app_name}"
-                except Exception as e:
-                    return f"Failed to launch {app_name}: {str(e)}"
+            # Whatever happens below, the process table is about to change
+            self.process_index.invalidate()
             
-            elif self.system == "Darwin":  # macOS
-                try:
-                    subprocess.Popen(["open", "-a", app_name])
-                    return f"Successfully launched {app_name}"
-                except Exception as e:
-                    return f"Failed to launch {app_name}: {str(e)}"
+            launch = self._launch_command(app_name)
+            if launch is None:
+                return f"Could not launch {app_name}. Please specify the exact application name."
             
-            elif self.system == "Linux":
-                try:
-                    subprocess.Popen([app_name])
-                    return f"Successfully launched {app_name}"
-                except Exception as e:
-                    return f"Failed to launch {app_name}: {str(e)}"
+            command, shell, message = launch
+            self.tracker.spawn(app_name, command, shell)
+            return message
+            
+        except Exception as e:
+            return f"Error launching {app_name}: {str(e)}"
+    
+    @traced('launch_app')
+    @requires(FOCUS, linger=_window_settle)
+    async def alaunch_app(self, app_name: str) -> str:
+        """Async version of launch_app.
+
+        The running check (which may scan the process table) and command
+        resolution (which may rescan the app catalog) run on a worker thread.
+        posix_spawn / CreateProcess return as soon as the child exists, so the
+        spawn itself runs inline on the event loop.
+        """
+        try:
+            if await asyncio.to_thread(self.is_app_running, app_name):
+                return f"{app_name} is already running."
+            
+            self.process_index.invalidate()
+            
+            launch = await asyncio.to_thread(self._launch_command, app_name)
+            if launch is None:
+                return f"Could not launch {app_name}. Please specify the exact application name."
             
-            return f"Could not launch {app_name}. Please specify the exact application name."
+            command, shell, message = launch
+            self.tracker.spawn(app_name, command, shell)
+            return message
             
         except Exception as e:
             return f"Error launching {app_name}: {str(e)}"
+    
+    def app_status(self, app_name: str) -> str:
+        """Report whether an application is running."""
+        record = self.tracker.running(app_name)
+        if record is not None:
+            started = time.strftime("%H:%M:%S", time.localtime(record.started))
+            return f"{app_name} is running (PID {record.pid}, started at {started})."
+        if self.process_index.is_running(app_name):
+            return f"{app_name} is running."
+        return f"{app_name} is not running."
+    
+    @traced('close_app')
+    def close_app(self, app_name: str, timeout: float = 3.0) -> str:
+        """Close an application, gracefully first and forcibly after ``timeout`` seconds."""
+        try:
+            if self.tracker.close(app_name, timeout) is not None:
+                self.process_index.invalidate()
+                return f"Closed {app_name}."
+            
+            # Not started by us: fall back to the process index
+            processes, denied = [], []
+            for pid in sorted(self.process_index.pids(app_name)):
+                try:
+                    process = psutil.Process(pid)
+                    process.terminate()
+                    processes.append(process)
+                except psutil.NoSuchProcess:
+                    pass
+                except psutil.AccessDenied:
+                    denied.append(pid)
+            if processes:
+                _, alive = psutil.wait_procs(processes, timeout=timeout)
+                for process in alive:
+                    try:
+                        process.kill()
+                    except psutil.NoSuchProcess:
+                        pass
+                    except psutil.AccessDenied:
+                        denied.append(process.pid)
+                        processes.remove(process)
+                self.process_index.invalidate()
+            return _close_report(app_name, [process.pid for process in processes], denied)
+            
+        except Exception as e:
+            return f"Error closing {app_name}: {str(e)}"
         
+def _close_report(app_name: str, closed: List[int], denied: List[int]) -> str:
+    """Summarise what happened to each process ``close_app`` tried to stop."""
+    if not closed and not denied:
+        return f"{app_name} is not running."
+    if not denied:
+        return f"Closed {app_name}."
+    pids = ", ".join(str(pid) for pid in sorted(denied))
+    if not closed:
+        return f"Could not close {app_name}: access denied for PID {pids}."
+    closed_pids = ", ".join(str(pid) for pid in sorted(closed))
+    return f"Closed {app_name} (PID {closed_pids}); access denied for PID {pids}."
+
+
+class _CodeStreamCleaner:
+    """Incremental equivalent of CodeGenerationTool._clean_code_output."""
+    
+    def __init__(self):
+        self.buffer = ""
+        self.pending_blank = ""  # Held back so leading/trailing blank lines are dropped
+        self.started = False
+    
+    def _emit(self, line: str) -> List[str]:
+        line = line.replace("```python", "").replace("```", "")
+        line = re.sub(r'^\[.*?\]\s*', '', line)
+        if not line.strip():
+            if self.started:
+                self.pending_blank += "\n"
+            return []
+        out = f"\n{self.pending_blank}{line}" if self.started else line.lstrip()
+        self.pending_blank = ""
+        self.started = True
+        return [out]
+    
+    def feed(self, chunk: str) -> List[str]:
+        self.buffer += chunk
+        *lines, self.buffer = self.buffer.split("\n")
+        return [out for line in lines for out in self._emit(line)]
+    
+    def finish(self) -> List[str]:
+        return [out.rstrip() for out in self._emit(self.buffer)]
+
 class CodeGenerationTool:
 
-    def __init__(self, llm):  # Add constructor
+    def __init__(self, llm, cache: Optional[LLMResponseCache] = None, streaming: bool = True):  # Add constructor
         self.llm = llm
-        self.editor_tool = TextEditorTool(llm)  # Pass LLM to TextEditorTool
+        self.cache = cache or get_response_cache()
+        self.editor_tool = TextEditorTool(llm, self.cache)  # Pass LLM to TextEditorTool
         self.system = platform.system()
+        self.streaming = streaming
         
-    def _generate_code(self, language: str, problem: str) -> str:
-        """Generate code using LLM with strict code-only output"""
-        prompt = (
+    def _code_prompt(self, language: str, problem: str) -> str:
+        return (
             f"Write a {language} program to {problem}.\n"
             "Requirements:\n"
             "- Output ONLY the code without any explanations\n"
@@ -170,8 +453,10 @@ class CodeGenerationTool:
             "CODE:"
         )
         
-        response = self.llm.invoke(prompt)
-        return self._clean_code_output(response.content)
+    def _generate_code(self, language: str, problem: str) -> str:
+        """Generate code using LLM with strict code-only output"""
+        prompt = self._code_prompt(language, problem)
+        return self._clean_code_output(self.cache.invoke(self.llm, prompt))
 
     def _clean_code_output(self, code: str) -> str:
         """Remove markdown and ensure clean code"""
@@ -180,40 +465,68 @@ class CodeGenerationTool:
         # Remove any remaining markdown
         return re.sub(r'^\[.*?\]\s*', '', code, flags=re.MULTILINE).strip()
     
+    def _clean_code_stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Line-by-line version of _clean_code_output for streamed completions"""
+        cleaner = _CodeStreamCleaner()
+        for chunk in chunks:
+            yield from cleaner.feed(chunk)
+        yield from cleaner.finish()
+    
+    async def _aclean_code_stream(self, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+        cleaner = _CodeStreamCleaner()
+        async for chunk in chunks:
+            for out in cleaner.feed(chunk):
+                yield out
+        for out in cleaner.finish():
+            yield out
+    
+    def _parse_request(self, input_text: str) -> Tuple[str, str, str]:
+        """Return (language, problem, editor) from 'language; problem; editor'."""
+        # Improved parsing with fallback
+        parts = input_text.split(';', 2)
+        language = parts[0].strip() if len(parts) > 0 else "python"
+        problem = parts[1].strip() if len(parts) > 1 else input_text
+        editor = parts[2].strip() if len(parts) > 2 else "notepad.exe"
+        return language, problem, editor
+    
+    @traced('generate_and_write_code')
     def generate_and_write_code(self, input_text: str) -> str:
         """Handle code generation and writing to editor."""
         try:
-            # Improved parsing with fallback
-            parts = input_text.split(';', 2)
-            language = parts[0].strip() if len(parts) > 0 else "python"
-            problem = parts[1].strip() if len(parts) > 1 else input_text
-            editor = parts[2].strip() if len(parts) > 2 else "notepad.exe"
+            language, problem, editor = self._parse_request(input_text)
             
-            # Generate code
-            code = self._generate_code(language, problem)
-            
-            # Create temp file
-            with tempfile.NamedTemporaryFile(
-                suffix=self._get_extension(language),
-                delete=False,
-                mode='w+', 
-                encoding='utf-8'
-            ) as tmp:
-                tmp.write(code)
-                file_path = tmp.name
-
-            # Open editor
-            if self.system == "Windows":
-                subprocess.Popen([editor, file_path], shell=True)
-            elif self.system == "Darwin":
-                subprocess.Popen(["open", "-a", "TextEdit", file_path])
-            elif self.system == "Linux":
-                subprocess.Popen(["gedit", file_path])
+            # Generate code, streaming it into the editor's file when enabled
+            if self.streaming:
+                chunks = self._clean_code_stream(
+                    self.cache.stream(self.llm, self._code_prompt(language, problem)))
+            else:
+                chunks = [self._generate_code(language, problem)]
+            self.editor_tool._write_streamed(chunks, self._get_extension(language), editor)
             
             return f"Generated {language} code for {problem} and opened in {editor}" 
         
         except Exception as e:  # Added exception handling
             return f"Code generation failed: {str(e)}"
+    
+    @traced('generate_and_write_code')
+    async def agenerate_and_write_code(self, input_text: str) -> str:
+        """Async version of generate_and_write_code."""
+        try:
+            language, problem, editor = self._parse_request(input_text)
+            
+            prompt = self._code_prompt(language, problem)
+            if self.streaming:
+                chunks = self._aclean_code_stream(self.cache.astream(self.llm, prompt))
+            else:
+                async def generate() -> str:
+                    return self._clean_code_output(await self.cache.ainvoke(self.llm, prompt))
+                chunks = _single_chunk(generate())
+            await self.editor_tool._awrite_streamed(chunks, self._get_extension(language), editor)
+            
+            return f"Generated {language} code for {problem} and opened in {editor}" 
+        
+        except Exception as e:
+            return f"Code generation failed: {str(e)}"
 
         
     def _get_extension(self, language: str) -> str:
@@ -226,89 +539,93 @@ class CodeGenerationTool:
         return ext_map.get(language.lower(), ".txt")           
 
 class SystemOperationsTool:
-    """Windows-specific system operations tool"""
+    """System operations tool (brightness, volume, Bluetooth) on a pluggable backend.
+
+    The backend defaults to the process-wide one from ``get_system_backend``,
+    so every tool instance reuses the same device handles. Level changes go
+    through an ``AdjustmentCoalescer`` per control: a lone command is applied
+    at once, and the commands that follow it within ``coalesce_window``
+    seconds share one more device write.
+    Device writes hold their device exclusively in the resource scheduler
+    and queries share it, so a query never reads a half-applied change.
+    """
     
-    def __init__(self):
+    def __init__(self, backend: Optional[SystemBackend] = None, coalesce_window: float = 0.1):
+        self.backend = backend or get_system_backend()
         self.volume_step = 20  # Percentage per adjustment
         self.brightness_step = 20  # Percentage per adjustment
+        # Only the coalesced write holds the device, so a burst can still gather
+        self._brightness = AdjustmentCoalescer(self.backend.get_brightness,
+                                               requires(DISPLAY)(self.backend.set_brightness), coalesce_window)
+        self._volume = AdjustmentCoalescer(self.backend.get_volume, requires(AUDIO)(self.backend.set_volume),
+                                           coalesce_window)
 
-    def _execute_command(self, command: list) -> str:
-        """Execute Windows command safely"""
+    def adjust_brightness(self, operation: str, amount: Optional[int] = None) -> str:
+        """Raise or lower screen brightness by ``amount`` percent (one step by default)"""
         try:
-            result = subprocess.run(
-                command,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                shell=True
-            )
-            return result.stdout.strip() or "Success"
+            step = self.brightness_step if amount is None else amount
+            new = self._brightness.adjust(step if operation == "increase" else -step)
+            return f"Brightness set to {new}%"
         except Exception as e:
-            return f"Error: {str(e)}"
+            return f"Brightness error: {str(e)}"
 
-    def adjust_brightness(self, operation: str) -> str:
-        """Adjust screen brightness on Windows with proper COM initialization"""
+    def set_brightness(self, percent: int) -> str:
+        """Set screen brightness to ``percent``"""
         try:
-            import pythoncom
-            import wmi
-            
-            # Initialize COM for this thread
-            pythoncom.CoInitialize()
-            
-            # Create WMI connection
-            c = wmi.WMI(namespace='wmi')
-            
-            # Get current brightness
-            current = c.WmiMonitorBrightness()[0].CurrentBrightness
-            
-            # Calculate new brightness
-            if operation == "increase":
-                new = min(100, current + self.brightness_step)
-            else:
-                new = max(0, current - self.brightness_step)
-            
-            # Set new brightness
-            c.WmiMonitorBrightnessMethods()[0].WmiSetBrightness(new, 0)
-            
-            return f"Brightness set to {new}%"
+            return f"Brightness set to {self._brightness.set(percent)}%"
         except Exception as e:
             return f"Brightness error: {str(e)}"
-        finally:
-            # Clean up COM initialization
-            pythoncom.CoUninitialize()
 
-    def adjust_volume(self, operation: str) -> str:
-        """Adjust system volume on Windows"""
+    def adjust_volume(self, operation: str, amount: Optional[int] = None) -> str:
+        """Raise or lower the system volume by ``amount`` percent (one step by default)"""
         try:
-            import comtypes
-            from ctypes import cast, POINTER
-            from comtypes import CLSCTX_ALL
-            from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
-            
-            devices = AudioUtilities.GetSpeakers()
-            interface = devices.Activate(
-                IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
-            volume = cast(interface, POINTER(IAudioEndpointVolume))
-            
-            current = volume.GetMasterVolumeLevelScalar()
-            step = self.volume_step/100
-            
-            if operation == "increase":
-                new = min(1.0, current + step)
-            else:
-                new = max(0.0, current - step)
-            
-            volume.SetMasterVolumeLevelScalar(new, None)
-            return f"Volume set to {int(new*100)}%"
+            step = self.volume_step if amount is None else amount
+            new = self._volume.adjust(step if operation == "increase" else -step)
+            return f"Volume set to {new}%"
+        except Exception as e:
+            return f"Volume error: {str(e)}"
+
+    def set_volume(self, percent: int) -> str:
+        """Set the system volume to ``percent``"""
+        try:
+            return f"Volume set to {self._volume.set(percent)}%"
+        except Exception as e:
+            return f"Volume error: {str(e)}"
+
+    @requires(AUDIO)
+    def set_mute(self, muted: bool) -> str:
+        """Mute or unmute the system volume"""
+        if not self.backend.supports_mute:
+            return "Volume error: muting is not supported on this system"
+        try:
+            return "Volume muted" if self.backend.set_muted(muted) else "Volume unmuted"
         except Exception as e:
             return f"Volume error: {str(e)}"
 
+    def query(self, control: str) -> str:
+        """Report the current brightness or volume level"""
+        try:
+            with get_scheduler().acquire(shared=[DISPLAY if control == "brightness" else AUDIO]):
+                if control == "brightness":
+                    return f"Brightness is {self.backend.get_brightness()}%"
+                level = self.backend.get_volume()
+                muted = self.backend.supports_mute and self.backend.get_muted()
+            return f"Volume is {level}%" + (" (muted)" if muted else "")
+        except Exception as e:
+            return f"{control.capitalize()} error: {str(e)}"
+
+    @requires(BLUETOOTH)
     def toggle_bluetooth(self, state: str) -> str:
-        """Toggle Bluetooth on Windows"""
+        """Enable or disable Bluetooth"""
+        try:
+            return self.backend.set_bluetooth(state == "enable")
+        except Exception as e:
+            return f"Bluetooth error: {str(e)}"
+
+    @requires(BLUETOOTH)
+    async def atoggle_bluetooth(self, state: str) -> str:
+        """Async version of toggle_bluetooth"""
         try:
-            return self._execute_command([
-                "powershell", "-Command", 
-                f"Start-Process -Verb RunAs -FilePath 'pnputil' -ArgumentList '/{state} Bluetooth'"
-            ])
+            return await self.backend.aset_bluetooth(state == "enable")
         except Exception as e:
-            return f"Bluetooth error: {str(e)}"
\ No newline at end of file
+            return f"Bluetooth error: {str(e)}"
@@ -0,0 +1,499 @@
+import asyncio
+import functools
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+from .history import count_tokens
+
+_span_ids = itertools.count(1)
+
+
+class Span:
+    """A timed operation within a request; times are ``time.perf_counter`` seconds."""
+
+    __slots__ = ("span_id", "parent_id", "name", "kind", "start", "end", "attributes", "error")
+
+    def __init__(self, name: str, kind: str, parent_id: Optional[int] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.span_id = next(_span_ids)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.attributes: Dict[str, Any] = attributes or {}
+        self.error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        if self.end is None:
+            self.end = time.perf_counter()
+            if error is not None:
+                self.error = f"{type(error).__name__}: {error}"
+
+
+class Trace:
+    """All spans recorded for one request; ``spans[0]`` is the request itself."""
+
+    def __init__(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.started_at = time.time()
+        self.root = Span(name, "request", attributes=attributes)
+        self.spans: List[Span] = [self.root]
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> Span:
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration
+
+    def tokens(self) -> Tuple[int, int]:
+        """(prompt, completion) tokens over every LLM call of the request."""
+        prompt = sum(span.attributes.get("prompt_tokens", 0) for span in self.spans)
+        completion = sum(span.attributes.get("completion_tokens", 0) for span in self.spans)
+        return prompt, completion
+
+    def span_dicts(self) -> List[Dict[str, Any]]:
+        origin = self.root.start
+        return [{
+            "trace_id": self.trace_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "name": span.name,
+            "kind": span.kind,
+            "start_ms": round((span.start - origin) * 1000, 3),
+            "duration_ms": round(span.duration * 1000, 3),
+            "timestamp": self.started_at + (span.start - origin),
+            "attributes": span.attributes,
+            "error": span.error,
+        } for span in self.spans]
+
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+_callback_handler: ContextVar[Optional["TracingCallbackHandler"]] = ContextVar("trace_callbacks", default=None)
+
+# Every LangChain run started inside a traced request gets the request's handler
+register_configure_hook(_callback_handler, inheritable=True)
+
+
+class Tracer:
+    """Records nested timing spans per request and hands finished traces to exporters.
+
+    ``request()`` opens a trace; inside it, ``span()`` blocks, ``@traced``
+    functions and every LangChain chain, LLM and tool run (through a
+    callback handler installed for the duration of the request) add spans
+    under whichever span is current. Outside a request all of these are
+    no-ops. The last ``keep_traces`` traces stay in memory for debugging.
+    """
+
+    def __init__(self, exporters: Sequence[Any] = (), keep_traces: int = 20):
+        self.exporters = list(exporters)
+        self._traces: Deque[Trace] = deque(maxlen=keep_traces)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def request(self, name: str, **attributes) -> Iterator[Trace]:
+        trace = Trace(name, attributes)
+        tokens = (_current_trace.set(trace), _current_span.set(trace.root),
+                  _callback_handler.set(TracingCallbackHandler(trace)))
+        error = None
+        try:
+            yield trace
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            for var, token in zip((_current_trace, _current_span, _callback_handler), tokens):
+                var.reset(token)
+            trace.root.finish(error)
+            prompt, completion = trace.tokens()
+            trace.root.attributes.update(prompt_tokens=prompt, completion_tokens=completion)
+            with self._lock:
+                self._traces.append(trace)
+            self._export(trace)
+
+    def _export(self, trace: Trace) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.export(trace)
+            except OSError:
+                # Losing a trace must never fail the request
+                pass
+
+    @contextmanager
+    def span(self, name: str, kind: str = "internal", **attributes) -> Iterator[Optional[Span]]:
+        trace = _current_trace.get()
+        if trace is None:
+            yield None
+            return
+        parent = _current_span.get()
+        span = trace.add(Span(name, kind, parent.span_id if parent else None, attributes))
+        token = _current_span.set(span)
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish(error)
+
+    def last_trace(self) -> Optional[Trace]:
+        with self._lock:
+            return self._traces[-1] if self._traces else None
+
+    def traces(self) -> List[Trace]:
+        with self._lock:
+            return list(self._traces)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+_default_tracer: Optional[Tracer] = None
+_default_tracer_lock = threading.Lock()
+
+
+def default_exporters() -> List[Any]:
+    """In-memory Prometheus metrics, plus the files named by APP_LAUNCHER_TRACE_FILE
+    (JSON lines, one span per line) and APP_LAUNCHER_METRICS_FILE (Prometheus text)."""
+    exporters: List[Any] = [PrometheusExporter(path=os.getenv("APP_LAUNCHER_METRICS_FILE") or None)]
+    trace_file = os.getenv("APP_LAUNCHER_TRACE_FILE")
+    if trace_file:
+        exporters.append(JsonlExporter(trace_file))
+    return exporters
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer."""
+    global _default_tracer
+    with _default_tracer_lock:
+        if _default_tracer is None:
+            _default_tracer = Tracer(default_exporters())
+    return _default_tracer
+
+
+def span(name: str, kind: str = "internal", **attributes):
+    """``get_tracer().span(...)``."""
+    return get_tracer().span(name, kind, **attributes)
+
+
+def traced(name: Optional[str] = None, kind: str = "tool"):
+    """Decorator recording each call (sync or async) as a span named ``name`` (default: the qualified name)."""
+    def decorator(function: Callable) -> Callable:
+        span_name = name or function.__qualname__
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                if _current_trace.get() is None:
+                    return await function(*args, **kwargs)
+                with span(span_name, kind):
+                    return await function(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is None:
+                return function(*args, **kwargs)
+            with span(span_name, kind):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def sleep(seconds: float, reason: str = "sleep") -> None:
+    """``time.sleep`` recorded as a span, so fixed delays show up in traces."""
+    with span(reason, "sleep", seconds=seconds):
+        time.sleep(seconds)
+
+
+async def asleep(seconds: float, reason: str = "sleep") -> None:
+    """``asyncio.sleep`` recorded as a span."""
+    with span(reason, "sleep", seconds=seconds):
+        await asyncio.sleep(seconds)
+
+
+def _usage(response) -> Tuple[Optional[int], Optional[int]]:
+    """(prompt, completion) tokens reported by the provider, if any."""
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    if usage.get("prompt_tokens") is not None:
+        return usage.get("prompt_tokens"), usage.get("completion_tokens")
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+            if metadata:
+                return metadata.get("input_tokens"), metadata.get("output_tokens")
+    return None, None
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """LangChain callbacks turned into spans of one trace.
+
+    Top-level chains and agent executors, every LLM call (with token counts,
+    estimated when the provider reports none, and time to first token when
+    streaming) and every tool run become spans; the many internal runnables
+    of a chain are folded into their parent. ReAct iterations are counted on
+    the enclosing agent span.
+    """
+
+    run_inline = True  # Keep callbacks in order (and in context) for async runs
+
+    def __init__(self, trace: Trace):
+        self.trace = trace
+        self._runs: Dict[UUID, Optional[Span]] = {}
+        self._owned: set = set()  # Runs that opened their own span
+        self._prompt_text: Dict[UUID, str] = {}
+        self._lock = threading.Lock()
+
+    def _parent(self, parent_run_id: Optional[UUID]) -> Optional[Span]:
+        if parent_run_id is not None:
+            with self._lock:
+                if parent_run_id in self._runs:
+                    return self._runs[parent_run_id]
+        return _current_span.get() or self.trace.root
+
+    def _start(self, run_id: UUID, parent_run_id: Optional[UUID], name: str, kind: str,
+               attributes: Optional[Dict[str, Any]] = None) -> Span:
+        parent = self._parent(parent_run_id)
+        span = self.trace.add(Span(name, kind, parent.span_id if parent else None, attributes))
+        with self._lock:
+            self._runs[run_id] = span
+            self._owned.add(run_id)
+        return span
+
+    def _skip(self, run_id: UUID, parent_run_id: Optional[UUID]) -> None:
+        parent = self._parent(parent_run_id)
+        with self._lock:
+            self._runs[run_id] = parent
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None) -> Optional[Span]:
+        with self._lock:
+            span = self._runs.pop(run_id, None)
+            owned = run_id in self._owned
+            self._owned.discard(run_id)
+        # Skipped runs map to their parent's span, which they must not close
+        if span is not None and owned:
+            span.finish(error)
+        return span
+
+    # Chains
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name") or "chain"
+        if parent_run_id is None or name == "AgentExecutor":
+            self._start(run_id, parent_run_id, name, "chain")
+        else:
+            self._skip(run_id, parent_run_id)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    def on_agent_action(self, action, *, run_id, **kwargs):
+        with self._lock:
+            span = self._runs.get(run_id)
+        if span is not None:
+            span.attributes["react_steps"] = span.attributes.get("react_steps", 0) + 1
+
+    # LLMs
+
+    def _start_llm(self, serialized, run_id, parent_run_id, prompt_text: str, kwargs) -> None:
+        params = kwargs.get("invocation_params") or {}
+        name = params.get("model_name") or params.get("model") or kwargs.get("name") \
+            or (serialized or {}).get("name") or "llm"
+        self._start(run_id, parent_run_id, str(name), "llm")
+        with self._lock:
+            self._prompt_text[run_id] = prompt_text
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, **kwargs):
+        self._start_llm(serialized, run_id, parent_run_id, "\n".join(prompts), kwargs)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, **kwargs):
+        text = "\n".join(str(message.content) for batch in messages for message in batch)
+        self._start_llm(serialized, run_id, parent_run_id, text, kwargs)
+
+    def on_llm_new_token(self, token, *, run_id, **kwargs):
+        with self._lock:
+            span = self._runs.get(run_id)
+        if span is not None and "first_token_ms" not in span.attributes:
+            span.attributes["first_token_ms"] = round((time.perf_counter() - span.start) * 1000, 3)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        with self._lock:
+            span = self._runs.get(run_id)
+            prompt_text = self._prompt_text.pop(run_id, "")
+        if span is not None:
+            prompt, completion = _usage(response)
+            if prompt is None:
+                completion_text = "".join(g.text for generations in response.generations for g in generations)
+                prompt, completion = count_tokens(prompt_text), count_tokens(completion_text)
+                span.attributes["tokens_estimated"] = True
+            span.attributes.update(prompt_tokens=prompt or 0, completion_tokens=completion or 0)
+        self._end(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        with self._lock:
+            self._prompt_text.pop(run_id, None)
+        self._end(run_id, error)
+
+    # Tools
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name") or "tool"
+        self._start(run_id, parent_run_id, name, "tool", {"input": input_str[:200]})
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+
+class JsonlExporter:
+    """Appends every span of a finished trace to ``path``, one JSON object per line."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace) -> None:
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in trace.span_dicts())
+        with self._lock:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class PrometheusExporter:
+    """Aggregates spans into Prometheus histograms and token counters.
+
+    ``render()`` returns the text exposition format; with a ``path`` the
+    text is also rewritten after every trace (for a node_exporter textfile
+    collector).
+    """
+
+    BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+    def __init__(self, path: Optional[str] = None, prefix: str = "app_launcher"):
+        self.path = path
+        self.prefix = prefix
+        self._histograms: Dict[Tuple[str, str], List[float]] = {}
+        self._sums: Dict[Tuple[str, str], float] = {}
+        self._tokens: Dict[Tuple[str, str], int] = {}
+        self._requests = 0
+        self._errors = 0
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace) -> None:
+        with self._lock:
+            self._requests += 1
+            self._errors += trace.root.error is not None
+            for span in trace.spans:
+                # Request names are user input; keep label cardinality bounded
+                key = (span.kind, "request" if span.kind == "request" else span.name)
+                counts = self._histograms.setdefault(key, [0] * (len(self.BUCKETS) + 1))
+                for index, bound in enumerate(self.BUCKETS):
+                    if span.duration <= bound:
+                        counts[index] += 1
+                counts[-1] += 1
+                self._sums[key] = self._sums.get(key, 0.0) + span.duration
+                if span.kind == "llm":
+                    for kind in ("prompt", "completion"):
+                        token_key = (span.name, kind)
+                        self._tokens[token_key] = self._tokens.get(token_key, 0) + span.attributes.get(
+                            f"{kind}_tokens", 0)
+        if self.path:
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.replace(tmp_path, self.path)
+
+    def render(self) -> str:
+        name = f"{self.prefix}_span_seconds"
+        lines = [
+            f"# HELP {self.prefix}_requests_total Traced requests.",
+            f"# TYPE {self.prefix}_requests_total counter",
+        ]
+        with self._lock:
+            lines.append(f"{self.prefix}_requests_total {self._requests}")
+            lines += [f"# HELP {self.prefix}_request_errors_total Traced requests that raised.",
+                      f"# TYPE {self.prefix}_request_errors_total counter",
+                      f"{self.prefix}_request_errors_total {self._errors}",
+                      f"# HELP {name} Time spent in traced spans.",
+                      f"# TYPE {name} histogram"]
+            for (kind, span_name), counts in sorted(self._histograms.items()):
+                labels = f'kind="{_label(kind)}",name="{_label(span_name)}"'
+                for bound, count in zip(self.BUCKETS, counts):
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {counts[-1]}')
+                lines.append(f"{name}_sum{{{labels}}} {self._sums[(kind, span_name)]:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {counts[-1]}")
+            lines += [f"# HELP {self.prefix}_llm_tokens_total Tokens sent to and received from LLMs.",
+                      f"# TYPE {self.prefix}_llm_tokens_total counter"]
+            for (model, kind), count in sorted(self._tokens.items()):
+                lines.append(f'{self.prefix}_llm_tokens_total{{model="{_label(model)}",type="{kind}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+def format_waterfall(trace: Trace, width: int = 40) -> str:
+    """Text waterfall of a trace: one line per span, indented by depth, with a bar on the request's timeline."""
+    total = max(trace.duration, 1e-9)
+    origin = trace.root.start
+    children: Dict[Optional[int], List[Span]] = {}
+    for span in trace.spans[1:]:
+        children.setdefault(span.parent_id, []).append(span)
+
+    lines = []
+
+    def visit(span: Span, depth: int) -> None:
+        offset = int((span.start - origin) / total * width)
+        length = max(1, int(span.duration / total * width))
+        bar = " " * offset + "█" * min(length, width - offset)
+        label = f"{'  ' * depth}{span.kind}: {span.name}"
+        tokens = ""
+        if span.kind == "llm":
+            tokens = f"  [{span.attributes.get('prompt_tokens', 0)}+{span.attributes.get('completion_tokens', 0)} tok]"
+        error = "  !" if span.error else ""
+        lines.append(f"{bar:<{width}} {span.duration * 1000:9.1f}ms  {label}{tokens}{error}")
+        for child in sorted(children.get(span.span_id, []), key=lambda s: s.start):
+            visit(child, depth + 1)
+
+    visit(trace.root, 0)
+    return "\n".join(lines)
@@ -1,12 +1,66 @@
-from typing import List, Union
+import os
+import threading
+from typing import List, Optional, Union
 from langchain_core.messages import AIMessage, HumanMessage
 
+def format_message(message: Union[AIMessage, HumanMessage]) -> Optional[dict]:
+    """Format one chat message for display in Streamlit (None for other message types)."""
+    if isinstance(message, HumanMessage):
+        return {"role": "user", "content": message.content}
+    elif isinstance(message, AIMessage):
+        return {"role": "assistant", "content": message.content}
+    return None
+
+
 def format_chat_history(chat_history: List[Union[AIMessage, HumanMessage]]) -> List[dict]:
     """Format chat history for display in Streamlit."""
     formatted_history = []
     for message in chat_history:
-        if isinstance(message, HumanMessage):
-            formatted_history.append({"role": "user", "content": message.content})
-        elif isinstance(message, AIMessage):
-            formatted_history.append({"role": "assistant", "content": message.content})
-    return formatted_history
\ No newline at end of file
+        formatted = format_message(message)
+        if formatted is not None:
+            formatted_history.append(formatted)
+    return formatted_history
+
+
+class RenderedChat:
+    """Append-only store of chat messages already formatted for display.
+
+    ``sync`` formats only the messages added to the history since the last
+    call, so each turn costs O(new messages) instead of reformatting the
+    whole conversation. A history that shrank or was replaced is formatted
+    again from scratch.
+    """
+
+    def __init__(self):
+        self.messages: List[dict] = []
+        self._synced = 0
+        self._first = None
+        self._lock = threading.Lock()
+
+    def sync(self, chat_history: List[Union[AIMessage, HumanMessage]]) -> List[dict]:
+        with self._lock:
+            first = chat_history[0] if chat_history else None
+            if len(chat_history) < self._synced or first is not self._first:
+                self.messages, self._synced = [], 0
+            self._first = first
+            for message in chat_history[self._synced:]:
+                formatted = format_message(message)
+                if formatted is not None:
+                    self.messages.append(formatted)
+            self._synced = len(chat_history)
+            return self.messages
+
+
+def get_cache_dir(*parts: str) -> str:
+    """Return (and create) the on-disk cache directory, optionally a subfolder of it.
+
+    Defaults to ``$XDG_CACHE_HOME/app_launcher_agent`` (``%LOCALAPPDATA%`` on Windows)
+    and can be overridden with the ``APP_LAUNCHER_CACHE_DIR`` environment variable.
+    """
+    base = os.getenv("APP_LAUNCHER_CACHE_DIR")
+    if not base:
+        root = os.getenv("LOCALAPPDATA") or os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        base = os.path.join(root, "app_launcher_agent")
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
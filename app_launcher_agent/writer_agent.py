@@ -1,10 +1,10 @@
 import re
 from typing import List, Union, Dict
 from langchain.agents import AgentExecutor, Tool, create_react_agent
-from langchain import hub
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import AIMessage, HumanMessage
 from .tools import TextEditorTool
+from .prompts import load_react_prompt
 
 class WritingAgent:
     def __init__(self, llm):
@@ -28,15 +28,16 @@ class WritingAgent:
             Tool(
                 name="text_editor",
                 func=editor.write_to_file,
+                coroutine=editor.awrite_to_file,
                 description="Useful for writing content to text files or word processors. "
                    "Input can specify editor with 'in winword.exe' or 'in wordpad.exe'. "
-                   "Example: 'Artificial intelligence in winword.exe'"
+                   "Example: 'Artificial intelligence in winword.exe'."
     )
         ]
     
     def _setup_agent(self):
         """Initialize and return the agent with strict prompt engineering."""
-        prompt = hub.pull("hwchase17/react-chat")   
+        prompt = load_react_prompt()   
         
         agent = create_react_agent(
             llm=self.llm,
@@ -104,5 +105,25 @@ class WritingAgent:
                 return f"Opened Notepad and wrote about: {clean_input}"
             return result["output"]
             
+        except Exception as e:
+            return f"Error processing your request: {str(e)}"
+    
+    async def arun(self, input_text: str, chat_history: List[Union[HumanMessage, AIMessage]] = None) -> str:
+        """Async version of run() built on AgentExecutor.ainvoke."""
+        try:
+            if chat_history is None:
+                chat_history = []
+            
+            clean_input = self._process_writing_request(input_text)
+            
+            result = await self.agent_executor.ainvoke({
+                "input": clean_input,
+                "chat_history": chat_history
+            })
+            
+            if "open notepad.exe" in input_text.lower():
+                return f"Opened Notepad and wrote about: {clean_input}"
+            return result["output"]
+            
         except Exception as e:
             return f"Error processing your request: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,46 @@
+"""Spreadsheet-style evaluation: one expression at a time vs evaluate_batch.
+
+Usage: python benchmarks/bench_expression.py [--rows N]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_launcher_agent.expression import evaluate, evaluate_batch
+
+
+def line_totals(rows: int):
+    """Expressions shaped like invoice lines: quantity * unit price, some with a discount."""
+    return [f"{i % 40 + 1} * {(i * 37) % 1000 / 100 + 0.99}" + (" * (1 - 0.15)" if i % 4 == 0 else "")
+            for i in range(rows)]
+
+
+def run(rows: int = 10000) -> dict:
+    sources = line_totals(rows)
+
+    start = time.perf_counter()
+    scalar = [evaluate(source) for source in sources]
+    scalar_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = evaluate_batch(sources)
+    batch_seconds = time.perf_counter() - start
+
+    return {
+        "rows": rows,
+        "scalar_rows_per_second": rows / scalar_seconds,
+        "batch_rows_per_second": rows / batch_seconds,
+        "speedup": scalar_seconds / batch_seconds,
+        "results_match": scalar == batch,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    args = parser.parse_args()
+    print(json.dumps(run(args.rows), indent=2))
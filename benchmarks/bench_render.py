@@ -0,0 +1,64 @@
+"""Per-turn chat formatting cost: full reformat + rerun vs the incremental RenderedChat store.
+
+The old app.py reformatted the whole history on every script run and then
+called st.rerun(), so each turn formatted the history twice. RenderedChat
+formats only the messages added since the previous run.
+
+Usage: python benchmarks/bench_render.py [--turns N] [--sample-every N]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app_launcher_agent.utils import RenderedChat, format_chat_history
+
+
+def run(turns: int = 2000, sample_every: int = 500) -> dict:
+    history = []
+    store = RenderedChat()
+    samples = []
+    reformat_total = incremental_total = 0.0
+
+    for turn in range(1, turns + 1):
+        history.append(HumanMessage(content=f"open app number {turn}"))
+        history.append(AIMessage(content=f"Launched app number {turn}\n" + "- detail line\n" * 5))
+
+        start = time.perf_counter()
+        for _ in range(2):  # the run that handled the input, then st.rerun()
+            format_chat_history(history)
+        reformat = time.perf_counter() - start
+
+        start = time.perf_counter()
+        store.sync(history)
+        incremental = time.perf_counter() - start
+
+        reformat_total += reformat
+        incremental_total += incremental
+        if turn == 1 or turn % sample_every == 0:
+            samples.append({
+                "turn": turn,
+                "messages": len(history),
+                "reformat_us": reformat * 1e6,
+                "incremental_us": incremental * 1e6,
+            })
+
+    return {
+        "turns": turns,
+        "script_runs_per_turn": {"reformat": 2, "incremental": 1},
+        "total_seconds": {"reformat": reformat_total, "incremental": incremental_total},
+        "samples": samples,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--sample-every", type=int, default=500)
+    args = parser.parse_args()
+    print(json.dumps(run(args.turns, args.sample_every), indent=2))
@@ -0,0 +1,75 @@
+"""Routing throughput and accuracy: vectorized IntentRouter vs the old keyword chain.
+
+Usage: python benchmarks/bench_router.py [--repeat N]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_launcher_agent.router import IntentRouter
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "routing_corpus.json")
+
+
+def keyword_route(text: str) -> str:
+    """The if/elif keyword chain app.py used before IntentRouter."""
+    lowered = text.lower()
+    if any(kw in lowered for kw in ["write", "essay", "article"]):
+        return "writer"
+    if any(kw in lowered for kw in ["list", "create"]):
+        return "file"
+    if any(kw in lowered for kw in ["calculate", "+", "-", "*", "/", "="]):
+        return "calc"
+    if any(kw in lowered for kw in ["open", "launch", "start"]):
+        return "app"
+    if any(kw in lowered for kw in ["code", "program", "algorithm", "function"]):
+        return "code"
+    if any(kw in lowered for kw in ["brightness", "volume", "bluetooth", "system"]):
+        return "system"
+    return "app"
+
+
+def load_corpus(path: str = CORPUS_PATH):
+    with open(path, encoding="utf-8") as f:
+        return [(text, label) for text, label in json.load(f)]
+
+
+def run(repeat: int = 50) -> dict:
+    corpus = load_corpus()
+    texts = [text for text, _ in corpus]
+    labels = [label for _, label in corpus]
+    router = IntentRouter()
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        keyword_results = [keyword_route(t) for t in texts]
+    keyword_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        vector_results = [r.agent for r in router.classify(texts)]
+    vector_seconds = time.perf_counter() - start
+
+    total = len(texts) * repeat
+    return {
+        "corpus_size": len(texts),
+        "keyword": {
+            "accuracy": sum(p == l for p, l in zip(keyword_results, labels)) / len(labels),
+            "inputs_per_second": total / keyword_seconds,
+        },
+        "vectorized": {
+            "accuracy": sum(p == l for p, l in zip(vector_results, labels)) / len(labels),
+            "inputs_per_second": total / vector_seconds,
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(run(args.repeat), indent=2))
@@ -0,0 +1,379 @@
+"""Offline microbenchmark suite with baseline comparison.
+
+Covers the routing decision app.py makes for every input, process lookups,
+directory listing on synthetic trees, expression evaluation, chat history
+formatting and the end-to-end run() overhead of every agent. Nothing
+touches the network: agents get a deterministic FakeLLM, prompts come from
+the bundled templates and caches live in a temporary directory. Agent
+timings exclude the time spent inside the fake model.
+
+Each benchmark reports the median and minimum time per operation. With a
+baseline (benchmarks/baseline.json by default, written by --save-baseline)
+the run fails when a median is more than --tolerance slower than its
+baseline and the slowdown exceeds --min-delta-us. Timings depend on the
+machine, so no baseline is committed: record one on the machine that runs
+the comparison (and again after an intended change) with --save-baseline.
+A missing default baseline only prints a note; a missing --baseline FILE
+given explicitly is an error.
+
+Usage: python benchmarks/bench_suite.py [--quick] [--only PREFIX] [--latency SECONDS]
+                                        [--output FILE] [--baseline FILE] [--save-baseline]
+                                        [--tolerance FRACTION] [--min-delta-us US]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import timeit
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+CORPUS_PATH = os.path.join(BENCH_DIR, "routing_corpus.json")
+
+# Agent inputs chosen to reach the ReAct loop (no fast path, no tool call). The
+# calculation agent has no ReAct loop; its input times the direct evaluation.
+AGENT_INPUTS = {
+    "app": "which browser did I use yesterday",
+    "writer": "write a short essay about the ocean",
+    "code": "write a python program to reverse a string",
+    "file": "what can you do with my files",
+    "system": "how do you manage my settings",
+    "calc": "calculate 12 * (3 + 4)",
+}
+EXPRESSIONS = ["2 + 3 * 4", "(1 + 2) ** 10 / 7", "sqrt(16) + 3", "100 / 3 - 2 * 5", "7 // 2 % 4"]
+
+
+class Benchmark:
+    """A named operation timed by ``measure``; ``ops`` operations per call of ``function``.
+
+    ``excluded`` returns a running total of seconds to leave out of the
+    measurement (the fake model's time for agent runs).
+    """
+
+    def __init__(self, name: str, function: Callable[[], object], ops: int = 1,
+                 excluded: Optional[Callable[[], float]] = None):
+        self.name = name
+        self.function = function
+        self.ops = ops
+        self.excluded = excluded
+
+
+def measure(benchmark: Benchmark, repeat: int = 5, min_batch: float = 0.05) -> Dict[str, float]:
+    """Median and minimum seconds per operation over ``repeat`` batches of at least ``min_batch`` seconds."""
+    timer = timeit.Timer(benchmark.function)
+    excluded = benchmark.excluded or (lambda: 0.0)
+
+    def batch(number: int) -> float:
+        before = excluded()
+        elapsed = timer.timeit(number)
+        return max(0.0, elapsed - (excluded() - before))
+
+    number = 1
+    while batch(number) < min_batch and number < 1 << 20:
+        number *= 2
+    per_op = [batch(number) / (number * benchmark.ops) for _ in range(repeat)]
+    return {
+        "median_us": statistics.median(per_op) * 1e6,
+        "min_us": min(per_op) * 1e6,
+        "ops": number * benchmark.ops * repeat,
+    }
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float = 0.5, min_delta_us: float = 5.0) -> List[str]:
+    """Describe every benchmark whose median regressed beyond the tolerance."""
+    regressions = []
+    for name, result in sorted(results.items()):
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        current, previous = result["median_us"], reference["median_us"]
+        if current > previous * (1 + tolerance) and current - previous > min_delta_us:
+            regressions.append(f"{name}: {current:.1f}us vs baseline {previous:.1f}us "
+                               f"(+{(current / previous - 1) * 100 if previous else float('inf'):.0f}%)")
+    return regressions
+
+
+def _routing_benchmarks(context: dict) -> Iterator[Benchmark]:
+    from app_launcher_agent.planner import CommandPlanner
+    from app_launcher_agent.router import IntentRouter
+
+    with open(CORPUS_PATH, encoding="utf-8") as f:
+        texts = [text for text, _ in json.load(f)]
+    router = IntentRouter()
+    planner = CommandPlanner(router)
+    planner.plan(texts[0])  # Build the vocabulary matrices before timing
+
+    yield Benchmark("routing.route", lambda: [router.route(text) for text in texts], ops=len(texts))
+    yield Benchmark("routing.plan", lambda: [planner.plan(text) for text in texts], ops=len(texts))
+
+
+def _process_benchmarks(context: dict) -> Iterator[Benchmark]:
+    from app_launcher_agent.app_catalog import AppCatalog
+    from app_launcher_agent.launch_tracker import LaunchTracker
+    from app_launcher_agent.process_index import ProcessIndex
+    from app_launcher_agent.tools import AppLauncherTool
+
+    tool = AppLauncherTool(process_index=ProcessIndex(ttl=3600), tracker=LaunchTracker(),
+                           catalog=AppCatalog.from_entries([]))
+    tool.is_app_running("python")
+
+    yield Benchmark("process.is_app_running.cached", lambda: tool.is_app_running("python"))
+    yield Benchmark("process.is_app_running.prefix", lambda: tool.is_app_running("py", match="prefix"))
+    yield Benchmark("process.index_refresh.full", lambda: ProcessIndex().refresh())
+
+
+def _make_tree(root: str, entries: int) -> str:
+    path = os.path.join(root, f"tree_{entries}")
+    os.makedirs(path)
+    for i in range(entries):
+        if i % 100 == 99:
+            os.mkdir(os.path.join(path, f"dir_{i:06d}"))
+        else:
+            with open(os.path.join(path, f"file_{i:06d}.txt"), "wb") as f:
+                f.write(b"x" * (i % 512))
+    return path
+
+
+def _listing_benchmarks(context: dict) -> Iterator[Benchmark]:
+    from app_launcher_agent.file_agent import FileOperationsTool
+
+    tool = FileOperationsTool()
+    for entries in context["tree_sizes"]:
+        path = _make_tree(context["workdir"], entries)
+        yield Benchmark(f"listing.first_page.{entries}", lambda path=path: tool._list_directory(path))
+        yield Benchmark(f"listing.count_total.{entries}",
+                        lambda path=path: tool._list_directory(path, count_total=True))
+        yield Benchmark(f"listing.sort_size.{entries}",
+                        lambda path=path: tool._list_directory(path, sort="size", reverse=True))
+
+
+def _calculation_benchmarks(context: dict) -> Iterator[Benchmark]:
+    agent = context["agents"]()["calc"]
+    yield Benchmark("calc.safe_eval", lambda: [agent._safe_eval(e) for e in EXPRESSIONS], ops=len(EXPRESSIONS))
+
+
+def _history_benchmarks(context: dict) -> Iterator[Benchmark]:
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    from app_launcher_agent.utils import format_chat_history
+
+    for messages in (1000, 10000):
+        history = [HumanMessage(content=f"open app number {i}") if i % 2 == 0
+                   else AIMessage(content=f"Launched app number {i}\n" + "- detail line\n" * 5)
+                   for i in range(messages)]
+        yield Benchmark(f"history.format_chat_history.{messages}", lambda history=history: format_chat_history(history))
+
+
+def _agent_benchmarks(context: dict) -> Iterator[Benchmark]:
+    agents = context["agents"]()
+    llm = context["llm"]
+    sink = io.StringIO()
+
+    def run(agent, text):
+        # AgentExecutor(verbose=True) prints every step
+        with contextlib.redirect_stdout(sink):
+            output = agent.run(text)
+        sink.seek(0)
+        sink.truncate()
+        return output
+
+    for name, text in AGENT_INPUTS.items():
+        yield Benchmark(f"agent.{name}.run_overhead", lambda agent=agents[name], text=text: run(agent, text),
+                        excluded=lambda: llm.llm_seconds)
+
+
+GROUPS: List[Tuple[str, Callable[[dict], Iterator[Benchmark]]]] = [
+    ("routing", _routing_benchmarks),
+    ("process", _process_benchmarks),
+    ("listing", _listing_benchmarks),
+    ("calc", _calculation_benchmarks),
+    ("history", _history_benchmarks),
+    ("agent", _agent_benchmarks),
+]
+
+
+class _NullCalculatorWindow:
+    """Calculator window backend that accepts every keystroke without a GUI."""
+
+    def launch(self):
+        pass
+
+    def find_window(self):
+        return "bench"
+
+    def is_alive(self, handle):
+        return True
+
+    def focus(self, handle):
+        pass
+
+    def clear(self):
+        pass
+
+    def type_expression(self, expression):
+        pass
+
+    def submit(self):
+        pass
+
+
+def _null_system_backend():
+    from app_launcher_agent.system_backends import SystemBackend
+
+    class NullSystemBackend(SystemBackend):
+        """System backend that stores levels in memory instead of touching devices."""
+
+        def __init__(self):
+            self.levels = {"brightness": 50, "volume": 50}
+
+        def get_brightness(self):
+            return self.levels["brightness"]
+
+        def set_brightness(self, percent):
+            self.levels["brightness"] = percent
+            return percent
+
+        def get_volume(self):
+            return self.levels["volume"]
+
+        def set_volume(self, percent):
+            self.levels["volume"] = percent
+            return percent
+
+        def bluetooth_command(self, enable):
+            return ["true"]
+
+    return NullSystemBackend()
+
+
+def _build_agents(llm) -> Dict[str, object]:
+    from app_launcher_agent.app_catalog import AppCatalog
+    from app_launcher_agent.agent import AppLauncherAgent
+    from app_launcher_agent.calculation_agent import CalculationAgent
+    from app_launcher_agent.calculator_session import CalculatorSession
+    from app_launcher_agent.code_agent import CodeGenerationAgent
+    from app_launcher_agent.file_agent import FileHandlingAgent
+    from app_launcher_agent.system_agent import SystemControlAgent
+    from app_launcher_agent.tools import SystemOperationsTool
+    from app_launcher_agent.writer_agent import WritingAgent
+
+    app = AppLauncherAgent(llm)
+    app.launcher.catalog = app.resolver.catalog = AppCatalog.from_entries([])
+    return {
+        "app": app,
+        "writer": WritingAgent(llm),
+        "code": CodeGenerationAgent(llm),
+        "file": FileHandlingAgent(llm),
+        "system": SystemControlAgent(llm, SystemOperationsTool(backend=_null_system_backend())),
+        "calc": CalculationAgent(llm, session=CalculatorSession(_NullCalculatorWindow())),
+    }
+
+
+def run(quick: bool = False, only: Optional[str] = None, latency: float = 0.0,
+        tree_sizes: Optional[List[int]] = None) -> dict:
+    from fake_llm import FakeLLM
+
+    workdir = tempfile.mkdtemp(prefix="bench-suite-")
+    previous_env = {key: os.environ.get(key) for key in ("APP_LAUNCHER_CACHE_DIR", "APP_LAUNCHER_OFFLINE")}
+    os.environ["APP_LAUNCHER_CACHE_DIR"] = os.path.join(workdir, "cache")
+    os.environ["APP_LAUNCHER_OFFLINE"] = "1"
+
+    llm = FakeLLM(latency=latency)
+    agents: Dict[str, object] = {}
+
+    def get_agents():
+        if not agents:
+            agents.update(_build_agents(llm))
+        return agents
+
+    context = {
+        "workdir": workdir,
+        "llm": llm,
+        "agents": get_agents,
+        "tree_sizes": tree_sizes or ([10, 1000] if quick else [10, 10_000, 100_000]),
+    }
+    repeat, min_batch = (3, 0.01) if quick else (5, 0.05)
+    results: Dict[str, Dict[str, float]] = {}
+    started = time.perf_counter()
+    try:
+        for group, factory in GROUPS:
+            if only and not group.startswith(only.split(".")[0]):
+                continue
+            for benchmark in factory(context):
+                if only and not benchmark.name.startswith(only):
+                    continue
+                results[benchmark.name] = measure(benchmark, repeat, min_batch)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        for key, value in previous_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "quick": quick,
+            "llm_latency": latency,
+            "seconds": time.perf_counter() - started,
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="smaller trees and shorter batches")
+    parser.add_argument("--only", help="run only benchmarks whose name starts with this prefix")
+    parser.add_argument("--latency", type=float, default=0.0, help="fake LLM latency in seconds")
+    parser.add_argument("--output", help="write the results JSON here instead of stdout")
+    parser.add_argument("--baseline", help=f"baseline JSON (default {DEFAULT_BASELINE})")
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed slowdown, as a fraction")
+    parser.add_argument("--min-delta-us", type=float, default=5.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args(argv)
+
+    baseline_path = args.baseline or DEFAULT_BASELINE
+    if args.baseline and not args.save_baseline and not os.path.exists(args.baseline):
+        parser.error(f"baseline {args.baseline} does not exist; create it with --save-baseline")
+
+    report = run(args.quick, args.only, args.latency)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.save_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {baseline_path}", file=sys.stderr)
+        return 0
+
+    if not os.path.exists(baseline_path):
+        print(f"No baseline at {baseline_path}; run with --save-baseline to create one", file=sys.stderr)
+        return 0
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    regressions = compare(report["results"], baseline, args.tolerance, args.min_delta_us)
+    for regression in regressions:
+        print(f"REGRESSION {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
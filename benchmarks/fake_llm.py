@@ -0,0 +1,54 @@
+"""Deterministic offline LLM for benchmarks and tests.
+
+FakeLLM answers from a fixed list of responses (cycled in order) after
+sleeping ``latency`` seconds, and records how long it spent in calls so
+callers can subtract model time from end-to-end measurements.
+"""
+import asyncio
+import time
+from typing import Any, List, Optional
+
+from langchain_core.language_models.llms import LLM
+
+FINAL_ANSWER = "Thought: Do I need to use a tool? No\nFinal Answer: Done."
+
+
+class FakeLLM(LLM):
+    responses: List[str] = [FINAL_ANSWER]
+    latency: float = 0.0
+    calls: int = 0
+    llm_seconds: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-benchmark"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model_name": "fake-benchmark", "latency": self.latency}
+
+    def _next_response(self) -> str:
+        response = self.responses[self.calls % len(self.responses)]
+        self.calls += 1
+        return response
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        start = time.perf_counter()
+        if self.latency:
+            time.sleep(self.latency)
+        response = self._next_response()
+        self.llm_seconds += time.perf_counter() - start
+        return response
+
+    async def _acall(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None,
+                     **kwargs: Any) -> str:
+        start = time.perf_counter()
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        response = self._next_response()
+        self.llm_seconds += time.perf_counter() - start
+        return response
+
+    def reset_stats(self) -> None:
+        self.calls = 0
+        self.llm_seconds = 0.0
@@ -0,0 +1,16 @@
+import pytest
+
+
+@pytest.fixture(autouse=True, scope="session")
+def isolated_cache_dir(tmp_path_factory):
+    """Keep catalogs, prompt and response caches out of the real user cache directory."""
+    patch = pytest.MonkeyPatch()
+    patch.setenv("APP_LAUNCHER_CACHE_DIR", str(tmp_path_factory.mktemp("app_launcher_cache")))
+    yield
+    patch.undo()
+
+
+@pytest.fixture(autouse=True)
+def no_window_settle(monkeypatch):
+    """No real windows appear in tests, so launches need not keep the focus afterwards."""
+    monkeypatch.setattr("app_launcher_agent.tools.WINDOW_SETTLE", 0.0)
@@ -0,0 +1,26 @@
+"""Test doubles shared by several test modules."""
+from typing import Any, List, Optional
+
+from langchain_core.language_models.llms import LLM
+
+
+class ScriptedLLM(LLM):
+    """A real LangChain LLM that answers from ``responses`` (cycled in order) and counts its calls.
+
+    A MagicMock cannot stand in for the model behind a ReAct agent:
+    create_react_agent calls ``llm.bind(stop=...)`` and feeds the result to an
+    output parser, so the mock's ``invoke`` is never reached and a MagicMock
+    comes back instead of text.
+    """
+
+    responses: List[str] = ["Thought: Do I need to use a tool? No\nFinal Answer: Done."]
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def _call(self, prompt: str, stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> str:
+        response = self.responses[self.calls % len(self.responses)]
+        self.calls += 1
+        return response
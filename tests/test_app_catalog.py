@@ -0,0 +1,235 @@
+import os
+import stat
+
+import pytest
+
+from app_launcher_agent.app_catalog import AppCatalog, AppEntry, is_denied, normalize_app_name, parse_desktop_file
+from app_launcher_agent.launch_resolver import LaunchResolver
+from app_launcher_agent.process_index import ProcessIndex
+from app_launcher_agent.tools import AppLauncherTool
+
+DESKTOP_FILES = {
+    "code.desktop": """[Desktop Entry]
+Name=Visual Studio Code
+GenericName=Code Editor
+Exec=/usr/share/code/code --unity-launch %F
+Keywords=vscode;
+Type=Application
+""",
+    "org.gnome.gedit.desktop": """[Desktop Entry]
+Name=Text Editor
+GenericName=Text Editor
+Exec=gedit %U
+Type=Application
+""",
+    "firefox.desktop": """[Desktop Entry]
+Name=Firefox Web Browser
+GenericName=Web Browser
+Exec=firefox %u
+Type=Application
+
+[Desktop Action new-window]
+Name=New Window
+Exec=firefox --new-window
+""",
+    "hidden.desktop": """[Desktop Entry]
+Name=Hidden Helper
+Exec=helper
+NoDisplay=true
+""",
+}
+
+
+def make_executable(path):
+    path.write_text("#!/bin/sh\n")
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+
+
+@pytest.fixture
+def sources(tmp_path):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for name in ["gedit", "firefox", "libreoffice", "git"]:
+        make_executable(bin_dir / name)
+    (bin_dir / "README").write_text("not executable")
+
+    applications = tmp_path / "applications"
+    (applications / "vendor").mkdir(parents=True)
+    for name, content in DESKTOP_FILES.items():
+        (applications / name).write_text(content)
+    (applications / "vendor" / "spotify.desktop").write_text(
+        "[Desktop Entry]\nName=Spotify\nExec=spotify %U\nType=Application\n")
+    return {"path": [str(bin_dir)], "desktop": [str(applications), str(tmp_path / "missing")]}
+
+
+@pytest.fixture
+def catalog(tmp_path, sources):
+    return AppCatalog(cache_path=str(tmp_path / "apps.json"), system="Linux", source_dirs=sources)
+
+
+def test_normalize_app_name():
+    assert normalize_app_name("Visual Studio Code") == "visualstudiocode"
+    assert normalize_app_name("Code.EXE") == "code"
+    assert normalize_app_name("org.gnome.gedit.desktop") == "orggnomegedit"
+
+
+def test_parse_desktop_file(tmp_path):
+    path = tmp_path / "code.desktop"
+    path.write_text(DESKTOP_FILES["code.desktop"])
+    entry = parse_desktop_file(str(path))
+    assert entry.name == "Visual Studio Code"
+    assert entry.command == ("/usr/share/code/code", "--unity-launch")
+    assert "vscode" in entry.keywords
+
+    path.write_text(DESKTOP_FILES["hidden.desktop"])
+    assert parse_desktop_file(str(path)) is None
+
+
+def test_scan_covers_path_and_desktop_files(catalog):
+    assert len(catalog) == 8
+    names = {entry.name for entry in catalog.entries}
+    assert {"Visual Studio Code", "Text Editor", "Firefox Web Browser", "Spotify", "git"} <= names
+    assert "README" not in names
+    assert "Hidden Helper" not in names
+
+
+@pytest.mark.parametrize("spoken, expected", [
+    ("Visual Studio Code", "Visual Studio Code"),
+    ("VS Code", "Visual Studio Code"),
+    ("code", "Visual Studio Code"),
+    ("firefox browser", "Firefox Web Browser"),
+    ("firefox", "Firefox Web Browser"),
+    ("the text editor app", "Text Editor"),
+    ("gedit", "Text Editor"),
+    ("libreoffice", "libreoffice"),
+    ("spoti", "Spotify"),
+    ("fierfox", "Firefox Web Browser"),
+    ("spotfy", "Spotify"),
+])
+def test_resolve(catalog, spoken, expected):
+    assert catalog.resolve(spoken).name == expected
+
+
+def test_resolve_rejects_unknown_names(catalog):
+    assert catalog.resolve("photoshop") is None
+    # Whole-name matching does not guess from a fragment
+    assert catalog.resolve("firefox browser", partial=False) is None
+    assert catalog.resolve("gti", partial=False) is None
+
+
+def test_path_executables_match_only_by_exact_name(tmp_path):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    for name in ["poweroff", "shutdown", "reboot", "choom", "file", "systemd-notify", "libreoffice"]:
+        make_executable(bin_dir / name)
+    applications = tmp_path / "applications"
+    applications.mkdir()
+    (applications / "firefox.desktop").write_text(DESKTOP_FILES["firefox.desktop"])
+    catalog = AppCatalog(cache_path=str(tmp_path / "apps.json"), system="Linux",
+                         source_dirs={"path": [str(bin_dir)], "desktop": [str(applications)]})
+
+    assert catalog.resolve("libreoffice").name == "libreoffice"
+    for spoken in ["power", "shut", "reboot menu", "chrome", "file manager", "notify", "libreoff"]:
+        assert catalog.resolve(spoken) is None, spoken
+    # Denied system binaries are not launchable even by their exact name
+    for spoken in ["poweroff", "shutdown", "reboot", "powerof"]:
+        assert catalog.resolve(spoken) is None, spoken
+    assert catalog.resolve("fierfox").name == "Firefox Web Browser"
+
+    resolver = LaunchResolver(catalog=catalog)
+    assert resolver.resolve_action("launch spotify") is None
+    assert resolver.resolve_action("open powerof") is None
+    assert resolver.resolve_action("open poweroff") is None
+
+
+def test_launcher_refuses_denied_commands(mocker):
+    mocker.patch('platform.system', return_value="Linux")
+    mocker.patch('psutil.process_iter', return_value=[])
+    spawn = mocker.patch('os.posix_spawnp', return_value=4242)
+    tool = AppLauncherTool(process_index=ProcessIndex(), catalog=AppCatalog.from_entries([]))
+
+    assert is_denied("/usr/sbin/poweroff") and is_denied("shutdown.exe") and not is_denied("firefox")
+    assert "Could not launch" in tool.launch_app("poweroff")
+    spawn.assert_not_called()
+
+
+def test_complete_and_fuzzy(catalog):
+    assert [entry.name for entry in catalog.complete("lib")] == ["libreoffice"]
+    assert catalog.fuzzy("gitt") == [(1, catalog.get("git"))]
+    assert catalog.fuzzy("gt") == []
+
+
+def test_catalog_is_persisted_and_invalidated_by_mtime(tmp_path, sources, catalog, mocker):
+    assert catalog.resolve("spotify").name == "Spotify"
+
+    scan = mocker.spy(AppCatalog, "scan")
+    reloaded = AppCatalog(cache_path=catalog.cache_path, system="Linux", source_dirs=sources)
+    assert reloaded.resolve("spotify").name == "Spotify"
+    scan.assert_not_called()
+
+    vendor = tmp_path / "applications" / "vendor"
+    (vendor / "gimp.desktop").write_text("[Desktop Entry]\nName=GNU Image Manipulation Program\nExec=gimp\n")
+    os.utime(vendor, (1, 1))
+    fresh = AppCatalog(cache_path=catalog.cache_path, system="Linux", source_dirs=sources)
+    assert fresh.resolve("gimp").name == "GNU Image Manipulation Program"
+    assert scan.call_count == 1
+
+    assert reloaded.refresh(force=True)
+    assert reloaded.resolve("gimp") is not None
+
+
+def test_windows_start_menu_and_macos_bundles(tmp_path):
+    programs = tmp_path / "Programs" / "Accessories"
+    programs.mkdir(parents=True)
+    (programs / "Paint.NET.lnk").write_bytes(b"")
+    catalog = AppCatalog(cache_path=str(tmp_path / "win.json"), system="Windows",
+                         source_dirs={"start-menu": [str(tmp_path / "Programs")]})
+    entry = catalog.resolve("paint.net")
+    assert entry.shell and entry.command == (f'start "" "{programs / "Paint.NET.lnk"}"',)
+
+    applications = tmp_path / "Applications"
+    (applications / "Visual Studio Code.app").mkdir(parents=True)
+    catalog = AppCatalog(cache_path=str(tmp_path / "mac.json"), system="Darwin",
+                         source_dirs={"bundle": [str(applications)]})
+    assert catalog.resolve("vs code").command == ("open", "-a", str(applications / "Visual Studio Code.app"))
+
+
+def test_launcher_uses_catalog_commands(catalog, mocker):
+    mocker.patch('platform.system', return_value="Linux")
+    mocker.patch('psutil.process_iter', return_value=[])
+    spawn = mocker.patch('os.posix_spawnp', return_value=4242)
+    tool = AppLauncherTool(process_index=ProcessIndex(), catalog=catalog)
+
+    assert tool.launch_app("VS Code") == "Successfully launched Visual Studio Code"
+    assert spawn.call_args.args[1] == ["/usr/share/code/code", "--unity-launch"]
+
+    resolver = LaunchResolver(catalog=catalog)
+    assert resolver.resolve("open spotify") == "spotify"
+    assert resolver.resolve("open visual studio code") == "code"
+    assert resolver.resolve("open the file report.docx") is None
+
+
+def test_resolved_names_find_apps_started_elsewhere(catalog, mocker):
+    # Firefox was started from the desktop, not by the launcher
+    firefox = mocker.MagicMock(pid=1234)
+    firefox.name.return_value = "firefox"
+    firefox.create_time.return_value = 1.0
+    mocker.patch('psutil.process_iter', return_value=[firefox])
+    spawn = mocker.patch('os.posix_spawnp', return_value=4242)
+    tool = AppLauncherTool(process_index=ProcessIndex(), catalog=catalog)
+    resolver = LaunchResolver(catalog=catalog, system="Linux")
+
+    assert resolver.resolve_action("is firefox web browser running") == ("status", "firefox")
+    assert tool.app_status("firefox") == "firefox is running."
+    assert tool.launch_app(resolver.resolve("open firefox web browser")) == "firefox is already running."
+    spawn.assert_not_called()
+
+
+def test_from_entries():
+    catalog = AppCatalog.from_entries([AppEntry("Blender", ("blender",), "desktop"),
+                                       AppEntry("gimp", ("gimp",), "path")])
+    assert len(catalog) == 2
+    assert catalog.resolve("blendr").name == "Blender"
+    assert catalog.resolve("gimp").name == "gimp"
+    assert catalog.resolve("gimpp") is None
+    assert AppCatalog.from_entries([]).resolve("blender") is None
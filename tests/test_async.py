@@ -0,0 +1,98 @@
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock
+from app_launcher_agent.agent import AppLauncherAgent
+from app_launcher_agent.app_catalog import AppCatalog
+from app_launcher_agent.calculator_session import CalculatorSession, WindowBackend
+from app_launcher_agent.llm_cache import LLMResponseCache
+from app_launcher_agent.tools import AppLauncherTool, CodeGenerationTool, TextEditorTool
+
+def _async_llm(chunks):
+    async def astream(prompt):
+        for chunk in chunks:
+            yield MagicMock(content=chunk)
+
+    llm = MagicMock()
+    llm._identifying_params = {"model_name": "fake"}
+    llm.astream.side_effect = astream
+    llm.ainvoke = AsyncMock(return_value=MagicMock(content="".join(chunks)))
+    return llm
+
+def test_alaunch_app_spawns_without_shell(mocker):
+    mocker.patch('platform.system', return_value="Linux")
+    mocker.patch('psutil.process_iter', return_value=[])
+    spawn = mocker.patch('os.posix_spawnp', return_value=4242)
+    popen = mocker.patch('subprocess.Popen')
+
+    result = asyncio.run(AppLauncherTool(catalog=AppCatalog.from_entries([])).alaunch_app("firefox"))
+    assert result == "Successfully launched firefox"
+    assert spawn.call_args.args[:2] == ("firefox", ["firefox"])
+    popen.assert_not_called()
+
+def test_alaunch_app_checks_running_off_the_event_loop(mocker):
+    tool = AppLauncherTool(catalog=AppCatalog.from_entries([]))
+    loop_thread = threading.get_ident()
+    checked_on = []
+
+    def is_app_running(name):
+        checked_on.append(threading.get_ident())
+        return True
+
+    mocker.patch.object(tool, 'is_app_running', side_effect=is_app_running)
+
+    assert asyncio.run(tool.alaunch_app("firefox")) == "firefox is already running."
+    assert checked_on and checked_on[0] != loop_thread
+
+def test_calculator_session_drives_the_window_off_the_event_loop():
+    loop_thread = threading.get_ident()
+    calls = []
+
+    class Window(WindowBackend):
+        def launch(self): calls.append(("launch", threading.get_ident()))
+        def find_window(self): return calls.append(("find", threading.get_ident())) or "calc"
+        def is_alive(self, handle): return calls.append(("alive", threading.get_ident())) or True
+        def focus(self, handle): calls.append(("focus", threading.get_ident()))
+        def clear(self): calls.append(("clear", threading.get_ident()))
+        def type_expression(self, expression): calls.append(("type", threading.get_ident()))
+        def submit(self): calls.append(("submit", threading.get_ident()))
+
+    session = CalculatorSession(Window())
+    asyncio.run(session.ashow("2+2"))
+    asyncio.run(session.ashow("3+3"))
+
+    assert {name for name, _ in calls} >= {"find", "alive", "focus", "type"}
+    assert all(thread != loop_thread for _, thread in calls)
+
+def test_awrite_to_file_streams_without_blocking(tmp_path, mocker):
+    mocker.patch('platform.system', return_value="Linux")
+    spawn = mocker.patch('asyncio.create_subprocess_exec', new=AsyncMock())
+    sleep = mocker.patch('asyncio.sleep', new=AsyncMock())
+    blocking_sleep = mocker.patch('time.sleep')
+    tool = TextEditorTool(_async_llm(["Oceans ", "cover 71%"]), LLMResponseCache(cache_dir=str(tmp_path)))
+
+    result = asyncio.run(tool.awrite_to_file("the ocean"))
+    assert result == "Successfully wrote about 'the ocean' and opened in notepad.exe"
+    path = spawn.await_args.args[1]
+    assert open(path).read() == "Oceans cover 71%"
+    sleep.assert_awaited_once_with(1)
+    blocking_sleep.assert_not_called()
+
+def test_agenerate_code_non_streaming(tmp_path, mocker):
+    mocker.patch('platform.system', return_value="Linux")
+    spawn = mocker.patch('asyncio.create_subprocess_exec', new=AsyncMock())
+    llm = _async_llm(["```python\nprint('hi')\n```"])
+    tool = CodeGenerationTool(llm, LLMResponseCache(cache_dir=str(tmp_path)), streaming=False)
+
+    result = asyncio.run(tool.agenerate_and_write_code("python; say hi"))
+    assert result.startswith("Generated python code")
+    assert open(spawn.await_args.args[1]).read() == "print('hi')"
+
+def test_agent_arun_fast_path(mocker):
+    mocker.patch('platform.system', return_value="Windows")
+    llm = MagicMock()
+    agent = AppLauncherAgent(llm)
+    launch = mocker.patch.object(agent.launcher, 'alaunch_app', new=AsyncMock(return_value="Successfully launched notepad"))
+
+    assert asyncio.run(agent.arun("open notepad")) == "Successfully launched notepad"
+    launch.assert_awaited_once_with("notepad")
+    llm.ainvoke.assert_not_called()
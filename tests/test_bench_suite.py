@@ -0,0 +1,58 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from bench_suite import Benchmark, compare, main, measure, run  # noqa: E402
+from fake_llm import FINAL_ANSWER, FakeLLM  # noqa: E402
+
+
+def test_fake_llm_is_deterministic_and_timed():
+    llm = FakeLLM(responses=["one", "two"], latency=0.01)
+    assert [llm.invoke("a"), llm.invoke("b"), llm.invoke("c")] == ["one", "two", "one"]
+    assert llm.calls == 3
+    assert llm.llm_seconds >= 0.03
+    llm.reset_stats()
+    assert (llm.calls, llm.llm_seconds) == (0, 0.0)
+    assert FakeLLM().invoke("x") == FINAL_ANSWER
+
+
+def test_measure_excludes_model_time():
+    llm = FakeLLM(latency=0.002)
+    result = measure(Benchmark("sleep", lambda: llm.invoke("x"), excluded=lambda: llm.llm_seconds),
+                     repeat=3, min_batch=0.01)
+    assert result["median_us"] < 1000
+    assert result["ops"] >= 3
+
+
+def test_compare_flags_only_real_regressions():
+    baseline = {"fast": {"median_us": 10.0}, "slow": {"median_us": 1000.0}, "gone": {"median_us": 1.0}}
+    results = {"fast": {"median_us": 14.0}, "slow": {"median_us": 1600.0}, "new": {"median_us": 5.0}}
+    regressions = compare(results, baseline, tolerance=0.5, min_delta_us=5.0)
+    assert len(regressions) == 1
+    assert regressions[0].startswith("slow: 1600.0us vs baseline 1000.0us")
+
+
+def test_suite_runs_offline_and_fails_on_regression(tmp_path):
+    report = run(quick=True, only="calc")
+    assert set(report["results"]) == {"calc.safe_eval"}
+
+    baseline = tmp_path / "baseline.json"
+    output = str(tmp_path / "out.json")
+    assert main(["--quick", "--only", "agent.calc", "--output", output, "--baseline", str(baseline),
+                 "--save-baseline"]) == 0
+    # Comparing two quick runs must not trip on timing noise; only the real regression below may fail
+    assert main(["--quick", "--only", "agent.calc", "--output", output, "--baseline", str(baseline),
+                 "--tolerance", "100"]) == 0
+
+    baseline.write_text('{"results": {"agent.calc.run_overhead": {"median_us": 0.001}}}')
+    assert main(["--quick", "--only", "agent.calc", "--output", output, "--baseline", str(baseline)]) == 1
+
+
+def test_explicit_baseline_must_exist(tmp_path, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--quick", "--only", "calc", "--baseline", str(tmp_path / "missing.json")])
+    assert exit_info.value.code == 2
+    assert "does not exist; create it with --save-baseline" in capsys.readouterr().err
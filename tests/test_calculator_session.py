@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from app_launcher_agent.calculation_agent import CalculationAgent
+from app_launcher_agent.calculator_session import CalculatorSession, WindowBackend
+
+class FakeWindowBackend(WindowBackend):
+    """Window appears ``appear_after`` polls after launch; keystrokes are recorded."""
+
+    def __init__(self, appear_after=2, running=False):
+        self.appear_after = appear_after
+        self.window = "win-1" if running else None
+        self.polls_until_window = None
+        self.alive = running
+        self.events = []
+
+    def launch(self):
+        self.events.append("launch")
+        self.polls_until_window = self.appear_after
+        self.alive = True
+
+    def find_window(self):
+        self.events.append("find")
+        if self.window is None and self.polls_until_window is not None:
+            if self.polls_until_window == 0:
+                self.window = "win-1"
+            self.polls_until_window -= 1
+        return self.window
+
+    def is_alive(self, handle):
+        return self.alive and handle == self.window
+
+    def focus(self, handle):
+        self.events.append(f"focus {handle}")
+
+    def clear(self):
+        self.events.append("clear")
+
+    def type_expression(self, expression):
+        self.events.append(f"type {expression}")
+
+    def submit(self):
+        self.events.append("submit")
+
+def test_launches_once_and_waits_for_window():
+    backend = FakeWindowBackend(appear_after=2)
+    session = CalculatorSession(backend, poll_interval=0)
+
+    session.show("2+2")
+    session.show("3*3")
+    assert session.launches == 1
+    assert backend.events.count("launch") == 1
+    assert backend.events[-4:] == ["focus win-1", "clear", "type 3*3", "submit"]
+
+def test_reuses_already_running_calculator():
+    backend = FakeWindowBackend(running=True)
+    session = CalculatorSession(backend)
+    session.show("1+1")
+    assert session.launches == 0
+
+def test_relaunches_after_window_is_closed():
+    backend = FakeWindowBackend(appear_after=0)
+    session = CalculatorSession(backend, poll_interval=0)
+    session.show("1+1")
+    backend.alive, backend.window = False, None
+    session.show("2+2")
+    assert session.launches == 2
+
+def test_times_out_when_window_never_appears():
+    backend = FakeWindowBackend(appear_after=10**9)
+    ticks = iter(range(100))
+    session = CalculatorSession(backend, ready_timeout=3, poll_interval=0, clock=lambda: next(ticks))
+    with pytest.raises(TimeoutError):
+        session.ensure_ready()
+
+def test_agent_drives_session_without_sleeps(mocker):
+    sleep = mocker.patch('time.sleep')
+    backend = FakeWindowBackend(running=True)
+    agent = CalculationAgent(llm=None, session=CalculatorSession(backend))
+
+    assert agent.run("calculate (25*4)+(18/3)") == "Result: (25*4)+(18/3) = 106.0"
+    assert asyncio.run(agent.arun("3+5+2")) == "Result: 3+5+2 = 10"
+    assert "type (25*4)+(18/3)" in backend.events
+    sleep.assert_not_called()
+
+@pytest.mark.parametrize("text,reply,typed", [
+    ("calculate 10 % 3", "Result: 10 % 3 = 1", "10 % 3"),
+    ("calculate sqrt(16)", "Result: sqrt(16) = 4.0", "sqrt(16)"),
+    ("compute max(2, 7) // 2", "Result: max(2, 7) // 2 = 3", "max(2, 7) // 2"),
+    ("calculate 2**10", "Result: 2**10 = 1024", "2**10"),
+])
+def test_agent_accepts_the_whole_grammar(text, reply, typed):
+    backend = FakeWindowBackend(running=True)
+    agent = CalculationAgent(llm=None, session=CalculatorSession(backend))
+
+    assert agent._perform_calculation(text) == reply
+    assert f"type {typed}" in backend.events
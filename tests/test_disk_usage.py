@@ -0,0 +1,119 @@
+import os
+
+import pytest
+
+from app_launcher_agent.disk_usage import ROOT_BUCKET, DiskUsageScanner
+from app_launcher_agent.file_agent import FileOperationsTool
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "videos" / "2024").mkdir(parents=True)
+    (tmp_path / "videos" / "2024" / "trip.mp4").write_bytes(b"v" * 5000)
+    (tmp_path / "videos" / "intro.mp4").write_bytes(b"v" * 1000)
+    (tmp_path / "docs").mkdir()
+    (tmp_path / "docs" / "cv.pdf").write_bytes(b"d" * 300)
+    (tmp_path / "readme.txt").write_bytes(b"r" * 10)
+    return tmp_path
+
+
+def test_summarizes_folders_and_largest_files(tree):
+    report = DiskUsageScanner(max_workers=4).scan(str(tree), top_n=2)
+
+    assert report.complete
+    assert report.size == 6310
+    assert report.files == 4
+    assert report.directories == 3
+    assert [(f.name, f.size, f.files) for f in report.folders] == [
+        ("videos", 6000, 2), ("docs", 300, 1), (ROOT_BUCKET, 10, 1)]
+    assert report.largest == [(5000, str(tree / "videos" / "2024" / "trip.mp4")),
+                              (1000, str(tree / "videos" / "intro.mp4"))]
+
+
+def test_hard_links_are_counted_once(tree):
+    os.link(tree / "videos" / "intro.mp4", tree / "docs" / "intro-link.mp4")
+    report = DiskUsageScanner().scan(str(tree))
+    assert report.size == 6310
+    assert report.files == 4
+
+
+_scandir = os.scandir
+
+
+class _WindowsEntry:
+    """A DirEntry whose stat() leaves st_ino, st_dev and st_nlink at 0, as on Windows."""
+
+    def __init__(self, entry):
+        self._entry = entry
+        self.path = entry.path
+
+    def is_dir(self, follow_symlinks=True):
+        return self._entry.is_dir(follow_symlinks=follow_symlinks)
+
+    def stat(self, follow_symlinks=True):
+        stat = self._entry.stat(follow_symlinks=follow_symlinks)
+        return os.stat_result((stat.st_mode, 0, 0, 0, stat.st_uid, stat.st_gid, stat.st_size,
+                               stat.st_atime, stat.st_mtime, stat.st_ctime))
+
+
+class _WindowsScandir:
+    def __init__(self, path):
+        self._entries = _scandir(path)
+
+    def __enter__(self):
+        return (_WindowsEntry(entry) for entry in self._entries)
+
+    def __exit__(self, *exc_info):
+        self._entries.close()
+
+
+def test_hard_links_are_counted_once_without_dir_entry_link_counts(tree, mocker):
+    os.link(tree / "videos" / "intro.mp4", tree / "docs" / "intro-link.mp4")
+    mocker.patch("app_launcher_agent.disk_usage.os.scandir", _WindowsScandir)
+    report = DiskUsageScanner().scan(str(tree))
+    assert report.size == 6310
+    assert report.files == 4
+
+
+def test_depth_limit_returns_partial_report(tree):
+    report = DiskUsageScanner().scan(str(tree), max_depth=1)
+    assert not report.complete
+    assert report.size == 1310
+
+
+def test_time_budget_returns_partial_report(tree, mocker):
+    clock = iter([0.0, 0.0, 100.0, 100.0, 100.0, 100.0])
+    mocker.patch("app_launcher_agent.disk_usage.time.monotonic", side_effect=lambda: next(clock, 100.0))
+    report = DiskUsageScanner().scan(str(tree), time_budget=1.0)
+    assert not report.complete
+    assert report.size == 10
+
+
+def test_results_are_cached_until_directory_changes(tree, mocker):
+    scanner = DiskUsageScanner()
+    first = scanner.scan(str(tree))
+    scan = mocker.spy(scanner, "_scan")
+    assert scanner.scan(str(tree)) is first
+    scan.assert_not_called()
+
+    (tree / "new.bin").write_bytes(b"n" * 90)
+    os.utime(tree, (0, os.stat(tree).st_mtime + 10))
+    assert scanner.scan(str(tree)).size == 6400
+    scan.assert_called_once()
+
+
+def test_usage_operation(tree, mocker):
+    tool = FileOperationsTool(search_roots=[str(tree)])
+    mocker.patch.object(tool, "_resolve_path", return_value=str(tree))
+    result = tool.execute_operation('{"operation": "usage", "path": "d drive", "top": 1}')
+    assert result.startswith(f"**Disk usage of {tree}:** 6.2 KB in 4 files and 3 folders")
+    assert "| videos | 5.9 KB | 2 |" in result
+    assert "trip.mp4 (4.9 KB)" in result
+    assert tool._parse_natural_language("what is taking space on e drive") == {"operation": "usage", "path": "E:\\"}
+
+
+@pytest.mark.skipif(os.sep != "/", reason="POSIX paths")
+def test_usage_operation_takes_posix_paths(tree):
+    tool = FileOperationsTool(search_roots=[str(tree)])
+    result = tool.execute_operation({"operation": "usage", "path": str(tree / "videos"), "top": 1})
+    assert result.startswith(f"**Disk usage of {tree / 'videos'}:**")
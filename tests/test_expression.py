@@ -0,0 +1,95 @@
+from decimal import Decimal
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from app_launcher_agent.calculation_agent import CalculationAgent
+from app_launcher_agent.expression import (ExpressionError, compile_expression, evaluate,
+                                           evaluate_batch)
+
+
+def test_evaluates_like_python_for_plain_arithmetic():
+    assert evaluate("(25*4)+(18/3)") == 106.0
+    assert evaluate("3+5+2") == 10
+    assert evaluate("2**10 - 7 // 2 % 4") == 1021
+    assert evaluate("sqrt(16) + max(1, 2, 3) + round(pi, 2)") == pytest.approx(10.14)
+
+
+@pytest.mark.parametrize("source", [
+    "__import__('os').system('echo hi')",
+    "(1).__class__",
+    "[1, 2]",
+    "'a' * 3",
+    "x if 1 else 2",
+    "open('f')",
+    "1 << 3",
+])
+def test_rejects_anything_outside_the_whitelist(source):
+    with pytest.raises(ExpressionError):
+        evaluate(source)
+
+
+@pytest.mark.parametrize("mode,source", [
+    ("float", "9**9**9"),
+    ("float", "7**3000000"),
+    ("decimal", "7**3000000"),
+    ("decimal", "7**-3000000"),
+    ("fraction", "7**3000000"),
+    ("fraction", "(1/7)**3000000"),
+    ("fraction", "7**-3000000"),
+])
+def test_refuses_huge_exact_powers(mode, source):
+    with pytest.raises(ExpressionError, match="Exponent too large"):
+        evaluate(source, mode=mode)
+
+
+def test_exact_modes():
+    assert evaluate("0.1 + 0.2", mode="decimal") == Decimal("0.3")
+    assert evaluate("1/3 + 1/6", mode="fraction") == Fraction(1, 2)
+    with pytest.raises(ExpressionError):
+        evaluate("sin(1)", mode="fraction")
+
+
+def test_compiled_expressions_are_cached_and_take_variables():
+    compiled = compile_expression("price * qty * (1 + tax)")
+    assert compile_expression("price * qty * (1 + tax)") is compiled
+    assert compiled.variables == {"price", "qty", "tax"}
+    assert compiled(price=2, qty=3, tax=0.5) == 9.0
+    with pytest.raises(ExpressionError):
+        compiled(price=2)
+
+
+def test_numpy_mode_evaluates_over_arrays():
+    compiled = compile_expression("price * qty * (1 + tax)", mode="numpy")
+    totals = compiled(price=[1.0, 2.0, 3.0], qty=[3, 4, 5], tax=0.1)
+    np.testing.assert_allclose(totals, [3.3, 8.8, 16.5])
+
+
+def test_batch_matches_scalar_results():
+    sources = [f"{i} * {i % 7} + {i % 3}" for i in range(200)] + [f"{i}/4" for i in range(50)]
+    assert evaluate_batch(sources) == [evaluate(source) for source in sources]
+    assert all(isinstance(result, int) for result in evaluate_batch(sources[:200]))
+
+
+def test_batch_reports_errors_in_place():
+    results = evaluate_batch(["1/0", "2/1", "10**20 * 10**5", "x + 1", "9007199254740993 * 1"])
+    assert isinstance(results[0], ZeroDivisionError)
+    assert results[1] == 2.0
+    assert results[2] == 10 ** 25
+    assert isinstance(results[3], ExpressionError)
+    assert results[4] == 9007199254740993
+
+
+def test_agent_totals_several_expressions():
+    session = type("Session", (), {"show": lambda self, expression: None})()
+    agent = CalculationAgent(llm=None, session=session)
+
+    result = agent.run("calculate these 3 line totals: 2*4.5, 3*10; 1/0")
+    assert result.splitlines() == [
+        "Results:",
+        "2*4.5 = 9.0",
+        "3*10 = 30",
+        "1/0 = error: division by zero",
+        "Total: 39.0",
+    ]
@@ -0,0 +1,222 @@
+import ntpath
+import os
+import posixpath
+import struct
+import threading
+import time
+
+import pytest
+
+from app_launcher_agent.file_agent import FileOperationsTool, _within_root
+from app_launcher_agent.file_index import IN_CREATE, IN_DELETE, IN_Q_OVERFLOW, FileIndex, IndexWatcher
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "root"
+    (root / "work" / "2024").mkdir(parents=True)
+    (root / "work" / "2024" / "report.docx").write_text("q4")
+    (root / "work" / "report_draft.docx").write_text("draft")
+    (root / "photos").mkdir()
+    (root / "photos" / "beach.JPG").write_text("img")
+    (root / "notes.txt").write_text("todo")
+    return str(root)
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = FileIndex(db_path=str(tmp_path / "index.sqlite3"))
+    yield index
+    index.close()
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_build_and_search(tree, index):
+    assert index.build(tree) == 7
+
+    assert {record.name for record in index.search(query="REPORT")} == {"report.docx", "report_draft.docx"}
+    assert [r.name for r in index.search(query="report.docx")][0] == "report.docx"
+    assert [r.name for r in index.search(ext="jpg")] == ["beach.JPG"]
+    assert [r.name for r in index.search(pattern="*.TXT")] == ["notes.txt"]
+    assert [r.name for r in index.search(query="report", root=os.path.join(tree, "work", "2024"))] == ["report.docx"]
+    # LIKE wildcards in the query are matched literally
+    assert [r.name for r in index.search(query="t_d")] == ["report_draft.docx"]
+    assert index.search(query="r%t") == []
+
+
+def test_index_is_persistent_and_rebuilt_when_stale(tree, tmp_path):
+    db_path = str(tmp_path / "index.sqlite3")
+    first = FileIndex(db_path=db_path)
+    assert first.ensure_root(tree) is True
+    first.close()
+
+    second = FileIndex(db_path=db_path)
+    assert second.ensure_root(tree) is False
+    assert len(second) == 7
+    second.max_age = 0
+    assert second.ensure_root(tree) is True
+    second.close()
+
+
+def test_rescan_only_writes_changes(tree, index, mocker):
+    index.batch_size = 2
+    apply = mocker.spy(index, "_apply")
+    assert index.build(tree) == 7
+    assert apply.call_count > 1  # committed in batches
+
+    insert = mocker.spy(index, "_insert")
+    assert index.build(tree) == 7
+    insert.assert_not_called()
+
+    with open(os.path.join(tree, "notes.txt"), "w") as f:
+        f.write("todo and more")
+    os.remove(os.path.join(tree, "work", "2024", "report.docx"))
+    os.rmdir(os.path.join(tree, "work", "2024"))
+    open(os.path.join(tree, "photos", "lake.png"), "w").close()
+    index.build(tree)
+
+    # Only the changed file, the new one and the folders whose mtime moved are rewritten
+    assert sorted(row[0] for call in insert.call_args_list for row in call.args[0]) == [
+        os.path.join(tree, name) for name in ("notes.txt", "photos", os.path.join("photos", "lake.png"), "work")]
+    assert [r.size for r in index.search(query="notes.txt")] == [13]
+    assert index.search(query="2024") == [] and [r.name for r in index.search(query="report")] == [
+        "report_draft.docx"]
+    assert len(index) == 6
+
+
+def test_watcher_falls_back_when_tree_needs_too_many_watches(tree, index):
+    watcher = IndexWatcher(index, tree, rescan_interval=60, max_watches=2).start()
+    try:
+        assert watcher.ready.wait(2)
+        assert watcher.using_inotify is False
+        assert len(watcher._watches) == 0
+    finally:
+        watcher.stop()
+
+
+def test_update_and_remove_paths(tree, index):
+    index.build(tree)
+    new_dir = os.path.join(tree, "music")
+    os.makedirs(os.path.join(new_dir, "albums"))
+    open(os.path.join(new_dir, "albums", "song.mp3"), "w").close()
+
+    index.update_path(new_dir)
+    assert [r.name for r in index.search(ext="mp3")] == ["song.mp3"]
+
+    index.remove_path(new_dir)
+    assert index.search(ext="mp3") == []
+    assert index.search(query="music") == []
+
+
+def test_watcher_applies_filesystem_changes(tree, index):
+    index.build(tree)
+    watcher = IndexWatcher(index, tree).start()
+    try:
+        assert watcher.ready.wait(2)
+        if not watcher.using_inotify:
+            pytest.skip("inotify not available")
+        path = os.path.join(tree, "work", "budget.xlsx")
+        with open(path, "w") as f:
+            f.write("numbers")
+        assert wait_for(lambda: index.search(query="budget"))
+
+        os.makedirs(os.path.join(tree, "new", "deeper"))
+        assert wait_for(lambda: index.search(query="deeper"))
+        open(os.path.join(tree, "new", "deeper", "late.txt"), "w").close()
+        assert wait_for(lambda: index.search(query="late.txt"))
+
+        os.remove(path)
+        assert wait_for(lambda: not index.search(query="budget"))
+    finally:
+        watcher.stop()
+
+
+def _event(wd, mask, name=b""):
+    padded = name + b"\0" * (16 - len(name)) if name else b""
+    return struct.pack("iIII", wd, mask, 0, len(padded)) + padded
+
+
+def test_handle_events_and_overflow(tree, index, mocker):
+    index.build(tree)
+    watcher = IndexWatcher(index, tree)
+    watcher._watches = {1: tree}
+    open(os.path.join(tree, "a.txt"), "w").close()
+    update = mocker.spy(index, "update_path")
+    remove = mocker.spy(index, "remove_path")
+
+    assert watcher.handle_events(_event(1, IN_CREATE, b"a.txt") + _event(1, IN_DELETE, b"notes.txt"))
+    update.assert_called_once_with(os.path.join(tree, "a.txt"))
+    remove.assert_called_once_with(os.path.join(tree, "notes.txt"))
+    assert watcher.handle_events(_event(-1, IN_Q_OVERFLOW)) is False
+
+
+def test_watcher_falls_back_to_rescans_without_inotify(tree, index):
+    index.build(tree)
+    watcher = IndexWatcher(index, tree, rescan_interval=0.05)
+    watcher._libc = None
+    watcher.start()
+    try:
+        assert watcher.ready.wait(2)
+        assert watcher.using_inotify is False
+        open(os.path.join(tree, "polled.txt"), "w").close()
+        assert wait_for(lambda: index.search(query="polled"))
+    finally:
+        watcher.stop()
+
+
+def test_search_operation(tree, index, mocker):
+    tool = FileOperationsTool(index=index, search_roots=[tree])
+    mocker.patch("app_launcher_agent.file_agent.IndexWatcher.start", autospec=True, side_effect=lambda self: self)
+
+    result = tool.execute_operation('{"operation": "search", "query": "report.docx"}')
+    assert result.startswith("**Found 1 match(es) for 'report.docx':**")
+    assert os.path.join(tree, "work", "2024", "report.docx") in result
+
+    walk = mocker.patch("app_launcher_agent.file_index._walk")
+    assert "notes.txt" in tool.execute_operation({"operation": "search", "ext": "txt"})
+    walk.assert_not_called()
+    assert "No files matching" in tool.execute_operation({"operation": "search", "query": "missing"})
+    assert tool._parse_natural_language("where is my report.docx?") == {"operation": "search", "query": "report.docx"}
+
+
+@pytest.mark.skipif(os.sep != "/", reason="POSIX paths")
+def test_search_operation_takes_posix_paths(tree, index, mocker):
+    tool = FileOperationsTool(index=index, search_roots=[tree])
+    mocker.patch("app_launcher_agent.file_agent.IndexWatcher.start", autospec=True, side_effect=lambda self: self)
+
+    result = tool.execute_operation({"operation": "search", "ext": "docx", "path": os.path.join(tree, "work") + "/"})
+    assert os.path.join(tree, "work", "2024", "report.docx") in result
+
+
+def test_search_answers_while_first_build_runs(tree, index, mocker):
+    release = threading.Event()
+    build = index.build
+    mocker.patch.object(index, "build", side_effect=lambda root: release.wait(5) and build(root))
+    mocker.patch("app_launcher_agent.file_agent.IndexWatcher.start", autospec=True, side_effect=lambda self: self)
+    tool = FileOperationsTool(index=index, search_roots=[tree], index_wait=0.05)
+
+    result = tool.execute_operation({"operation": "search", "query": "notes"})
+    assert result.startswith("No files matching 'notes' found")
+    assert f"Still indexing {tree}" in result
+
+    release.set()
+    assert index.wait(tree, 5)
+    assert tool.execute_operation({"operation": "search", "query": "notes"}).startswith("**Found 1 match(es)")
+
+
+def test_within_root_handles_other_drives():
+    assert _within_root("D:\\work\\2024", "D:\\", ntpath)
+    assert _within_root("d:\\Work", "D:\\", ntpath)
+    # On another drive commonpath() would raise "Paths don't have the same drive"
+    assert not _within_root("E:\\", "D:\\", ntpath)
+    assert not _within_root("E:\\docs", "D:\\", ntpath)
+    assert _within_root("/data/x", "/data", posixpath)
+    assert not _within_root("/database", "/data", posixpath)
@@ -0,0 +1,70 @@
+import os
+
+import pytest
+
+from app_launcher_agent.file_agent import FileOperationsTool
+
+
+@pytest.fixture
+def directory(tmp_path):
+    for i in range(25):
+        (tmp_path / f"note{i:02d}.txt").write_text("x" * i)
+    (tmp_path / "report.pdf").write_text("x" * 1000)
+    (tmp_path / "archive").mkdir()
+    return str(tmp_path)
+
+
+def entry_lines(listing):
+    return [line for line in listing.splitlines() if line.startswith("- ")]
+
+
+def test_listing_is_paged(directory):
+    tool = FileOperationsTool()
+
+    first = tool._list_directory(directory, limit=10)
+    assert len(entry_lines(first)) == 10
+    assert "(showing 1-10)" in first
+    assert "use offset 10" in first
+
+    last = tool._list_directory(directory, limit=10, page=3, count_total=True)
+    assert len(entry_lines(last)) == 7
+    assert "(showing 21-27 of 27)" in last
+    assert "More entries" not in last
+
+
+def test_unsorted_listing_does_not_stat_entries(directory, mocker):
+    stat = mocker.patch("os.DirEntry.stat", side_effect=AssertionError("stat called"))
+    listing = FileOperationsTool()._list_directory(directory, limit=100)
+    assert len(entry_lines(listing)) == 27
+    assert "- 📁 archive" in listing
+    stat.assert_not_called()
+
+
+def test_sorting_and_filtering(directory):
+    tool = FileOperationsTool()
+
+    by_name = entry_lines(tool._list_directory(directory, limit=3, sort="name", pattern="NOTE*.txt"))
+    assert by_name == ["- 📄 note00.txt", "- 📄 note01.txt", "- 📄 note02.txt"]
+
+    largest = entry_lines(tool._list_directory(directory, limit=2, sort="size", reverse=True))
+    assert largest == ["- 📄 report.pdf (1000 B)", "- 📄 note24.txt (24 B)"]
+
+    assert "Unsupported sort key" in tool._list_directory(directory, sort="colour")
+    assert "_No matching entries_" in tool._list_directory(directory, pattern="*.mp3")
+
+
+def test_execute_operation_passes_listing_options(directory, mocker):
+    tool = FileOperationsTool()
+    mocker.patch.object(tool, "_resolve_path", return_value=directory)
+    listing = tool.execute_operation(
+        '{"operation": "list", "path": "d drive", "sort": "name", "limit": 5, "offset": 5}')
+    assert entry_lines(listing)[0] == "- 📄 note04.txt"
+    assert "(showing 6-10 of 27)" in listing
+
+
+def test_natural_language_list_options():
+    parsed = FileOperationsTool()._parse_natural_language("list the largest *.log files in d drive, page 2")
+    assert parsed["sort"] == "size"
+    assert parsed["reverse"] is True
+    assert parsed["pattern"] == "*.log"
+    assert parsed["page"] == 2
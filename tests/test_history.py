@@ -0,0 +1,114 @@
+from unittest.mock import MagicMock
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from app_launcher_agent.history import HistoryWindow, count_tokens
+
+
+def conversation(turns, reply="done"):
+    messages = []
+    for i in range(turns):
+        messages.append(HumanMessage(content=f"request number {i}"))
+        messages.append(AIMessage(content=f"{reply} {i}"))
+    return messages
+
+
+def window_tokens(messages):
+    return sum(count_tokens(m.content) for m in messages)
+
+
+def test_short_history_is_passed_through():
+    history = conversation(2)
+    assert HistoryWindow(keep_turns=4).window(history) == history
+
+
+def test_old_turns_are_folded_into_summary():
+    window = HistoryWindow(keep_turns=2, fold_turns=1)
+    history = conversation(5)
+
+    result = window.window(history)
+    assert isinstance(result[0], SystemMessage)
+    assert "request number 0" in result[0].content
+    assert result[1:] == history[-4:]
+    assert window.summarized_upto == 6
+
+
+def test_summary_is_updated_incrementally_in_batches():
+    summarize = MagicMock(side_effect=lambda summary, messages: f"{summary}+{len(messages)}")
+    window = HistoryWindow(keep_turns=2, fold_turns=2, summarize=summarize)
+    history = conversation(3)
+
+    window.window(history)
+    summarize.assert_not_called()  # one pending turn: below the batch size
+
+    history += conversation(1)
+    window.window(history)
+    assert summarize.call_count == 1
+    assert summarize.call_args.args[1] == history[:4]
+
+    # Asking again without new turns reuses the cached summary
+    window.window(history)
+    assert summarize.call_count == 1
+    assert window.summary == "+4"
+
+
+def test_prompt_size_stays_bounded_for_long_sessions():
+    window = HistoryWindow(max_tokens=400, keep_turns=4, max_message_tokens=100, summary_max_tokens=80)
+    history = []
+    for i in range(300):
+        history.append(HumanMessage(content=f"list the files in folder {i}"))
+        history.append(AIMessage(content="\n".join(f"- 📄 file_{i}_{j}.txt" for j in range(200))))
+        assert window_tokens(window.window(history)) <= 400
+
+
+def test_large_outputs_are_truncated_with_a_reference():
+    history = [HumanMessage(content="list d drive"), AIMessage(content="- 📄 item\n" * 2000)]
+    result = HistoryWindow(max_message_tokens=50).window(history)
+    assert result[0] == history[0]
+    assert count_tokens(result[1].content) < 100
+    assert result[1].content.endswith("[... truncated; the full text is message #2 of this chat]")
+    assert isinstance(result[1], AIMessage)
+
+
+def test_llm_summary_falls_back_when_the_model_fails():
+    llm = MagicMock()
+    llm.invoke.side_effect = RuntimeError("offline")
+    window = HistoryWindow(llm=llm, keep_turns=1, fold_turns=1)
+    result = window.window(conversation(3))
+    assert llm.invoke.called
+    assert "User: request number 0" in result[0].content
+
+
+def test_cleared_history_resets_the_summary():
+    window = HistoryWindow(keep_turns=1, fold_turns=1)
+    window.window(conversation(4))
+    assert window.summary
+
+    fresh = conversation(1)
+    assert window.window(fresh) == fresh
+    assert window.summary == ""
+
+
+def test_summary_survives_trimming_and_loading_older_messages():
+    summarize = MagicMock(side_effect=lambda summary, messages: f"{summary}+{len(messages)}")
+    window = HistoryWindow(keep_turns=2, fold_turns=1, summarize=summarize)
+    history = conversation(4)
+    window.window(history)
+    assert window.summary == "+4"
+
+    # Dropping more than was summarized folds the rest in first
+    history = window.trim(history, keep=2)
+    assert window.summary == "+4+2" and window.summarized_upto == 0
+    assert window.window(history) == [SystemMessage(content="Summary of the earlier conversation: +4+2")] + history
+
+    older = conversation(1)
+    history = window.prepend(older, history)
+    assert history[:2] == older
+    assert window.window(history)[1:] == history[2:]
+    assert summarize.call_count == 2
+
+    # Message numbers still count from the start of the session
+    history = [HumanMessage(content="list d drive"), AIMessage(content="- 📄 item\n" * 2000)] * 2
+    window = HistoryWindow(max_message_tokens=50)
+    history = window.trim(history, keep=2)
+    assert window.window(history)[-1].content.endswith("message #4 of this chat]")
@@ -0,0 +1,50 @@
+import pytest
+from app_launcher_agent.launch_resolver import LaunchResolver
+
+@pytest.mark.parametrize("text,expected", [
+    ("open notepad", "notepad"),
+    ("Launch Chrome", "chrome"),
+    ("please open google chrome", "chrome"),
+    ("start the calculator app", "calculator"),
+    ("open winword.exe", "word"),
+    ("open command prompt", "cmd"),
+])
+def test_resolves_unambiguous_launches(text, expected):
+    assert LaunchResolver(system="Windows").resolve(text) == expected
+
+@pytest.mark.parametrize("text", [
+    "open chrome and excel",
+    "open notepad and write an essay",
+    "open the file report.docx",
+    "launch spotify",
+    "what is notepad",
+])
+def test_ambiguous_inputs_fall_back(text):
+    assert LaunchResolver(system="Windows").resolve(text) is None
+
+def test_bypass_rate():
+    resolver = LaunchResolver(system="Windows")
+    resolver.resolve("open paint")
+    resolver.resolve("open chrome and excel")
+    assert resolver.stats == {"bypassed": 1, "fallback": 1}
+    assert resolver.bypass_rate == 0.5
+
+@pytest.mark.parametrize("text,expected", [
+    ("open notepad", ("launch", "notepad")),
+    ("close chrome", ("close", "chrome")),
+    ("please quit microsoft excel", ("close", "excel")),
+    ("is notepad running?", ("status", "notepad")),
+    ("is the calculator app still open", ("status", "calculator")),
+])
+def test_resolves_actions(text, expected):
+    assert LaunchResolver(system="Windows").resolve_action(text) == expected
+
+@pytest.mark.parametrize("text", ["close the door", "is it running", "close all windows"])
+def test_ambiguous_actions_fall_back(text):
+    assert LaunchResolver(system="Windows").resolve_action(text) is None
+
+def test_windows_table_only_applies_on_windows():
+    resolver = LaunchResolver(system="Linux")
+    assert resolver.resolve("open notepad") is None
+    assert resolver.resolve_action("close chrome") is None
+    assert LaunchResolver(apps=["gedit"], system="Linux").resolve("open gedit") == "gedit"
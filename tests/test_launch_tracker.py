@@ -0,0 +1,124 @@
+import sys
+import time
+
+import psutil
+import pytest
+
+from app_launcher_agent.launch_tracker import LaunchTracker
+from app_launcher_agent.process_index import ProcessIndex
+from app_launcher_agent.tools import AppLauncherTool
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="spawns POSIX commands")
+
+SLEEPER = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+@pytest.fixture
+def tracker():
+    tracker = LaunchTracker()
+    yield tracker
+    for record in tracker.processes():
+        tracker.close(record.app, timeout=1)
+
+
+def test_spawn_registers_and_closes(tracker):
+    record = tracker.spawn("Sleeper.exe", SLEEPER)
+
+    assert record.handle is None  # posix_spawn, no Popen
+    assert tracker.running("sleeper") == record
+    assert tracker.close("sleeper", timeout=2) == record
+    assert tracker.running("sleeper") is None
+    assert tracker.close("sleeper") is None
+
+
+def test_exited_processes_are_reaped(tracker):
+    tracker.spawn("quick", [sys.executable, "-c", "pass"])
+    deadline = time.monotonic() + 5
+    while tracker.running("quick") is not None and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert tracker.running("quick") is None
+    assert tracker.processes() == []
+
+
+def test_shell_launches_are_timed_but_not_tracked(tracker):
+    tracker.spawn("echo", "true", shell=True)
+    tracker.spawn("echo", "true", shell=True)
+
+    assert tracker.running("echo") is None
+    stats = tracker.spawn_stats()["echo"]
+    assert stats.count == 2
+    assert 0 < stats.mean <= stats.max
+
+
+def test_open_a_launches_are_not_tracked(tracker, mocker):
+    # The PID of `open` is gone as soon as LaunchServices has the app
+    mocker.patch("app_launcher_agent.launch_tracker.spawn", return_value=(4242, None))
+    tracker.spawn("TextEdit", ["open", "-a", "TextEdit"])
+    tracker.spawn("TextEdit", ["/usr/bin/open", "-a", "/Applications/TextEdit.app"])
+
+    assert tracker.running("textedit") is None
+    assert tracker.spawn_stats()["textedit"].count == 2
+
+
+def test_tool_answers_from_the_tracker_without_scanning(tracker, mocker):
+    tool = AppLauncherTool(process_index=ProcessIndex(), tracker=tracker)
+    mocker.patch.object(tool, "_launch_command", return_value=(SLEEPER, False, "Successfully launched sleeper"))
+    scan = mocker.patch("psutil.process_iter", return_value=[])
+
+    assert tool.launch_app("sleeper") == "Successfully launched sleeper"
+    scan.reset_mock()
+    assert tool.launch_app("sleeper") == "sleeper is already running."
+    assert tool.app_status("sleeper").startswith("sleeper is running (PID ")
+    scan.assert_not_called()
+
+    assert tool.close_app("sleeper") == "Closed sleeper."
+    assert tool.app_status("sleeper") == "sleeper is not running."
+
+
+def test_close_untracked_app_uses_the_process_index(tracker, mocker):
+    index = mocker.Mock()
+    index.pids.return_value = set()
+    tool = AppLauncherTool(process_index=index, tracker=tracker)
+
+    assert tool.close_app("gedit") == "gedit is not running."
+    index.pids.assert_called_once_with("gedit")
+
+
+def test_close_tracked_app_leaves_other_matching_processes_alone(tracker, mocker):
+    index = mocker.Mock()
+    tool = AppLauncherTool(process_index=index, tracker=tracker)
+    tracker.spawn("sleeper", SLEEPER)
+    processes = mocker.patch("psutil.Process")
+
+    assert tool.close_app("sleeper") == "Closed sleeper."
+    index.pids.assert_not_called()
+    processes.assert_not_called()
+
+
+def test_close_reports_each_process_it_could_not_stop(tracker, mocker):
+    index = mocker.Mock()
+    index.pids.return_value = {101, 102, 103}
+    tool = AppLauncherTool(process_index=index, tracker=tracker)
+
+    def process(pid):
+        proc = mocker.Mock(pid=pid)
+        if pid == 101:
+            proc.terminate.side_effect = psutil.AccessDenied(pid)
+        elif pid == 102:
+            proc.terminate.side_effect = psutil.NoSuchProcess(pid)
+        return proc
+
+    mocker.patch("psutil.Process", side_effect=process)
+    wait = mocker.patch("psutil.wait_procs", side_effect=lambda procs, timeout: (procs, []))
+
+    assert tool.close_app("gedit") == "Closed gedit (PID 103); access denied for PID 101."
+    assert [proc.pid for proc in wait.call_args.args[0]] == [103]
+
+
+def test_close_reports_when_every_process_is_protected(tracker, mocker):
+    index = mocker.Mock()
+    index.pids.return_value = {7}
+    tool = AppLauncherTool(process_index=index, tracker=tracker)
+    mocker.patch("psutil.Process").return_value.terminate.side_effect = psutil.AccessDenied(7)
+
+    assert tool.close_app("gedit") == "Could not close gedit: access denied for PID 7."
@@ -0,0 +1,86 @@
+import os
+import time
+from unittest.mock import MagicMock
+from app_launcher_agent.llm_cache import LLMResponseCache, bypassing_cache, cache_bypassed
+from app_launcher_agent.tools import CodeGenerationTool
+
+def _llm(content="Generated text", model="gpt-3.5-turbo", temperature=0.1):
+    llm = MagicMock()
+    llm._identifying_params = {"model_name": model, "temperature": temperature}
+    llm.invoke.return_value = MagicMock(content=content)
+    return llm
+
+def test_memory_and_disk_hits(tmp_path):
+    llm = _llm()
+    cache = LLMResponseCache(cache_dir=str(tmp_path))
+    assert cache.invoke(llm, "Write about  AI") == "Generated text"
+    assert cache.invoke(llm, " Write about\nAI ") == "Generated text"  # normalized whitespace
+    assert llm.invoke.call_count == 1
+
+    fresh = LLMResponseCache(cache_dir=str(tmp_path))
+    assert fresh.invoke(llm, "Write about AI") == "Generated text"
+    assert llm.invoke.call_count == 1
+    assert cache.stats["memory_hits"] == 1
+    assert fresh.stats["disk_hits"] == 1
+
+def test_model_parameters_are_part_of_the_key(tmp_path):
+    cache = LLMResponseCache(cache_dir=str(tmp_path))
+    cache.invoke(_llm("cold"), "Write about AI")
+    hot = _llm("hot", temperature=0.9)
+    assert cache.invoke(hot, "Write about AI") == "hot"
+
+def test_prompts_differing_in_case_are_cached_separately(tmp_path):
+    cache = LLMResponseCache(cache_dir=str(tmp_path))
+    assert cache.invoke(_llm("upper"), "Print the string 'OK'") == "upper"
+    assert cache.invoke(_llm("lower"), "print the string 'ok'") == "lower"
+
+def test_bypass_and_unidentifiable_models(tmp_path):
+    cache = LLMResponseCache(cache_dir=str(tmp_path))
+    llm = _llm()
+    cache.invoke(llm, "prompt")
+    cache.invoke(llm, "prompt", use_cache=False)
+    assert llm.invoke.call_count == 2
+
+    anonymous = MagicMock()
+    anonymous.invoke.return_value = MagicMock(content="x")
+    cache.invoke(anonymous, "prompt")
+    cache.invoke(anonymous, "prompt")
+    assert anonymous.invoke.call_count == 2
+    assert cache.stats["bypassed"] == 3
+
+def test_age_and_size_eviction(tmp_path):
+    cache = LLMResponseCache(cache_dir=str(tmp_path), max_memory_entries=1, max_disk_entries=2, max_age=60)
+    for i in range(4):
+        cache.set(f"key{i}", f"value{i}")
+        os.utime(tmp_path / f"key{i}.json", (time.time() - 10 + i,) * 2)
+    cache.trim()
+    assert sorted(os.listdir(tmp_path)) == ["key2.json", "key3.json"]
+
+    cache.max_age = 0
+    assert cache.get("key2") is None
+    assert cache.get("key3") is None
+
+def test_bypass_flag_is_scoped_to_the_block(tmp_path):
+    llm = _llm("Generated text")
+    cache = LLMResponseCache(cache_dir=str(tmp_path))
+    cache.invoke(llm, "prompt")
+    with bypassing_cache():
+        assert cache_bypassed()
+        cache.invoke(llm, "prompt")
+        with bypassing_cache(False):
+            cache.invoke(llm, "prompt")
+    assert not cache_bypassed()
+    cache.invoke(llm, "prompt")
+    assert llm.invoke.call_count == 2
+    assert cache.stats["bypassed"] == 1
+
+def test_code_tool_uses_cache(tmp_path, mocker):
+    mocker.patch('subprocess.Popen')
+    llm = _llm("```python\nprint(1)\n```")
+    tool = CodeGenerationTool(llm, LLMResponseCache(cache_dir=str(tmp_path)), streaming=False)
+    tool.generate_and_write_code("python; print one")
+    tool.generate_and_write_code("python; print one")
+    assert llm.invoke.call_count == 1
+    with bypassing_cache():
+        tool.generate_and_write_code("python; print one")
+    assert llm.invoke.call_count == 2
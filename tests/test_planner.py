@@ -0,0 +1,69 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from app_launcher_agent.planner import CommandPlanner, PlanExecutor, PlanStep, run_plan, split_commands
+
+def test_split_inherits_verb():
+    assert split_commands("Open Chrome and Excel") == [("Open Chrome", False), ("Open Excel", False)]
+    assert split_commands("open notepad, then open paint") == [("open notepad", False), ("open paint", True)]
+    assert split_commands("turn off bluetooth and wifi") == [("turn off bluetooth", False), ("turn off wifi", False)]
+
+def test_plan_splits_only_command_style_input():
+    planner = CommandPlanner()
+    steps = planner.plan("Set brightness to 70% and mute volume")
+    assert [(s.text, s.agent) for s in steps] == [("Set brightness to 70%", "system"), ("mute volume", "system")]
+    assert all(s.depends_on == [] for s in steps)
+
+    essay = planner.plan("write an essay about cats and dogs")
+    assert len(essay) == 1 and essay[0].agent == "writer"
+    # Math splits off only with its own verb; "and" inside an expression stays put
+    assert [s.agent for s in planner.plan("open notepad and calculate 5*5")] == ["app", "calc"]
+    assert len(planner.plan("calculate 5 and 6")) == 1
+
+@pytest.mark.parametrize("text", [
+    "create folder salt and pepper in d drive",
+    "find rock and roll.mp3",
+    "open Tom and Jerry.mp4",
+    r"open C:\\music\\rock and roll",
+])
+def test_names_containing_and_stay_whole(text):
+    steps = CommandPlanner().plan(text)
+    assert [s.text for s in steps] == [text]
+
+def test_then_and_file_steps_are_ordered():
+    planner = CommandPlanner()
+    assert planner.plan("open notepad then open paint")[1].depends_on == [0]
+    assert planner.plan("create folder x in d drive and list d drive")[1].depends_on == [0]
+
+def test_independent_steps_run_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+
+    def run_step(step):
+        barrier.wait()  # deadlocks unless both steps run at once
+        return f"done {step.text}"
+
+    steps = [PlanStep(0, "open chrome", "app"), PlanStep(1, "open excel", "app")]
+    PlanExecutor(max_workers=2).execute(steps, run_step)
+    assert [s.result for s in steps] == ["done open chrome", "done open excel"]
+
+def test_dependencies_are_respected():
+    order = []
+
+    def run_step(step):
+        time.sleep(0.05 if step.index == 0 else 0)
+        order.append(step.index)
+        return "ok"
+
+    steps = [PlanStep(0, "a", "app"), PlanStep(1, "b", "app", depends_on=[0])]
+    PlanExecutor().execute(steps, run_step)
+    assert order == [0, 1]
+
+def test_run_plan_merges_replies():
+    registry = MagicMock()
+    registry.get.return_value.run.side_effect = lambda text, history: f"Launched {text.split()[-1]}"
+    steps = CommandPlanner().plan("Open Chrome and Excel")
+    reply = run_plan(steps, registry)
+    assert reply == "- **Open Chrome**: Launched Chrome\n- **Open Excel**: Launched Excel"
@@ -0,0 +1,60 @@
+from unittest.mock import MagicMock
+from app_launcher_agent.process_index import ProcessIndex, normalize_process_name
+
+def _proc(pid, name, created=1.0):
+    proc = MagicMock()
+    proc.pid = pid
+    proc.name.return_value = name
+    proc.create_time.return_value = created
+    return proc
+
+def test_normalize_process_name():
+    assert normalize_process_name("Chrome.EXE") == "chrome"
+    assert normalize_process_name("C:\\Windows\\notepad.exe") == "notepad"
+    assert normalize_process_name("Safari.app") == "safari"
+
+def test_exact_match_has_no_substring_false_positives(mocker):
+    mocker.patch('psutil.process_iter', return_value=[_proc(1, "notepad++.exe")])
+    index = ProcessIndex()
+    assert not index.is_running("notepad")
+    assert index.is_running("notepad++")
+
+def test_prefix_match(mocker):
+    mocker.patch('psutil.process_iter', return_value=[_proc(1, "chrome_crashpad"), _proc(2, "code")])
+    index = ProcessIndex()
+    assert index.pids("chrome", match="prefix") == {1}
+    assert not index.is_running("chrome")
+
+def test_incremental_refresh_only_reads_new_pids(mocker):
+    first, second = _proc(1, "bash"), _proc(2, "python3")
+    process_iter = mocker.patch('psutil.process_iter', return_value=[first])
+    index = ProcessIndex(ttl=60)
+    assert index.is_running("bash")
+
+    process_iter.return_value = [first, second]
+    assert not index.is_running("python3")  # still inside TTL
+    index.invalidate()
+    assert index.is_running("python3")
+    assert first.name.call_count == 1
+
+    process_iter.return_value = [second]
+    index.invalidate()
+    assert not index.is_running("bash")
+
+def test_reused_pid_is_read_again(mocker):
+    process_iter = mocker.patch('psutil.process_iter', return_value=[_proc(7, "firefox", created=100.0)])
+    index = ProcessIndex()
+    assert index.is_running("firefox")
+
+    process_iter.return_value = [_proc(7, "bash", created=200.0)]
+    index.invalidate()
+    assert not index.is_running("firefox")
+    assert index.pids("bash") == {7}
+
+def test_aliases_map_app_names_to_executables(mocker):
+    mocker.patch('psutil.process_iter', return_value=[_proc(1, "WINWORD.EXE"), _proc(2, "POWERPNT.EXE")])
+    index = ProcessIndex()
+    assert index.pids("word") == {1}
+    assert index.pids("Word") == {1}
+    assert index.pids("powerpoint", match="prefix") == {2}
+    assert not index.is_running("excel")
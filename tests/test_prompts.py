@@ -0,0 +1,41 @@
+import os
+from langchain_core.prompts import PromptTemplate
+from app_launcher_agent.prompts import PromptStore, REACT_CHAT_PROMPT
+
+def test_offline_store_uses_bundled_template(tmp_path, mocker):
+    pull = mocker.patch('langchain.hub.pull')
+    store = PromptStore(cache_dir=str(tmp_path), offline=True)
+
+    prompt = store.get(REACT_CHAT_PROMPT)
+    assert {"tools", "tool_names", "input", "chat_history", "agent_scratchpad"} <= set(prompt.input_variables)
+    pull.assert_not_called()
+
+def test_pulled_prompt_is_memoized_and_cached_on_disk(tmp_path, mocker):
+    pull = mocker.patch('langchain.hub.pull', return_value=PromptTemplate.from_template("Hi {input}"))
+    store = PromptStore(cache_dir=str(tmp_path))
+
+    assert store.get(REACT_CHAT_PROMPT).template == "Hi {input}"
+    assert store.get(REACT_CHAT_PROMPT) is store.get(REACT_CHAT_PROMPT)
+    assert pull.call_count == 1
+    assert len(os.listdir(tmp_path / "blobs")) == 1
+
+    # A fresh process reads the blob back without touching the network
+    pull.side_effect = ConnectionError("offline")
+    assert PromptStore(cache_dir=str(tmp_path)).get(REACT_CHAT_PROMPT).template == "Hi {input}"
+    assert pull.call_count == 1
+
+def test_changed_pin_does_not_serve_stale_blob(tmp_path, mocker):
+    mocker.patch('langchain.hub.pull', return_value=PromptTemplate.from_template("v1 {input}"))
+    PromptStore(cache_dir=str(tmp_path), pins={REACT_CHAT_PROMPT: "hwchase17/react-chat:aaa"}).get()
+
+    mocker.patch('langchain.hub.pull', return_value=PromptTemplate.from_template("v2 {input}"))
+    store = PromptStore(cache_dir=str(tmp_path), pins={REACT_CHAT_PROMPT: "hwchase17/react-chat:bbb"})
+    assert store.get().template == "v2 {input}"
+
+def test_corrupted_blob_is_ignored(tmp_path, mocker):
+    mocker.patch('langchain.hub.pull', return_value=PromptTemplate.from_template("Hi {input}"))
+    PromptStore(cache_dir=str(tmp_path)).get()
+    blob = next((tmp_path / "blobs").iterdir())
+    blob.write_text('{"template": "tampered", "template_format": "f-string"}')
+
+    assert PromptStore(cache_dir=str(tmp_path), offline=True).get().template != "tampered"
@@ -0,0 +1,34 @@
+import pytest
+from unittest.mock import MagicMock
+from app_launcher_agent.registry import AgentRegistry
+
+def _factories():
+    return {"app": MagicMock(name="app"), "calc": MagicMock(name="calc")}
+
+def test_agents_are_built_on_first_use():
+    factories = _factories()
+    llm = MagicMock()
+    registry = AgentRegistry(llm, factories)
+    assert registry.build_times == {}
+
+    agent = registry.get("app")
+    assert agent is factories["app"].return_value
+    assert registry.get("app") is agent
+    factories["app"].assert_called_once_with(llm)
+    factories["calc"].assert_not_called()
+    assert set(registry.build_times) == {"app"}
+
+def test_warm_builds_remaining_agents_in_background():
+    factories = _factories()
+    registry = AgentRegistry(MagicMock(), factories)
+    registry.get("app")
+
+    registry.warm().join(timeout=5)
+    assert registry.is_built("calc")
+    factories["app"].assert_called_once()
+    assert set(registry.build_times) == {"app", "calc"}
+
+def test_unknown_agent_raises():
+    registry = AgentRegistry(MagicMock(), _factories())
+    with pytest.raises(KeyError):
+        registry.get("missing")
@@ -0,0 +1,28 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from app_launcher_agent.utils import RenderedChat, format_chat_history
+
+
+def test_sync_formats_only_new_messages(mocker):
+    history = [HumanMessage(content="open notepad"), AIMessage(content="Launched notepad")]
+    store = RenderedChat()
+    assert store.sync(history) == format_chat_history(history)
+
+    format_message = mocker.patch("app_launcher_agent.utils.format_message",
+                                  side_effect=lambda m: {"role": "x", "content": m.content})
+    history += [HumanMessage(content="mute volume"), AIMessage(content="Muted")]
+    messages = store.sync(history)
+    assert format_message.call_count == 2
+    assert [m["content"] for m in messages] == ["open notepad", "Launched notepad", "mute volume", "Muted"]
+
+    store.sync(history)
+    assert format_message.call_count == 2
+
+
+def test_sync_skips_other_message_types_and_handles_a_new_history():
+    store = RenderedChat()
+    store.sync([HumanMessage(content="hi"), SystemMessage(content="internal")])
+    assert store.messages == [{"role": "user", "content": "hi"}]
+
+    assert store.sync([AIMessage(content="fresh")]) == [{"role": "assistant", "content": "fresh"}]
+    assert store.sync([]) == []
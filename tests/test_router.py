@@ -0,0 +1,39 @@
+import json
+import os
+
+from app_launcher_agent.router import INTENT_EXAMPLES, IntentRouter
+
+def test_batch_classify_routes_readme_examples():
+    router = IntentRouter()
+    results = router.classify([
+        "Open Chrome",
+        "Write 500-word essay about AI ethics in Word",
+        "Create Python Fibonacci sequence code in Notepad",
+        "Create 'Project' folder in D drive",
+        "Calculate (25*4)+(18/3)",
+        "Set brightness to 70%",
+    ])
+    assert [r.agent for r in results] == ["app", "writer", "code", "file", "calc", "system"]
+    assert all(0.0 < r.score <= 1.0 for r in results)
+
+def test_punctuation_does_not_force_calculator():
+    router = IntentRouter()
+    assert router.route("open wi-fi settings").agent != "calc"
+    assert router.route("list files in d drive/music").agent == "file"
+
+def test_low_confidence_falls_back():
+    router = IntentRouter(threshold=0.99, fallback_agent="app")
+    result = router.route("write an essay about dogs")
+    assert result.fallback
+    assert result.agent == "app"
+
+def test_empty_batch():
+    assert IntentRouter().classify([]) == []
+
+def test_routing_corpus_is_held_out_from_exemplars():
+    corpus = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks",
+                          "routing_corpus.json")
+    with open(corpus, encoding="utf-8") as f:
+        phrases = {" ".join(text.lower().split()) for text, _ in json.load(f)}
+    exemplars = {" ".join(text.lower().split()) for texts in INTENT_EXAMPLES.values() for text in texts}
+    assert phrases.isdisjoint(exemplars)
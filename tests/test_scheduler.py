@@ -0,0 +1,200 @@
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from app_launcher_agent.calculator_session import CalculatorSession
+from app_launcher_agent.planner import PlanExecutor, PlanStep, run_plan
+from app_launcher_agent.scheduler import (AUDIO, FOCUS, ResourceScheduler, get_scheduler, overlaps,
+                                          path_resource, requires)
+from app_launcher_agent.tools import AppLauncherTool
+
+
+def run_in_thread(function):
+    thread = threading.Thread(target=function)
+    thread.start()
+    return thread
+
+
+def test_non_conflicting_calls_run_in_parallel():
+    scheduler = ResourceScheduler()
+    barrier = threading.Barrier(3, timeout=2)
+
+    def use(resource):
+        with scheduler.acquire([resource]):
+            barrier.wait()  # Breaks (and fails) unless all three hold their resource at once
+
+    threads = [run_in_thread(lambda r=r: use(r)) for r in (FOCUS, AUDIO, path_resource("/tmp/a"))]
+    for thread in threads:
+        thread.join()
+    assert not barrier.broken
+
+
+def test_conflicting_calls_queue_in_arrival_order():
+    scheduler = ResourceScheduler()
+    order = []
+    release = threading.Event()
+
+    def reader(name):
+        with scheduler.acquire(shared=[path_resource("/data")]):
+            order.append(name)
+            if name == "first":
+                release.wait(2)
+
+    def writer():
+        with scheduler.acquire([path_resource("/data/new")]):
+            order.append("writer")
+
+    threads = [run_in_thread(lambda: reader("first"))]
+    time.sleep(0.05)
+    threads.append(run_in_thread(writer))
+    time.sleep(0.05)
+    # Shared with the running reader, but queued behind the writer
+    threads.append(run_in_thread(lambda: reader("second")))
+    time.sleep(0.05)
+    assert order == ["first"]
+    assert scheduler.load() == {"held": 1, "queued": 2}
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert order == ["first", "writer", "second"]
+    count, total, longest = scheduler.stats()[path_resource("/data/new")]
+    assert count == 1 and longest >= 0.05
+
+
+def test_path_resources_overlap_with_ancestors_only():
+    assert overlaps(path_resource("/data"), path_resource("/data/x"))
+    assert overlaps(path_resource("/"), path_resource("/data"))
+    assert not overlaps(path_resource("/data"), path_resource("/database"))
+    assert not overlaps(FOCUS, AUDIO)
+
+
+def test_held_resources_are_reentrant_but_not_upgradable():
+    scheduler = ResourceScheduler()
+    with scheduler.acquire([FOCUS]):
+        with scheduler.acquire([FOCUS], shared=[FOCUS]):
+            assert scheduler.load()["held"] == 1
+    with scheduler.acquire(shared=[AUDIO]):
+        with pytest.raises(RuntimeError):
+            with scheduler.acquire([AUDIO]):
+                pass
+    assert scheduler.load() == {"held": 0, "queued": 0}
+
+
+def test_async_waiters_queue_and_can_be_cancelled():
+    scheduler = ResourceScheduler()
+    order = []
+
+    @requires(FOCUS, scheduler=scheduler)
+    async def type_keys(name, delay):
+        order.append(name)
+        await asyncio.sleep(delay)
+
+    async def scenario():
+        first = asyncio.ensure_future(type_keys("a", 0.05))
+        await asyncio.sleep(0)
+        cancelled = asyncio.ensure_future(type_keys("cancelled", 0))
+        last = asyncio.ensure_future(type_keys("b", 0))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        await asyncio.gather(first, last)
+
+    asyncio.run(scenario())
+    assert order == ["a", "b"]
+    assert scheduler.load() == {"held": 0, "queued": 0}
+    assert "app_launcher_resource_wait_seconds_count{resource=\"gui.focus\"} 2" in scheduler.render()
+
+
+def test_calculator_session_waits_for_keyboard_focus():
+    class Window:
+        def launch(self): pass
+        def find_window(self): return "calc"
+        def is_alive(self, handle): return True
+        def focus(self, handle): typed.append("focus")
+        def clear(self): pass
+        def type_expression(self, expression): typed.append(expression)
+        def submit(self): pass
+
+    typed = []
+    session = CalculatorSession(Window())
+    held = threading.Event()
+    release = threading.Event()
+
+    def other_gui_tool():
+        with get_scheduler().acquire([FOCUS]):
+            held.set()
+            release.wait(2)
+
+    thread = run_in_thread(other_gui_tool)
+    held.wait(2)
+    show = run_in_thread(lambda: session.show("1+1"))
+    time.sleep(0.05)
+    assert typed == []
+    release.set()
+    for t in (thread, show):
+        t.join()
+    assert typed == ["focus", "1+1"]
+
+
+def test_lingering_grant_is_held_after_the_call_even_for_its_own_thread():
+    scheduler = ResourceScheduler()
+    with scheduler.acquire([FOCUS], linger=0.2):
+        pass
+    assert scheduler.load()["held"] == 1
+    start = time.perf_counter()
+    with scheduler.acquire([FOCUS]):
+        waited = time.perf_counter() - start
+    assert waited >= 0.15
+    assert scheduler.load() == {"held": 0, "queued": 0}
+
+    # A failed call has nothing to wait for
+    with pytest.raises(RuntimeError):
+        with scheduler.acquire([FOCUS], linger=5):
+            raise RuntimeError("spawn failed")
+    assert scheduler.load()["held"] == 0
+
+
+def test_plan_serializes_app_launch_and_calculator_on_focus(monkeypatch):
+    class Window:
+        def launch(self): pass
+        def find_window(self): return "calc"
+        def is_alive(self, handle): return True
+        def focus(self, handle): record("calc")
+        def clear(self): pass
+        def type_expression(self, expression): time.sleep(0.05)
+        def submit(self): record("calc done")
+
+    events = []
+
+    def record(name):
+        events.append((name, time.perf_counter()))
+
+    def spawn(app_name, command, shell):
+        record("launch")
+        time.sleep(0.05)  # The new window comes up and takes the focus
+        record("launch done")
+
+    launcher = AppLauncherTool(process_index=MagicMock(**{"is_running.return_value": False}),
+                               tracker=MagicMock(**{"running.return_value": None, "spawn.side_effect": spawn}),
+                               catalog=MagicMock())
+    launcher._launch_command = lambda name: (["notepad"], False, f"Successfully launched {name}")
+    session = CalculatorSession(Window())
+    agents = {"app": lambda text: launcher.launch_app(text.split()[-1]),
+              "calc": lambda text: session.show(text.split(maxsplit=1)[1]) or "25"}
+    registry = MagicMock()
+    registry.get.side_effect = lambda agent: MagicMock(run=lambda text, history: agents[agent](text))
+
+    monkeypatch.setattr("app_launcher_agent.tools.WINDOW_SETTLE", 0.2)
+    steps = [PlanStep(0, "open notepad", "app"), PlanStep(1, "calculate 5*5", "calc")]
+    reply = run_plan(steps, registry, executor=PlanExecutor(max_workers=2))
+
+    assert reply == "- **open notepad**: Successfully launched notepad\n- **calculate 5*5**: 25"
+    # Both steps ran at once but never drove the focus at the same time
+    names = [name for name, _ in events]
+    assert names in (["launch", "launch done", "calc", "calc done"], ["calc", "calc done", "launch", "launch done"])
+    if names[0] == "launch":
+        # The calculator also waited for the new window to settle
+        times = dict(events)
+        assert times["calc"] - times["launch done"] >= 0.15
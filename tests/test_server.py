@@ -0,0 +1,266 @@
+import asyncio
+import json
+import os
+import threading
+
+import pytest
+
+from app_launcher_agent.calculation_agent import CalculationAgent
+from app_launcher_agent.calculator_session import CalculatorSession
+from app_launcher_agent.llm_cache import cache_bypassed
+from app_launcher_agent.registry import AgentRegistry
+from app_launcher_agent.server import AgentServer, load_token, token_path
+from app_launcher_agent.streaming import current_stream
+from app_launcher_agent.tracing import PrometheusExporter, Tracer
+
+from helpers import ScriptedLLM
+
+
+class NullWindow:
+    def launch(self): pass
+    def find_window(self): return "calc"
+    def is_alive(self, handle): return True
+    def focus(self, handle): pass
+    def clear(self): pass
+    def type_expression(self, expression): pass
+    def submit(self): pass
+
+
+class WriterStub:
+    """Streams the fake LLM's answer in two chunks, like the writing tools do."""
+
+    def __init__(self, llm):
+        self.llm = llm
+
+    def run(self, text, chat_history=None):
+        answer = self.llm.invoke(text)
+        stream = current_stream()
+        if stream is not None:
+            stream.put(answer[:4])
+            stream.put(answer[4:])
+        return f"{answer} ({len(chat_history or [])} messages)"
+
+
+class BlockingAgent:
+    def __init__(self, llm):
+        self.release = threading.Event()
+
+    def run(self, text, chat_history=None):
+        self.release.wait(5)
+        return "done"
+
+
+def make_server(**kwargs):
+    registry = AgentRegistry(ScriptedLLM(responses=["written text"]), {
+        "calc": lambda llm: CalculationAgent(llm, session=CalculatorSession(NullWindow())),
+        "writer": WriterStub,
+        "slow": BlockingAgent,
+    })
+    return AgentServer(registry, tracer=Tracer([PrometheusExporter()]), token=TOKEN, **kwargs)
+
+
+TOKEN = "test-token"
+AUTH = [(b"authorization", f"Bearer {TOKEN}".encode())]
+JSON = [(b"content-type", b"application/json")]
+
+
+async def http(app, method, path, body=None, headers=None):
+    if headers is None:
+        headers = AUTH + (JSON if method == "POST" else [])
+    messages = [{"type": "http.request", "body": json.dumps(body).encode() if body is not None else b""}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await app({"type": "http", "method": method, "path": path, "headers": headers}, receive, send)
+    start, body_message = sent
+    headers = dict(start["headers"])
+    payload = body_message["body"]
+    if headers[b"content-type"] == b"application/json":
+        payload = json.loads(payload)
+    return start["status"], payload, headers
+
+
+def test_run_routes_to_agent_and_reports_trace():
+    server = make_server()
+    status, body, _ = asyncio.run(http(server, "POST", "/run", {"text": "calculate 2+3"}))
+    assert status == 200
+    assert body["result"] == "Result: 2+3 = 5"
+    assert body["agents"] == ["calc"]
+    assert body["trace_id"] == server.tracer.last_trace().trace_id
+
+
+def test_agent_endpoint_passes_history_to_the_agent():
+    server = make_server()
+    history = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+    status, body, _ = asyncio.run(http(server, "POST", "/agents/writer/run", {"text": "poem", "history": history}))
+    assert status == 200
+    assert body["result"] == "written text (2 messages)"
+    assert server.registry.llm.calls == 1
+
+
+def test_no_cache_flag_reaches_the_agent_thread():
+    class CacheProbe:
+        def __init__(self, llm):
+            pass
+
+        def run(self, text, chat_history=None):
+            return "bypassed" if cache_bypassed() else "cached"
+
+    registry = AgentRegistry(ScriptedLLM(), {"probe": CacheProbe})
+    server = AgentServer(registry, tracer=Tracer([PrometheusExporter()]), token=TOKEN)
+    _, body, _ = asyncio.run(http(server, "POST", "/agents/probe/run", {"text": "x", "no_cache": True}))
+    assert body["result"] == "bypassed"
+    _, body, _ = asyncio.run(http(server, "POST", "/agents/probe/run", {"text": "x"}))
+    assert body["result"] == "cached"
+
+
+def test_errors_are_json_with_status():
+    server = make_server()
+
+    async def scenario():
+        return [
+            await http(server, "POST", "/agents/nope/run", {"text": "x"}),
+            await http(server, "POST", "/run", {"text": ""}),
+            await http(server, "POST", "/run", {"text": "x", "history": "bad"}),
+            await http(server, "GET", "/missing"),
+        ]
+
+    assert [(status, "error" in body) for status, body, _ in asyncio.run(scenario())] == [
+        (404, True), (400, True), (400, True), (404, True)]
+
+
+def test_route_health_and_agents():
+    server = make_server()
+
+    async def scenario():
+        return (await http(server, "POST", "/route", {"text": "open chrome and firefox"}),
+                await http(server, "GET", "/health"),
+                await http(server, "GET", "/agents"))
+
+    (_, route, _), (_, health, _), (_, agents, _) = asyncio.run(scenario())
+    assert route["agent"] == "app"
+    assert [step["agent"] for step in route["plan"]] == ["app", "app"]
+    assert health["status"] == "ok" and health["capacity"] == 20
+    assert agents["agents"] == ["calc", "writer", "slow"]
+
+
+def test_backpressure_rejects_beyond_capacity_and_metrics_report_it():
+    server = make_server(max_workers=1, max_queue=1)
+    slow = server.registry.get("slow")
+
+    async def scenario():
+        first = asyncio.ensure_future(http(server, "POST", "/agents/slow/run", {"text": "a"}))
+        second = asyncio.ensure_future(http(server, "POST", "/agents/slow/run", {"text": "b"}))
+        await asyncio.sleep(0.05)
+        health = await http(server, "GET", "/health")
+        rejected = await http(server, "POST", "/agents/slow/run", {"text": "c"})
+        slow.release.set()
+        done = [await first, await second]
+        return health, rejected, done, await http(server, "GET", "/metrics")
+
+    (_, health, _), rejected, done, (_, metrics, headers) = asyncio.run(scenario())
+    assert (health["running"], health["queued"]) == (1, 1)
+    assert rejected[0] == 503 and rejected[2][b"retry-after"] == b"1"
+    assert [status for status, _, _ in done] == [200, 200]
+    assert done[1][1]["queue_ms"] > 0
+    text = metrics.decode()
+    assert headers[b"content-type"].startswith(b"text/plain")
+    assert "app_launcher_rejected_total 1" in text
+    assert 'app_launcher_http_responses_total{endpoint="/agents/run",status="200"} 2' in text
+    assert "app_launcher_queue_wait_seconds_count 2" in text
+    assert "app_launcher_span_seconds_count" in text
+    assert server.load()["admitted"] == 0
+
+
+def test_websocket_streams_chunks_then_result():
+    server = make_server()
+    incoming = [
+        {"type": "websocket.connect"},
+        {"type": "websocket.receive", "text": json.dumps({"text": "poem", "agent": "writer"})},
+        {"type": "websocket.receive", "text": "not json"},
+        {"type": "websocket.disconnect"},
+    ]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(server({"type": "websocket", "path": "/ws", "headers": AUTH}, receive, send))
+    assert sent[0] == {"type": "websocket.accept"}
+    replies = [json.loads(message["text"]) for message in sent[1:]]
+    assert [r["type"] for r in replies] == ["chunk", "chunk", "result", "error"]
+    assert "".join(r["text"] for r in replies[:2]) == "written text"
+    assert replies[2]["result"] == "written text (0 messages)"
+    assert replies[3]["status"] == 400
+
+
+def test_requests_need_the_bearer_token_except_health():
+    server = make_server()
+
+    async def scenario():
+        return [
+            await http(server, "GET", "/health", headers=[]),
+            await http(server, "GET", "/metrics", headers=[]),
+            await http(server, "POST", "/run", {"text": "calculate 2+3"}, headers=JSON),
+            await http(server, "POST", "/run", {"text": "calculate 2+3"},
+                       headers=[(b"authorization", b"Bearer wrong")] + JSON),
+        ]
+
+    responses = asyncio.run(scenario())
+    assert [status for status, _, _ in responses] == [200, 401, 401, 401]
+    assert responses[2][2][b"www-authenticate"] == b"Bearer"
+
+
+def test_cross_site_requests_are_rejected():
+    server = make_server(allowed_origins=["http://localhost:3000"])
+    page = [(b"origin", b"https://evil.example")]
+
+    async def scenario():
+        return [
+            # A page can POST text/plain without a preflight; it must not run anything
+            await http(server, "POST", "/run", {"text": "calculate 2+3"},
+                       headers=AUTH + [(b"content-type", b"text/plain")]),
+            await http(server, "POST", "/run", {"text": "calculate 2+3"}, headers=AUTH + JSON + page),
+            await http(server, "POST", "/run", {"text": "calculate 2+3"},
+                       headers=AUTH + JSON + [(b"origin", b"http://localhost:3000")]),
+        ]
+
+    assert [status for status, _, _ in asyncio.run(scenario())] == [415, 403, 200]
+
+
+@pytest.mark.parametrize("headers", [
+    [],
+    AUTH + [(b"origin", b"https://evil.example")],
+])
+def test_websocket_handshake_rejects_unauthenticated_and_foreign_origins(headers):
+    server = make_server()
+    sent = []
+
+    async def receive():
+        return {"type": "websocket.connect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(server({"type": "websocket", "path": "/ws", "headers": headers}, receive, send))
+    assert sent == [{"type": "websocket.close", "code": 1008}]
+
+
+def test_load_token_generates_a_private_token(tmp_path, monkeypatch):
+    monkeypatch.delenv("APP_LAUNCHER_API_TOKEN", raising=False)
+    monkeypatch.delenv("APP_LAUNCHER_API_TOKEN_FILE", raising=False)
+    monkeypatch.setenv("APP_LAUNCHER_CACHE_DIR", str(tmp_path))
+    token = load_token()
+    assert len(token) >= 32 and load_token() == token
+    assert os.stat(token_path()).st_mode & 0o077 == 0
+
+    monkeypatch.setenv("APP_LAUNCHER_API_TOKEN", "from-env")
+    assert load_token() == "from-env"
@@ -0,0 +1,103 @@
+import contextvars
+import sqlite3
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import Tool
+
+from app_launcher_agent.storage import ConversationStore, recording_tool_results
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ConversationStore(db_path=str(tmp_path / "conversations.sqlite3"), batch_size=4, flush_interval=3600)
+    yield store
+    store.close()
+
+
+def stored_rows(store):
+    with sqlite3.connect(store.db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+
+def test_appends_are_committed_in_batches(store):
+    session = store.create_session("test")
+    for i in range(3):
+        store.append(session, HumanMessage(content=f"message {i}"))
+    assert stored_rows(store) == 0
+
+    store.append(session, AIMessage(content="reply"))
+    assert stored_rows(store) == 4
+
+    store.append(session, HumanMessage(content="one more"))
+    store.flush()
+    assert stored_rows(store) == 5
+
+
+def test_sessions_survive_a_restart(tmp_path):
+    path = str(tmp_path / "conversations.sqlite3")
+    first = ConversationStore(db_path=path)
+    session = first.create_session("resume me")
+    first.append(session, HumanMessage(content="open notepad"))
+    first.append(session, AIMessage(content="Launched notepad"))
+    first.close()
+
+    second = ConversationStore(db_path=path)
+    messages, cursor = second.load_messages(session)
+    assert [type(m) for m in messages] == [HumanMessage, AIMessage]
+    assert [m.content for m in messages] == ["open notepad", "Launched notepad"]
+    assert cursor is None
+    assert second.append(session, HumanMessage(content="next")) == 2
+    assert [(s.id, s.title, s.messages) for s in second.sessions()] == [(session, "resume me", 3)]
+    second.close()
+
+
+def test_pages_are_loaded_newest_first(store):
+    session = store.create_session()
+    for i in range(10):
+        store.append(session, HumanMessage(content=f"q{i}"))
+        store.append(session, AIMessage(content=f"a{i}"))
+
+    page, cursor = store.load_messages(session, limit=6)
+    assert [m.content for m in page] == ["q7", "a7", "q8", "a8", "q9", "a9"]
+    older, cursor = store.load_messages(session, limit=6, before=cursor)
+    assert [m.content for m in older] == ["q4", "a4", "q5", "a5", "q6", "a6"]
+    assert store.page_start(session, 6) == 14
+
+    while cursor is not None:
+        page, cursor = store.load_messages(session, limit=6, before=cursor)
+    assert page[0].content == "q0"
+
+
+def test_large_outputs_are_compressed_and_tool_results_kept_apart(store):
+    session = store.create_session()
+    listing = "- 📄 file.txt\n" * 5000
+    store.append(session, HumanMessage(content="list d drive"))
+    store.append_tool_result(session, "file_operations", listing)
+    store.append(session, AIMessage(content=listing))
+    store.flush()
+
+    with sqlite3.connect(store.db_path) as conn:
+        rows = conn.execute("SELECT compressed, LENGTH(content) FROM messages WHERE seq > 0").fetchall()
+    assert all(compressed == 1 and size < len(listing) // 10 for compressed, size in rows)
+
+    messages, _ = store.load_messages(session)
+    assert [m.content for m in messages] == ["list d drive", listing]
+    tool_rows = store.load_records(session, roles=("tool",))
+    assert [(r.name, r.content) for r in tool_rows] == [("file_operations", listing)]
+
+
+def test_tool_results_are_recorded_per_turn(store):
+    echo = Tool(name="echo", func=lambda text: text.upper(), description="Repeats its input loudly")
+    session = store.create_session()
+    store.append(session, HumanMessage(content="say hi"))
+    with recording_tool_results() as recorder:
+        # Runs on a copy of the context, like agents on the chat worker thread
+        contextvars.copy_context().run(echo.invoke, "hi")
+    echo.invoke("not recorded")
+    assert recorder.results == [("echo", "HI")]
+
+    store.append_tool_results(session, recorder)
+    store.append(session, AIMessage(content="HI"))
+    assert [(r.role, r.name, r.content) for r in store.load_records(session)] == [
+        ("user", None, "say hi"), ("tool", "echo", "HI"), ("assistant", None, "HI")]
@@ -0,0 +1,66 @@
+import threading
+from unittest.mock import MagicMock
+from app_launcher_agent.llm_cache import LLMResponseCache
+from app_launcher_agent.streaming import TokenStream, streaming_to, current_stream
+from app_launcher_agent.tools import CodeGenerationTool, TextEditorTool
+
+def _streaming_llm(chunks):
+    llm = MagicMock()
+    llm._identifying_params = {"model_name": "fake"}
+    llm.stream.side_effect = lambda prompt: iter([MagicMock(content=c) for c in chunks])
+    return llm
+
+def test_token_stream_between_threads():
+    stream = TokenStream()
+
+    def producer():
+        for chunk in ["a", "b", "c"]:
+            stream.put(chunk)
+        stream.close()
+
+    threading.Thread(target=producer).start()
+    assert "".join(stream) == "abc"
+    assert stream.first_chunk_latency is not None
+
+def test_streaming_to_is_scoped():
+    stream = TokenStream()
+    with streaming_to(stream):
+        assert current_stream() is stream
+    assert current_stream() is None
+
+def test_editor_opens_once_the_text_is_written_and_stream_is_published(tmp_path, mocker):
+    opened = []
+    llm = _streaming_llm(["Hello", " world"])
+    tool = TextEditorTool(llm, LLMResponseCache(cache_dir=str(tmp_path)))
+    tool.system = "Windows"
+    mocker.patch.object(tool, '_open_in_editor', side_effect=lambda app, path: opened.append(open(path).read()))
+    mocker.patch('time.sleep')
+
+    stream = TokenStream()
+    with streaming_to(stream):
+        result = tool.write_to_file("the sea")
+    stream.close()
+
+    assert "Successfully wrote" in result
+    assert opened == ["Hello world"]  # Notepad would not reload a partial file
+    assert list(stream) == ["Hello", " world"]
+
+    # The streamed completion was cached as a whole
+    tool.write_to_file("the sea")
+    assert llm.stream.call_count == 1
+
+def test_reloading_editor_opens_on_first_chunk(tmp_path, mocker):
+    opened = []
+    tool = TextEditorTool(_streaming_llm(["Hello", " world"]), LLMResponseCache(cache_dir=str(tmp_path)))
+    tool.system = "Darwin"
+    mocker.patch.object(tool, '_open_in_editor', side_effect=lambda app, path: opened.append(open(path).read()))
+    mocker.patch('time.sleep')
+
+    tool.write_to_file("the sea")
+    assert opened == ["Hello"]  # TextEdit picks up the rest as it is written
+
+def test_code_stream_is_cleaned_line_by_line(tmp_path):
+    tool = CodeGenerationTool(MagicMock(), LLMResponseCache(cache_dir=str(tmp_path)))
+    chunks = ["```py", "thon\n\nprint(1)\n", "\n[note] x = 2\n```\n"]
+    streamed = "".join(tool._clean_code_stream(chunks))
+    assert streamed == tool._clean_code_output("".join(chunks)) == "print(1)\n\nx = 2"
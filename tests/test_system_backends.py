@@ -0,0 +1,323 @@
+import asyncio
+import os
+import stat
+import sys
+import threading
+import time
+import types
+from unittest.mock import MagicMock
+
+import pytest
+
+from app_launcher_agent.system_agent import SystemControlAgent
+from app_launcher_agent.system_backends import (AdjustmentCoalescer, LinuxSystemBackend, SystemBackend,
+                                                WindowsSystemBackend)
+from app_launcher_agent.tools import SystemOperationsTool
+
+PACTL_STUB = """#!/bin/sh
+state="$(dirname "$0")/volume"
+echo "$@" >> "$(dirname "$0")/calls"
+case "$1" in
+  get-sink-volume)
+    level=$(cat "$state")
+    echo "Volume: front-left: 32768 / $level% / -18.06 dB,   front-right: 32768 / $level% / -18.06 dB"
+    ;;
+  set-sink-volume)
+    echo "${3%\\%}" > "$state"
+    ;;
+  get-sink-mute)
+    if [ -f "$state.muted" ]; then echo "Mute: yes"; else echo "Mute: no"; fi
+    ;;
+  set-sink-mute)
+    if [ "$3" = "1" ]; then touch "$state.muted"; else rm -f "$state.muted"; fi
+    ;;
+  *)
+    echo "unknown command" >&2
+    exit 1
+    ;;
+esac
+"""
+
+RFKILL_STUB = """#!/bin/sh
+echo "$@" > "$(dirname "$0")/rfkill-calls"
+"""
+
+
+def write_stub(path, script):
+    path.write_text(script)
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    return str(path)
+
+
+@pytest.fixture
+def sysfs(tmp_path):
+    root = tmp_path / "backlight"
+    for name, kind, maximum, current in [("acpi_video0", "firmware", 10, 5), ("intel_backlight", "raw", 1000, 300)]:
+        device = root / name
+        device.mkdir(parents=True)
+        (device / "type").write_text(f"{kind}\n")
+        (device / "max_brightness").write_text(f"{maximum}\n")
+        (device / "brightness").write_text(f"{current}\n")
+    return root
+
+
+@pytest.fixture
+def linux_backend(tmp_path, sysfs):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    (bin_dir / "volume").write_text("50\n")
+    backend = LinuxSystemBackend(
+        backlight_root=str(sysfs),
+        pactl=write_stub(bin_dir / "pactl", PACTL_STUB),
+        rfkill=write_stub(bin_dir / "rfkill", RFKILL_STUB),
+    )
+    yield backend
+    backend.close()
+
+
+def test_linux_brightness_uses_the_preferred_backlight(linux_backend, sysfs):
+    assert linux_backend.get_brightness() == 50
+    assert linux_backend.set_brightness(80) == 80
+    assert (sysfs / "acpi_video0" / "brightness").read_text().strip() == "8"
+    assert (sysfs / "intel_backlight" / "brightness").read_text().strip() == "300"
+    assert linux_backend.set_brightness(140) == 100
+
+
+def test_linux_brightness_file_is_opened_once(linux_backend, mocker):
+    linux_backend.get_brightness()
+    opened = mocker.spy(os, "open")
+    for _ in range(5):
+        linux_backend.set_brightness(linux_backend.get_brightness() + 10)
+    opened.assert_not_called()
+
+
+def test_linux_brightness_without_write_access(linux_backend, mocker):
+    real_open = os.open
+
+    def read_only(path, flags, *args):
+        if flags & os.O_RDWR:
+            raise PermissionError(13, "Permission denied", path)
+        return real_open(path, flags, *args)
+
+    mocker.patch("app_launcher_agent.system_backends.os.open", side_effect=read_only)
+    tool = SystemOperationsTool(backend=linux_backend, coalesce_window=0)
+    assert tool.query("brightness") == "Brightness is 50%"
+    result = tool.set_brightness(70)
+    assert result.startswith("Brightness error: permission denied writing") and "udev rule" in result
+
+
+def test_mute_is_an_optional_capability():
+    class NoMute(SystemBackend):
+        def get_brightness(self):
+            return 50
+
+        def set_brightness(self, percent):
+            return percent
+
+        def get_volume(self):
+            return 40
+
+        def set_volume(self, percent):
+            return percent
+
+        def bluetooth_command(self, enable):
+            return ["true"]
+
+    tool = SystemOperationsTool(backend=NoMute(), coalesce_window=0)
+    assert tool.query("volume") == "Volume is 40%"
+    assert tool.set_mute(True) == "Volume error: muting is not supported on this system"
+    with pytest.raises(TypeError):
+        type("Partial", (SystemBackend,), {"get_volume": lambda self: 0})()
+
+
+def test_linux_volume_through_pactl(linux_backend, tmp_path):
+    tool = SystemOperationsTool(backend=linux_backend, coalesce_window=0)
+    assert tool.adjust_volume("increase") == "Volume set to 70%"
+    assert tool.adjust_volume("decrease") == "Volume set to 50%"
+    assert (tmp_path / "bin" / "volume").read_text().strip() == "50"
+
+    calls = (tmp_path / "bin" / "calls").read_text().splitlines()
+    # The level read by the first adjustment is reused by the second
+    assert calls == ["get-sink-volume @DEFAULT_SINK@", "set-sink-volume @DEFAULT_SINK@ 70%",
+                     "set-sink-volume @DEFAULT_SINK@ 50%"]
+
+
+def test_linux_bluetooth_and_errors(linux_backend, tmp_path):
+    tool = SystemOperationsTool(backend=linux_backend)
+    assert tool.toggle_bluetooth("enable") == "Success"
+    assert (tmp_path / "bin" / "rfkill-calls").read_text().strip() == "unblock bluetooth"
+    assert asyncio.run(tool.atoggle_bluetooth("disable")) == "Success"
+    assert (tmp_path / "bin" / "rfkill-calls").read_text().strip() == "block bluetooth"
+
+    broken = LinuxSystemBackend(backlight_root=str(tmp_path / "missing"))
+    assert SystemOperationsTool(backend=broken).adjust_brightness("increase").startswith(
+        "Brightness error: No backlight device")
+
+
+def test_windows_backend_reuses_wmi_connection(mocker):
+    monitor = MagicMock(CurrentBrightness=40)
+    connection = MagicMock()
+    connection.WmiMonitorBrightness.return_value = [monitor]
+    wmi = types.SimpleNamespace(WMI=MagicMock(return_value=connection))
+    pythoncom = types.SimpleNamespace(CoInitialize=MagicMock(), CoUninitialize=MagicMock())
+    mocker.patch.dict(sys.modules, {"wmi": wmi, "pythoncom": pythoncom})
+
+    backend = WindowsSystemBackend()
+    tool = SystemOperationsTool(backend=backend, coalesce_window=0)
+    assert tool.adjust_brightness("increase") == "Brightness set to 60%"
+    assert tool.adjust_brightness("increase") == "Brightness set to 80%"
+    assert tool.adjust_brightness("decrease") == "Brightness set to 60%"
+    backend.close()
+
+    wmi.WMI.assert_called_once_with(namespace="wmi")
+    pythoncom.CoInitialize.assert_called_once()
+    connection.WmiMonitorBrightness.assert_called_once()
+    methods = connection.WmiMonitorBrightnessMethods.return_value[0]
+    assert [c.args for c in methods.WmiSetBrightness.call_args_list] == [(60, 0), (80, 0), (60, 0)]
+
+
+def test_system_agent_keeps_one_tool(mocker):
+    mocker.patch("app_launcher_agent.system_agent.create_react_agent")
+    mocker.patch("app_launcher_agent.system_agent.load_react_prompt")
+    mocker.patch("app_launcher_agent.system_agent.AgentExecutor")
+    backend = MagicMock()
+    backend.get_volume.return_value = 30
+    backend.set_volume.side_effect = lambda percent: percent
+    agent = SystemControlAgent(llm=MagicMock(), system_tool=SystemOperationsTool(backend=backend, coalesce_window=0))
+
+    assert agent._handle_windows_operation("turn the volume up") == "Volume set to 50%"
+    assert asyncio.run(agent._ahandle_windows_operation("lower volume")) == "Volume set to 10%"
+    assert agent.system_tool.backend is backend
+
+
+def test_linux_mute_and_query(linux_backend, tmp_path):
+    tool = SystemOperationsTool(backend=linux_backend, coalesce_window=0)
+    assert tool.query("volume") == "Volume is 50%"
+    assert tool.set_mute(True) == "Volume muted"
+    assert tool.query("volume") == "Volume is 50% (muted)"
+    assert tool.set_mute(False) == "Volume unmuted"
+    assert tool.set_volume(35) == "Volume set to 35%"
+    assert (tmp_path / "bin" / "volume").read_text().strip() == "35"
+    assert tool.set_brightness(70) == "Brightness set to 70%"
+    assert tool.query("brightness") == "Brightness is 70%"
+
+
+class CountingLevel:
+    def __init__(self, level=50):
+        self.level = level
+        self.reads = self.writes = 0
+
+    def read(self):
+        self.reads += 1
+        return self.level
+
+    def write(self, percent):
+        self.writes += 1
+        self.level = max(0, min(100, percent))
+        return self.level
+
+
+def run_concurrently(*calls):
+    results = [None] * len(calls)
+
+    def run(index, call):
+        results[index] = call()
+
+    threads = [threading.Thread(target=run, args=(i, call)) for i, call in enumerate(calls)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_coalescer_applies_a_lone_change_at_once():
+    level = CountingLevel(50)
+    coalescer = AdjustmentCoalescer(level.read, level.write, window=5)
+
+    started = time.monotonic()
+    assert coalescer.adjust(-20) == 30
+    assert time.monotonic() - started < 1
+    assert (level.reads, level.writes) == (1, 1)
+
+
+def test_coalescer_merges_a_burst_into_one_write():
+    level = CountingLevel(50)
+    coalescer = AdjustmentCoalescer(level.read, level.write, window=0.2)
+    assert coalescer.adjust(5) == 55
+
+    results = run_concurrently(*[lambda: coalescer.adjust(10)] * 3, lambda: coalescer.adjust(-5))
+
+    assert results == [80] * 4
+    assert (level.reads, level.writes) == (2, 2)
+
+
+def test_coalescer_absolute_set_replaces_queued_changes():
+    level = CountingLevel(50)
+    coalescer = AdjustmentCoalescer(level.read, level.write, window=0.2)
+    coalescer.set(60)
+    first = threading.Thread(target=coalescer.adjust, args=(30,))
+    first.start()
+    time.sleep(0.05)
+    assert coalescer.set(20) == 20
+    first.join()
+
+    assert (level.reads, level.writes) == (0, 2)
+    # Later bursts start from what the last one wrote
+    assert coalescer.adjust(-30) == 0
+    assert level.writes == 3
+
+
+def test_coalescer_reports_errors_to_every_caller():
+    def fail(_):
+        raise RuntimeError("device gone")
+
+    coalescer = AdjustmentCoalescer(lambda: 10, fail, window=0.1)
+    results = run_concurrently(*[lambda: _error(coalescer.adjust, 5)] * 2)
+    assert results == ["device gone", "device gone"]
+
+
+def _error(function, *args):
+    try:
+        function(*args)
+    except RuntimeError as e:
+        return str(e)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("set brightness to 70%", ("brightness", "set", 70)),
+    ("turn the volume up to 40", ("volume", "set", 40)),
+    ("volume up by 10%", ("volume", "increase", 10)),
+    ("lower volume", ("volume", "decrease", None)),
+    ("mute the sound", ("volume", "mute", None)),
+    ("unmute", ("volume", "unmute", None)),
+    ("what is the volume?", ("volume", "query", None)),
+    ("brightness to max", ("brightness", "set", 100)),
+    ("increase brightness", ("brightness", "increase", None)),
+    ("enable bluetooth", ("bluetooth", "enable", None)),
+    ("Can you set the volume to 50%?", ("volume", "set", 50)),
+    ("could you make the screen brighter?", ("brightness", "increase", None)),
+    ("how high is the brightness?", ("brightness", "query", None)),
+    ("is the sound on?", ("volume", "query", None)),
+    ("Reduce brightness from 80 to 40", ("brightness", "set", 40)),
+    ("lower the volume from 60% by 15%", ("volume", "decrease", 15)),
+    ("make the screen darker", ("brightness", "decrease", None)),
+    ("dim the screen", ("brightness", "decrease", None)),
+    ("make it louder", ("volume", "increase", None)),
+    ("a bit quieter please", ("volume", "decrease", None)),
+    ("softer by 10", ("volume", "decrease", 10)),
+])
+def test_parse_operation(text, expected):
+    agent = object.__new__(SystemControlAgent)
+    assert agent._parse_operation(text) == expected
+
+
+def test_absolute_command_is_one_device_write():
+    backend = MagicMock()
+    backend.set_brightness.side_effect = lambda percent: percent
+    agent = object.__new__(SystemControlAgent)
+    agent.system_tool = SystemOperationsTool(backend=backend, coalesce_window=0)
+
+    assert agent._handle_windows_operation("set brightness to 70%") == "Brightness set to 70%"
+    backend.set_brightness.assert_called_once_with(70)
+    backend.get_brightness.assert_not_called()
@@ -0,0 +1,149 @@
+import asyncio
+import json
+
+from langchain.agents import AgentExecutor, Tool, create_react_agent
+from langchain_core.language_models import FakeListLLM
+from langchain_core.prompts import PromptTemplate
+
+from app_launcher_agent.planner import PlanStep, run_plan
+from app_launcher_agent.tracing import (JsonlExporter, PrometheusExporter, Tracer, format_waterfall,
+                                        span, traced)
+
+REACT_PROMPT = PromptTemplate.from_template(
+    "Tools: {tools} ({tool_names})\nQuestion: {input}\n{agent_scratchpad}")
+
+
+def by_name(trace):
+    return {s.name: s for s in trace.spans}
+
+
+def test_spans_nest_and_record_errors():
+    tracer = Tracer()
+    with tracer.request("chat") as trace:
+        with tracer.span("outer", "router"):
+            with tracer.span("inner"):
+                pass
+        try:
+            with tracer.span("broken"):
+                raise ValueError("boom")
+        except ValueError:
+            pass
+
+    spans = by_name(trace)
+    assert spans["outer"].parent_id == trace.root.span_id
+    assert spans["inner"].parent_id == spans["outer"].span_id
+    assert spans["broken"].error == "ValueError: boom"
+    assert all(s.end is not None for s in trace.spans)
+    assert tracer.last_trace() is trace
+
+
+def test_spans_outside_a_request_are_noops():
+    tracer = Tracer()
+    with tracer.span("orphan") as orphan:
+        assert orphan is None
+    assert tracer.traces() == []
+
+
+def test_traced_decorator_handles_sync_and_async():
+    tracer = Tracer()
+
+    @traced("work")
+    def work():
+        return 1
+
+    @traced("awork")
+    async def awork():
+        return 2
+
+    assert work() == 1  # No trace active: plain call
+    with tracer.request("chat") as trace:
+        with span("step"):
+            assert work() == 1
+            assert asyncio.run(awork()) == 2
+
+    spans = by_name(trace)
+    assert spans["work"].parent_id == spans["step"].span_id
+    assert spans["awork"].kind == "tool"
+
+
+def test_callback_handler_records_agent_llm_and_tool_spans():
+    llm = FakeListLLM(responses=[
+        "Thought: use it\nAction: echo\nAction Input: hi",
+        "Thought: done\nFinal Answer: hi",
+    ])
+    echo = Tool(name="echo", func=lambda text: text, description="echo")
+    executor = AgentExecutor(agent=create_react_agent(llm, [echo], REACT_PROMPT), tools=[echo])
+    tracer = Tracer()
+
+    with tracer.request("chat") as trace:
+        assert executor.invoke({"input": "say hi"})["output"] == "hi"
+
+    agent = next(s for s in trace.spans if s.name == "AgentExecutor")
+    llm_spans = [s for s in trace.spans if s.kind == "llm"]
+    tool = next(s for s in trace.spans if s.kind == "tool")
+    assert agent.parent_id == trace.root.span_id
+    assert agent.attributes["react_steps"] == 1
+    assert len(llm_spans) == 2
+    assert all(s.parent_id == agent.span_id for s in llm_spans + [tool])
+    assert all(s.attributes["tokens_estimated"] and s.attributes["prompt_tokens"] > 0 for s in llm_spans)
+    assert tool.name == "echo" and tool.attributes["input"] == "hi"
+    assert trace.root.attributes["prompt_tokens"] == sum(s.attributes["prompt_tokens"] for s in llm_spans)
+
+
+def test_plan_steps_are_traced_on_pool_threads():
+    class Agent:
+        def run(self, text, chat_history=None):
+            with span("inside"):
+                return text
+
+    class Registry:
+        def get(self, name):
+            return Agent()
+
+    tracer = Tracer()
+    with tracer.request("chat") as trace:
+        run_plan([PlanStep(0, "a", "launcher"), PlanStep(1, "b", "system")], Registry())
+
+    steps = [s for s in trace.spans if s.kind == "agent"]
+    inside = [s for s in trace.spans if s.name == "inside"]
+    assert sorted(s.attributes["step"] for s in steps) == [0, 1]
+    assert {s.parent_id for s in inside} == {s.span_id for s in steps}
+
+
+def test_exporters_write_jsonl_and_prometheus(tmp_path):
+    jsonl = tmp_path / "traces" / "spans.jsonl"
+    metrics = tmp_path / "metrics.prom"
+    prometheus = PrometheusExporter(path=str(metrics))
+    tracer = Tracer([JsonlExporter(str(jsonl)), prometheus])
+
+    for _ in range(2):
+        with tracer.request("open chrome"):
+            with tracer.span("launch_app", "tool"):
+                pass
+
+    records = [json.loads(line) for line in jsonl.read_text().splitlines()]
+    assert [r["name"] for r in records] == ["open chrome", "launch_app"] * 2
+    assert records[1]["parent_id"] == records[0]["span_id"]
+    text = metrics.read_text()
+    assert text == prometheus.render()
+    assert "app_launcher_requests_total 2" in text
+    assert 'app_launcher_span_seconds_count{kind="tool",name="launch_app"} 2' in text
+    assert 'app_launcher_span_seconds_bucket{kind="request",name="request",le="+Inf"} 2' in text
+
+
+def test_failing_exporter_does_not_fail_the_request(tmp_path):
+    tracer = Tracer([JsonlExporter(str(tmp_path))])  # A directory: open() raises
+    with tracer.request("chat"):
+        pass
+    assert tracer.last_trace() is not None
+
+
+def test_format_waterfall_indents_children():
+    tracer = Tracer()
+    with tracer.request("chat") as trace:
+        with tracer.span("plan", "router"):
+            with tracer.span("launch_app", "tool"):
+                pass
+    lines = format_waterfall(trace, width=20).splitlines()
+    assert [line.split("ms  ")[1] for line in lines] == [
+        "request: chat", "  router: plan", "    tool: launch_app"]